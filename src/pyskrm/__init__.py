@@ -1,4 +1,12 @@
 from .skrm import SKRM
 
-__all__ = ["SKRM"]
-__version__ = "0.1.0"
\ No newline at end of file
+__all__ = ["SKRM", "Bank"]
+__version__ = "0.1.0"
+
+
+def __getattr__(name):
+    # Bank pulls in the process pool: imported on first use to keep startup fast
+    if name == "Bank":
+        from .bank import Bank
+        return Bank
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
@@ -0,0 +1,112 @@
+"""Mixed read/write access streams.
+
+An access is ``(op, value, target_word, track)`` where ``op`` is ``WRITE``
+(``'w'``), ``READ`` (``'r'``, non-destructive) or ``READ_DESTRUCTIVE``
+(``'d'``); ``value`` is ignored by reads. ``run_accesses`` executes a stream
+on an ``SKRM`` and splits the operation counts, latency and energy by kind,
+so costs reflect the whole access stream rather than the writes alone.
+
+Access traces are CSV files (optionally ``.gz``) of ``op,value,target_word[,track]``
+lines, with an empty value for reads; blank lines, ``#`` comments and a
+header line are skipped.
+"""
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .argument_error import ArgumentError
+from .trace import _open
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .skrm import SKRM
+
+
+WRITE = "w"
+READ = "r"
+READ_DESTRUCTIVE = "d"
+OPS = (WRITE, READ, READ_DESTRUCTIVE)
+
+Access = Tuple[str, float, int, int]
+
+
+@dataclass
+class AccessResult:
+    """Per-kind ``(inject, detect, remove, shift)`` counts and costs of one access stream.
+
+    ``reads`` holds the values returned by the reads, in stream order.
+    """
+    counts: Dict[str, Tuple[int, int, int, int]]
+    latency: Dict[str, float]
+    energy: Dict[str, float]
+    reads: List[float] = field(default_factory=list)
+
+    @property
+    def total_latency(self) -> float:
+        return sum(self.latency.values())
+
+    @property
+    def total_energy(self) -> float:
+        return sum(self.energy.values())
+
+
+def read_accesses(path: str) -> Iterator[Access]:
+    """Stream ``(op, value, target_word, track)`` records from a (gzipped) CSV access trace."""
+    with _open(path) as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            fields = line.split(",")
+            op = fields[0].strip().lower()
+            try:
+                if op not in OPS:
+                    raise ValueError(op)
+                value = float(fields[1]) if op == WRITE else 0.0
+                target_word = int(fields[2])
+                track = int(fields[3]) if len(fields) > 3 and fields[3].strip() else 0
+            except (ValueError, IndexError):
+                if lineno == 1:
+                    continue  # header
+                raise ArgumentError("Malformed access record at %s:%d" % (path, lineno))
+            yield op, value, target_word, track
+
+
+def execute(skrm: "SKRM", access: Access) -> Optional[float]:
+    """Perform one access; returns the value read, or None for a write."""
+    op, value, target_word, track = access
+    if op == WRITE:
+        skrm.write(value, target_word, track)
+        return None
+    if op == READ:
+        return skrm.read(target_word, track)
+    if op == READ_DESTRUCTIVE:
+        return skrm.read(target_word, track, destructive=True)
+    raise ArgumentError("Access op should be 'w', 'r' or 'd'.")
+
+
+def run_accesses(skrm: "SKRM", accesses: Iterable[Access]) -> AccessResult:
+    """Execute an access stream on ``skrm`` in order."""
+    counts = {op: [0, 0, 0, 0] for op in OPS}
+    reads = []
+    for access in accesses:
+        before = (skrm.inject_count, skrm.detect_count, skrm.remove_count, skrm.shift_count)
+        value = execute(skrm, access)
+        if value is not None:
+            reads.append(value)
+        total = counts[access[0]]
+        total[0] += skrm.inject_count - before[0]
+        total[1] += skrm.detect_count - before[1]
+        total[2] += skrm.remove_count - before[2]
+        total[3] += skrm.shift_count - before[3]
+
+    result = AccessResult({}, {}, {}, reads)
+    for op, (inject, detect, remove, shift) in counts.items():
+        result.counts[op] = (inject, detect, remove, shift)
+        result.latency[op] = (
+            inject * skrm.inject_latency + detect * skrm.detect_latency +
+            remove * skrm.remove_latency + shift * skrm.shift_latency
+        )
+        result.energy[op] = (
+            inject * skrm.inject_energy + detect * skrm.detect_energy +
+            remove * skrm.remove_energy + shift * skrm.shift_energy
+        )
+    return result
@@ -0,0 +1,153 @@
+"""Bank-level scheduling of independent racetracks.
+
+Racetracks of one ``SKRM`` share nothing but the cost model, so the writes
+addressed to different tracks can be simulated concurrently. ``Bank.run``
+groups a request stream by track, simulates every track on a detached
+single-track copy of the instance (in a process pool when ``max_workers`` is
+not 0), merges storage, counters and the adaptive, differential and encoding
+statistics back, and reports both the sequential latency (sum over tracks)
+and the parallel latency (max over tracks). An instance whose primitives
+are shadowed (error models, tracers, wear trackers) is written in place one
+track after another instead, since copies leave the hooks behind.
+"""
+import copy
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .argument_error import ArgumentError
+from .ring import RingStorage
+from .skrm import SKRM, _write_func
+
+
+@dataclass
+class BankResult:
+    """Per-track operation counts and costs of one ``Bank.run``.
+
+    ``counts`` maps a track to its ``(inject, detect, remove, shift)`` counts.
+    """
+    counts: Dict[int, Tuple[int, int, int, int]]
+    latency: Dict[int, float]
+    energy: Dict[int, float]
+
+    @property
+    def sequential_latency(self) -> float:
+        return sum(self.latency.values())
+
+    @property
+    def parallel_latency(self) -> float:
+        return max(self.latency.values(), default=0.0)
+
+    @property
+    def total_energy(self) -> float:
+        return sum(self.energy.values())
+
+
+def _detach_track(skrm: SKRM, track: int) -> SKRM:
+    """Single-track copy of ``skrm`` holding racetrack ``track``, counters and statistics reset."""
+    single = copy.copy(skrm)
+    single.num_racetrack = 1
+    if skrm.layout == 'sparse':
+        # The sparse contents are copied as they are, never as dense bits
+        single._ring = skrm._ring.track_copy(track)
+    else:
+        if skrm.layout == 'ring':
+            single._ring = RingStorage(single.word_size, single.num_words, 1, single.track_length)
+        single.storage = skrm.storage[skrm.track_length * track : skrm.track_length * (track + 1)]
+    single.inject_count = single.detect_count = single.remove_count = single.shift_count = 0
+    single.strategy_picks = {name: [0, 0.0, 0.0] for name in skrm.strategy_picks}
+    single.differential_stats = dict.fromkeys(skrm.differential_stats, 0)
+    single.encoding_stats = dict.fromkeys(skrm.encoding_stats, 0)
+    single.__dict__.pop("write", None)  # rebound by _run_track
+    return single
+
+
+def _run_track(single: SKRM, write_fn, writes: List[Tuple[float, int]]):
+    single.write = write_fn.__get__(single, SKRM)
+    values, targets = zip(*writes)
+    single._write_batch(values, targets)
+    counts = (single.inject_count, single.detect_count, single.remove_count, single.shift_count)
+    contents = single._ring if single.layout == 'sparse' else single.storage
+    return contents, counts, (single.strategy_picks, single.differential_stats, single.encoding_stats)
+
+
+def _merge_stats(skrm: SKRM, stats) -> None:
+    """Add the statistics of a track run to ``skrm``."""
+    picks, differential, encoding = stats
+    for name, values in picks.items():
+        totals = skrm.strategy_picks[name]
+        for i, value in enumerate(values):
+            totals[i] += value
+    for key, value in differential.items():
+        skrm.differential_stats[key] += value
+    for key, value in encoding.items():
+        skrm.encoding_stats[key] += value
+
+
+class Bank:
+    def __init__(self, skrm: SKRM, max_workers: Optional[int] = None) -> None:
+        """``max_workers=0`` runs the tracks one after another in this process."""
+        self.skrm = skrm
+        self.max_workers = max_workers
+
+    def run(self, requests: Iterable[Tuple[float, int, int]]) -> BankResult:
+        """Execute ``(number, target_word, track)`` writes, in order within each track."""
+        skrm = self.skrm
+        per_track: Dict[int, List[Tuple[float, int]]] = {}
+        for number, target_word, track in requests:
+            if track < 0 or track > skrm.num_racetrack - 1:
+                raise ArgumentError("Track must be between 0 and (num_racetrack - 1).")
+            if target_word < 0 or target_word > skrm.num_words - 1:
+                raise ArgumentError("Target word must be must be between 0 and (num_words - 1).")
+            per_track.setdefault(track, []).append((number, target_word))
+
+        result = BankResult({}, {}, {})
+        if "inject" in skrm.__dict__ or "detect" in skrm.__dict__ or "remove" in skrm.__dict__ or "shift" in skrm.__dict__:
+            for track, writes in per_track.items():
+                before = (skrm.inject_count, skrm.detect_count, skrm.remove_count, skrm.shift_count)
+                for number, target_word in writes:
+                    skrm.write(float(number), target_word, track)
+                result.counts[track] = (skrm.inject_count - before[0], skrm.detect_count - before[1],
+                                        skrm.remove_count - before[2], skrm.shift_count - before[3])
+        else:
+            self._run_detached(per_track, result)
+
+        for track, counts in result.counts.items():
+            result.latency[track] = (
+                counts[0] * skrm.inject_latency + counts[1] * skrm.detect_latency +
+                counts[2] * skrm.remove_latency + counts[3] * skrm.shift_latency
+            )
+            result.energy[track] = (
+                counts[0] * skrm.inject_energy + counts[1] * skrm.detect_energy +
+                counts[2] * skrm.remove_energy + counts[3] * skrm.shift_energy
+            )
+        return result
+
+    def _run_detached(self, per_track: Dict[int, List[Tuple[float, int]]], result: BankResult) -> None:
+        """Run every track on a detached copy and merge storage, counters and statistics back."""
+        skrm = self.skrm
+        write_fn = _write_func(skrm.write)
+        if write_fn is None:
+            raise ArgumentError("Bank needs a write strategy bound to the instance (see SKRM.set_write_fn).")
+        jobs = [(_detach_track(skrm, track), write_fn, writes) for track, writes in per_track.items()]
+        if self.max_workers == 0 or len(jobs) < 2:
+            outcomes = [_run_track(*job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+                outcomes = list(pool.map(_run_track, *zip(*jobs)))
+
+        sparse = skrm.layout == 'sparse'
+        merged = None if sparse else skrm.storage
+        for track, (contents, counts, stats) in zip(per_track, outcomes):
+            if sparse:
+                skrm._ring.put_track(track, contents)
+            else:
+                merged[skrm.track_length * track : skrm.track_length * (track + 1)] = contents
+            _merge_stats(skrm, stats)
+            skrm.inject_count += counts[0]
+            skrm.detect_count += counts[1]
+            skrm.remove_count += counts[2]
+            skrm.shift_count += counts[3]
+            result.counts[track] = counts
+        if not sparse:
+            skrm.storage = merged
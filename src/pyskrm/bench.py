@@ -0,0 +1,212 @@
+"""Benchmark suite for the primitives and the write strategies.
+
+Every case is timed (ops/sec, best of ``repeat`` runs) and then run once more
+under ``tracemalloc`` for its peak memory. Results are saved as JSON and can
+be compared against a stored baseline::
+
+    python -m pyskrm.bench -o bench.json
+    python -m pyskrm.bench -o new.json --baseline bench.json --tolerance 0.2
+
+The command exits with status 1 when a case got slower than the baseline by
+more than the tolerance.
+"""
+import argparse
+import json
+import platform
+import random
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .skrm import SKRM
+
+
+PRIMITIVE_SIZES = (16, 256, 4096)
+# word sizes of the one-step shift cases, run in every layout
+SHIFT_WORD_SIZES = (32, 1024, 16384)
+LAYOUTS = ("flat", "ring", "sparse")
+# word size -> precision of the written values
+WORD_SIZES = {16: "half", 32: "single", 64: "double"}
+STRATEGIES = ("naive", "pw", "pw_plus")
+DISTRIBUTIONS = ("random", "zeros", "repeated")
+
+# A case builds its state and returns (run, ops): run() performs `ops` operations
+Case = Callable[[], Tuple[Callable[[], None], int]]
+
+
+@dataclass
+class BenchResult:
+    name: str
+    ops: int
+    seconds: float
+    ops_per_sec: float
+    peak_bytes: int
+
+
+@dataclass
+class Regression:
+    name: str
+    baseline_ops_per_sec: float
+    ops_per_sec: float
+
+    @property
+    def ratio(self) -> float:
+        return self.ops_per_sec / self.baseline_ops_per_sec
+
+
+def values(distribution: str, n: int, seed: int = 0) -> List[float]:
+    """``n`` benchmark values: random floats, all zeros, or a few repeated values.
+
+    Random values span 1e-4 .. 1e4 in magnitude so they fit every precision.
+    """
+    rng = random.Random(seed)
+    if distribution == "random":
+        return [rng.uniform(-1, 1) * 10 ** rng.uniform(-4, 4) for _ in range(n)]
+    if distribution == "zeros":
+        return [0.0] * n
+    if distribution == "repeated":
+        pool = [rng.uniform(-1e3, 1e3) for _ in range(4)]
+        return [rng.choice(pool) for _ in range(n)]
+    raise ValueError("Distribution should be 'random', 'zeros' or 'repeated'.")
+
+
+def _primitive_case(op: str, num_words: int, ops: int) -> Case:
+    def setup():
+        s = SKRM(word_size=32, num_words=num_words)
+        aps = [i % (num_words + 1) for i in range(ops)]
+        if op == "shift":
+            def run():
+                for _ in aps:
+                    s.shift(0, num_words)
+        else:
+            fn = getattr(s, op)
+            def run():
+                for ap in aps:
+                    fn(ap)
+        return run, ops
+    return setup
+
+
+def _step_case(layout: str, word_size: int, ops: int) -> Case:
+    def setup():
+        s = SKRM(word_size=word_size, num_words=4, layout=layout)
+        def run():
+            for _ in range(ops):
+                s.shift(1, 2)
+        return run, ops
+    return setup
+
+
+def _write_case(strategy: str, word_size: int, distribution: str, ops: int) -> Case:
+    def setup():
+        s = SKRM(word_size=word_size, num_words=64, strategy=strategy, precision=WORD_SIZES[word_size])
+        writes = list(zip(values(distribution, ops), [i % 64 for i in range(ops)]))
+        def run():
+            for number, target_word in writes:
+                s.write(number, target_word)
+        return run, ops
+    return setup
+
+
+def cases(quick: bool = False) -> Dict[str, Case]:
+    """Every benchmark case by name; ``quick`` uses fewer operations per case."""
+    primitive_ops, write_ops = (200, 5) if quick else (20000, 200)
+    suite: Dict[str, Case] = {}
+    for num_words in PRIMITIVE_SIZES:
+        for op in ("inject", "detect", "remove", "shift"):
+            suite["%s/num_words=%d" % (op, num_words)] = _primitive_case(op, num_words, primitive_ops)
+    for layout in LAYOUTS:
+        for word_size in SHIFT_WORD_SIZES:
+            suite["shift1/%s/word_size=%d" % (layout, word_size)] = _step_case(layout, word_size, primitive_ops)
+    for strategy in STRATEGIES:
+        for word_size in WORD_SIZES:
+            for distribution in DISTRIBUTIONS:
+                name = "write/%s/word_size=%d/%s" % (strategy, word_size, distribution)
+                suite[name] = _write_case(strategy, word_size, distribution, write_ops)
+    return suite
+
+
+def measure(name: str, case: Case, repeat: int = 3) -> BenchResult:
+    best = float("inf")
+    for _ in range(repeat):
+        run, ops = case()
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+
+    run, ops = case()
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return BenchResult(name, ops, best, ops / best if best > 0 else float("inf"), peak)
+
+
+def run_suite(quick: bool = False, repeat: int = 3, select: Optional[str] = None) -> List[BenchResult]:
+    """Run every case (whose name contains ``select``, when given)."""
+    return [measure(name, case, repeat) for name, case in cases(quick).items() if select is None or select in name]
+
+
+def save(results: List[BenchResult], path: str) -> None:
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": [asdict(result) for result in results],
+    }
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+def load(path: str) -> List[BenchResult]:
+    with open(path) as f:
+        return [BenchResult(**result) for result in json.load(f)["results"]]
+
+
+def compare(results: List[BenchResult], baseline: List[BenchResult], tolerance: float = 0.1) -> List[Regression]:
+    """Cases more than ``tolerance`` (a fraction) slower than in ``baseline``; new cases are ignored."""
+    before = {result.name: result for result in baseline}
+    regressions = []
+    for result in results:
+        old = before.get(result.name)
+        if old is not None and result.ops_per_sec < old.ops_per_sec * (1 - tolerance):
+            regressions.append(Regression(result.name, old.ops_per_sec, result.ops_per_sec))
+    return regressions
+
+
+def render(results: List[BenchResult]) -> str:
+    width = max((len(result.name) for result in results), default=4)
+    lines = ["%-*s %15s %12s" % (width, "Case", "ops/sec", "peak (KiB)")]
+    for result in results:
+        lines.append("%-*s %15.1f %12.1f" % (width, result.name, result.ops_per_sec, result.peak_bytes / 1024))
+    return "\n".join(lines) + "\n"
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m pyskrm.bench", description="Benchmark the SKRM primitives and write strategies.")
+    parser.add_argument("-o", "--output", help="save the results as JSON")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="allowed slowdown as a fraction (default 0.1)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("-k", "--select", help="only run cases whose name contains this text")
+    parser.add_argument("--quick", action="store_true", help="fewer operations per case")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.quick, args.repeat, args.select)
+    print(render(results), end="")
+    if args.output:
+        save(results, args.output)
+    if args.baseline:
+        regressions = compare(results, load(args.baseline), args.tolerance)
+        for regression in regressions:
+            print("Regression: %s %.1f -> %.1f ops/sec (x%.2f)" % (
+                regression.name, regression.baseline_ops_per_sec, regression.ops_per_sec, regression.ratio))
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -0,0 +1,218 @@
+"""Burst writes of consecutive words.
+
+``SKRM.write_block(values, start_word)`` writes ``values[i]`` to word
+``start_word + i`` of one racetrack. Where every word of the block follows
+the same shift schedule, the block is written in lockstep: one shift pulse
+moves all of its segments at once (``shift(start_word, end)``), and every
+step applies per-word masks of injects, detects and removes on the access
+ports of the block, in parallel. naive and pw writes have such a schedule,
+whatever the word contents:
+
+- naive: ``word_size`` shifts of the whole block, each followed by a remove
+  on every port behind a word; then, MSB first, an inject on the port
+  behind every word whose pattern bit is set, and a shift of the block back.
+- pw: a shift and ``word_size`` detect-and-shift steps assemble the old
+  skyrmions of every word, then ``pattern_width + 1`` shifts back place
+  them (or inject, once a word has run out) on the ports behind the words.
+  A single pw write drops the skyrmions it detected off the end of its
+  segment; in a block they would move on into the next word, so the ports
+  between the words remove them as they are detected. The removes of the
+  skyrmions a word does not reuse are charged per word, as pw does.
+
+So the block costs the shifts of one word, and its latency is that of the
+schedule: the operations of one step on the ports of the block overlap in
+time. The lockstep schedule leaves the contents of the per-word writes as
+long as no pattern is wider than the word and the ports between the words
+of the block are empty (as the strategies leave them); the bit-level
+schedule runs through the primitives, analytic instances apply its closed
+form.
+
+Every other block is written one ``write`` at a time and charged those
+writes, with no savings: pw_plus and adaptive (whose shifts depend on the
+word contents), custom and differential writes. ``BlockResult`` gives the
+latency and energy of the per-word writes in both cases, for comparison.
+"""
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, List, Sequence, Tuple
+
+from . import analytic
+from .argument_error import ArgumentError
+from .ieee754 import popcount
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .skrm import SKRM
+
+
+@dataclass
+class BlockResult:
+    """Costs of one block write.
+
+    ``words`` holds the per-word ``(inject, detect, remove, shift)`` counts and
+    ``counts`` what the block was charged; ``lockstep`` tells whether the
+    block shared its shifts.
+    """
+    words: List[Tuple[int, int, int, int]]
+    counts: Tuple[int, int, int, int]
+    latency: float
+    energy: float
+    word_latency: float
+    word_energy: float
+    lockstep: bool = False
+
+    @property
+    def shifts_saved(self) -> int:
+        return sum(counts[3] for counts in self.words) - self.counts[3]
+
+    @property
+    def latency_saved(self) -> float:
+        return self.word_latency - self.latency
+
+
+def _lockstep(skrm: "SKRM", start_word: int, count: int, track: int) -> bool:
+    """Whether the block can share the naive or pw schedule (see the module docstring)."""
+    from .skrm import DISPATCH, SKRM
+
+    write = getattr(skrm.write, "__func__", None)
+    if skrm.strategy not in _SCHEDULES or skrm.differential is not None:
+        return False
+    if write not in (DISPATCH[skrm.strategy], SKRM.plan_write) or skrm.pattern_width > skrm.word_size:
+        return False
+    # The port behind every word but the last is the LSB of its segment
+    return not any(skrm._read_segment(word, track) & 1 for word in range(start_word, start_word + count - 1))
+
+
+def _naive_lockstep(skrm: "SKRM", patterns: List[int], olds: List[int], start_word: int, track: int) -> float:
+    """Run the shared naive schedule; returns its latency."""
+    end = start_word + len(patterns)
+    ws, width = skrm.word_size, skrm.pattern_width
+    if skrm.analytic:
+        for offset, pattern in enumerate(patterns):
+            segment, _ = analytic.naive_write(skrm._read_segment(start_word + offset, track), ws, pattern, width)
+            skrm._store_segment(segment, start_word + offset, track)
+        skrm.inject_count += sum(popcount(pattern) for pattern in patterns)
+        skrm.remove_count += ws * len(patterns)
+        skrm.shift_count += ws + width
+    else:
+        inject, _, remove, shift = skrm._primitives()
+        # Remove
+        for _ in range(ws):
+            shift(start_word, end, track)
+            for ap in range(start_word + 1, end + 1):
+                remove(ap, track)
+        # Inject, MSB first
+        for i in range(width - 1, -1, -1):
+            for offset, pattern in enumerate(patterns):
+                if (pattern >> i) & 1:
+                    inject(start_word + offset + 1, track)
+            shift(end, start_word, track)
+
+    inject_latency, _, remove_latency, shift_latency = skrm.cost_model.latency
+    return ws * (shift_latency + remove_latency) + width * shift_latency + popcount(_or(patterns)) * inject_latency
+
+
+def _injected(pattern: int, reused: int) -> int:
+    """The bits of ``pattern`` pw injects once the ``reused`` highest ones were placed."""
+    for _ in range(min(reused, popcount(pattern))):
+        pattern &= ~(1 << (pattern.bit_length() - 1))
+    return pattern
+
+
+def _pw_lockstep(skrm: "SKRM", patterns: List[int], olds: List[int], start_word: int, track: int) -> float:
+    """Run the shared pw schedule; returns its latency."""
+    end = start_word + len(patterns)
+    ws, width = skrm.word_size, skrm.pattern_width
+    sky_cnts = [popcount(old) for old in olds]
+    # Skyrmions detected on the ports between the words
+    passed = sum(sky_cnts[:-1])
+    if skrm.analytic:
+        for offset, pattern in enumerate(patterns):
+            segment, _ = analytic.permutation_write(skrm._read_segment(start_word + offset, track), ws, pattern, width)
+            skrm._store_segment(segment, start_word + offset, track)
+        skrm.inject_count += sum(max(0, popcount(pattern) - sky) for pattern, sky in zip(patterns, sky_cnts))
+        skrm.detect_count += ws * len(patterns)
+        skrm.remove_count += passed
+        skrm.shift_count += ws + width + 2
+    else:
+        inject, detect, remove, shift = skrm._primitives()
+        # Assemble
+        shift(start_word, end, track)
+        for _ in range(ws):
+            for ap in range(start_word + 1, end + 1):
+                if detect(ap, track) == 1 and ap < end:
+                    remove(ap, track)
+            shift(start_word, end, track)
+        # Re-permute & inject, MSB first
+        left = list(sky_cnts)
+        for i in range(width - 1, -1, -1):
+            shift(end, start_word, track)
+            for offset, pattern in enumerate(patterns):
+                if (pattern >> i) & 1:
+                    if left[offset] > 0:
+                        left[offset] -= 1
+                        skrm._place(start_word + offset + 1, track)
+                    else:
+                        inject(start_word + offset + 1, track)
+        shift(end, start_word, track)
+    # Remove extra skyrmions, charged per word
+    extra = sum(max(0, sky - popcount(pattern)) for pattern, sky in zip(patterns, sky_cnts))
+    skrm.remove_count += extra
+    skrm.shift_count += extra
+
+    inject_latency, detect_latency, remove_latency, shift_latency = skrm.cost_model.latency
+    injects = [_injected(pattern, sky) for pattern, sky in zip(patterns, sky_cnts)]
+    return ((ws + width + 2) * shift_latency + ws * detect_latency +
+            popcount(_or(olds[:-1])) * remove_latency + popcount(_or(injects)) * inject_latency +
+            extra * (shift_latency + remove_latency))
+
+
+def _or(words: List[int]) -> int:
+    combined = 0
+    for word in words:
+        combined |= word
+    return combined
+
+
+_SCHEDULES = {"naive": (analytic.naive_write, _naive_lockstep), "pw": (analytic.permutation_write, _pw_lockstep)}
+
+
+def write_block(skrm: "SKRM", values: Sequence[float], start_word: int, track: int = 0) -> BlockResult:
+    """Write ``values`` to the words ``start_word, start_word + 1, ...`` of ``track`` as one burst."""
+    values = list(values)
+    if start_word < 0 or start_word + len(values) > skrm.num_words:
+        raise ArgumentError("Block must fit between word 0 and word (num_words - 1).")
+    if track < 0 or track > skrm.num_racetrack - 1:
+        raise ArgumentError("Track must be between 0 and (num_racetrack - 1).")
+    model = skrm.cost_model
+
+    if values and _lockstep(skrm, start_word, len(values), track):
+        form, run = _SCHEDULES[skrm.strategy]
+        ws, width = skrm.word_size, skrm.pattern_width
+        patterns = [skrm._pattern(float(number)) for number in values]
+        segments = [skrm._read_segment(start_word + offset, track) for offset in range(len(values))]
+        words = [form(segment, ws, pattern, width)[1] for segment, pattern in zip(segments, patterns)]
+        before = (skrm.inject_count, skrm.detect_count, skrm.remove_count, skrm.shift_count)
+        latency = run(skrm, patterns, [(segment >> 1) & ((1 << ws) - 1) for segment in segments], start_word, track)
+        counts = (skrm.inject_count - before[0], skrm.detect_count - before[1],
+                  skrm.remove_count - before[2], skrm.shift_count - before[3])
+        lockstep = True
+    else:
+        words = []
+        for offset, number in enumerate(values):
+            before = (skrm.inject_count, skrm.detect_count, skrm.remove_count, skrm.shift_count)
+            skrm.write(float(number), start_word + offset, track)
+            words.append((skrm.inject_count - before[0], skrm.detect_count - before[1],
+                          skrm.remove_count - before[2], skrm.shift_count - before[3]))
+        counts = tuple(sum(column) for column in zip(*words)) if words else (0, 0, 0, 0)
+        latency = model.price(counts)[0]
+        lockstep = False
+
+    totals = [sum(column) for column in zip(*words)] if words else [0, 0, 0, 0]
+    word_latency, word_energy = model.price(totals)
+    return BlockResult(
+        words, counts,
+        latency=latency,
+        energy=model.price(counts)[1],
+        word_latency=word_latency,
+        word_energy=word_energy,
+        lockstep=lockstep,
+    )
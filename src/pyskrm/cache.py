@@ -0,0 +1,92 @@
+"""Bounded LRU memo of write transitions.
+
+For a built-in strategy the effect of a write depends only on the segment
+``[AP target_word .. AP target_word + 1]`` it starts from and on the bit
+pattern being written. ``TransitionCache`` maps ``(strategy, old segment,
+new pattern)`` to the segment left behind and the ``(inject, detect, remove,
+shift)`` counter deltas, so a repeated transition is replayed without going
+through ``shift``/``detect`` again.
+
+Entries are evicted least-recently-used first once their estimated size
+exceeds ``max_bytes``.
+"""
+import sys
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from .argument_error import ArgumentError
+
+
+Key = Tuple[str, int, int]
+Entry = Tuple[int, Tuple[int, int, int, int]]
+
+
+@dataclass
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    bytes: int
+    max_bytes: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def _entry_size(key: Key, entry: Entry) -> int:
+    segment, counts = entry
+    return (
+        sys.getsizeof(key) + sum(sys.getsizeof(k) for k in key) +
+        sys.getsizeof(entry) + sys.getsizeof(segment) +
+        sys.getsizeof(counts) + sum(sys.getsizeof(c) for c in counts)
+    )
+
+
+class TransitionCache:
+    def __init__(self, max_bytes: int) -> None:
+        if max_bytes < 1:
+            raise ArgumentError("Cache size must be positive.")
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Key, Tuple[Entry, int]]" = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Key) -> Optional[Entry]:
+        item = self._entries.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return item[0]
+
+    def put(self, key: Key, entry: Entry) -> None:
+        size = _entry_size(key, entry)
+        if size > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes -= old[1]
+        self._entries[key] = (entry, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.bytes -= evicted
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry; the statistics are kept."""
+        self._entries.clear()
+        self.bytes = 0
+
+    def stats(self) -> CacheStats:
+        return CacheStats(self.hits, self.misses, self.evictions, len(self._entries), self.bytes, self.max_bytes)
@@ -0,0 +1,152 @@
+"""The ``pyskrm`` command: run trace files through write strategies.
+
+Every trace is simulated once per strategy on a fresh instance, in a
+process pool when ``--jobs`` is above 1, and the operation counters are
+reported as a table or, with ``--json``, as a JSON list of ``Stats.as_row``
+dicts. ``--stream`` replays the traces chunk by chunk (``trace.run_trace``)
+instead of loading them whole::
+
+    pyskrm trace.csv other.skt -n 1024 -s pw -s pw_plus -c shift_latency=0.5 --jobs 4 --json
+
+The heavy modules (NumPy, the process pool) are only imported once a trace
+is run, so ``pyskrm --help`` starts quickly.
+"""
+import argparse
+import json
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from .argument_error import ArgumentError
+from .encoding import ENCODINGS
+
+
+STRATEGIES = ("naive", "pw", "pw_plus", "adaptive")
+COSTS = tuple("%s_%s" % (op, kind) for kind in ("latency", "energy") for op in ("inject", "detect", "remove", "shift"))
+
+Row = Dict[str, Any]
+
+
+def parse_costs(specs: Iterable[str]) -> Dict[str, float]:
+    """Parse ``name=value`` specs of cost parameters."""
+    costs = {}
+    for spec in specs:
+        name, sep, value = spec.partition("=")
+        name = name.strip()
+        if name not in COSTS:
+            raise ArgumentError("Unknown cost parameter: %s" % name)
+        try:
+            costs[name] = float(value)
+        except ValueError:
+            raise ArgumentError("Cost parameters look like name=value: %s" % spec)
+    return costs
+
+
+def _load(path: str):
+    """The whole trace as ``(values, targets, tracks)`` arrays."""
+    import numpy as np
+
+    from .trace import read_chunks
+
+    chunks = list(read_chunks(path))
+    if not chunks:
+        return np.zeros(0, np.float64), np.zeros(0, np.int64), None
+    tracks = None
+    if any(chunk.tracks is not None for chunk in chunks):
+        tracks = np.concatenate([chunk.tracks if chunk.tracks is not None else np.zeros(len(chunk.values), np.int64)
+                                 for chunk in chunks])
+    return (np.concatenate([chunk.values for chunk in chunks]),
+            np.concatenate([chunk.targets for chunk in chunks]), tracks)
+
+
+def run_one(path: str, strategy: str, config: Dict[str, Any], costs: Dict[str, float],
+            stream: bool = False, chunk_size: Optional[int] = None) -> Row:
+    """Simulate one trace with one strategy; returns its report row."""
+    from .skrm import SKRM
+    from .trace import DEFAULT_CHUNK_SIZE, run_trace
+
+    skrm = SKRM(strategy=strategy, **config)
+    for name, value in costs.items():
+        setattr(skrm, name, value)
+    if stream:
+        records = 0
+        for progress in run_trace(skrm, path, chunk_size or DEFAULT_CHUNK_SIZE):
+            records = progress.records
+    else:
+        values, targets, tracks = _load(path)
+        skrm._write_batch(values, targets, tracks)
+        records = len(values)
+    row: Row = {"trace": str(path), "strategy": strategy, "records": records}
+    row.update(skrm.stats().as_row())
+    return row
+
+
+def run(traces: Sequence[str], strategies: Sequence[str], config: Dict[str, Any], costs: Dict[str, float],
+        jobs: int = 1, stream: bool = False, chunk_size: Optional[int] = None) -> List[Row]:
+    """Rows of every trace through every strategy, in that order; ``jobs`` > 1 runs them in processes."""
+    for strategy in strategies:
+        if strategy not in STRATEGIES:
+            raise ArgumentError("Strategy should be one of: %s." % ", ".join(STRATEGIES))
+    tasks = [(path, strategy) for path in traces for strategy in strategies]
+    if jobs <= 1 or len(tasks) < 2:
+        return [run_one(path, strategy, config, costs, stream, chunk_size) for path, strategy in tasks]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    n = len(tasks)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(run_one, [path for path, _ in tasks], [strategy for _, strategy in tasks],
+                             [config] * n, [costs] * n, [stream] * n, [chunk_size] * n))
+
+
+def render(rows: List[Row]) -> str:
+    width = max([len(row["trace"]) for row in rows] + [5])
+    lines = ["%-*s %-9s %10s %12s %12s %12s %12s %14s %14s" % (
+        width, "Trace", "Strategy", "Records", "Inject", "Detect", "Remove", "Shift", "Latency", "Energy")]
+    for row in rows:
+        lines.append("%-*s %-9s %10d %12d %12d %12d %12d %14.6g %14.6g" % (
+            width, row["trace"], row["strategy"], row["records"], row["inject_count"], row["detect_count"],
+            row["remove_count"], row["shift_count"], row["total_latency"], row["total_energy"]))
+    return "\n".join(lines) + "\n"
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="pyskrm", description="Run trace files through SKRM write strategies.")
+    parser.add_argument("traces", nargs="+", help="trace files (.csv, .bin, .skt, optionally .gz)")
+    parser.add_argument("-s", "--strategy", action="append", choices=STRATEGIES,
+                        help="write strategy, repeatable (default: naive)")
+    parser.add_argument("-w", "--word-size", type=int, default=32)
+    parser.add_argument("-n", "--num-words", type=int, required=True)
+    parser.add_argument("-t", "--num-racetrack", type=int, default=1)
+    parser.add_argument("--num-overhead", type=int, default=2)
+    parser.add_argument("--precision", default="single", choices=("half", "single", "double"))
+    parser.add_argument("--layout", default="flat", choices=("flat", "ring", "sparse"))
+    parser.add_argument("--analytic", action="store_true", help="count-only execution")
+    parser.add_argument("--differential", choices=("oracle", "detect"), default=None, help="differential write mode")
+    parser.add_argument("--encoding", default="none", choices=tuple(ENCODINGS),
+                        help="word encoding; the word size must hold its code words")
+    parser.add_argument("-c", "--cost", action="append", default=[], metavar="NAME=VALUE",
+                        help="cost parameter such as shift_latency=0.5, repeatable")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="worker processes across traces and strategies")
+    parser.add_argument("--stream", action="store_true", help="replay the traces chunk by chunk")
+    parser.add_argument("--chunk-size", type=int, default=None, help="records per chunk with --stream")
+    parser.add_argument("--json", action="store_true", help="print the counters as JSON")
+    args = parser.parse_args(argv)
+
+    config = dict(word_size=args.word_size, num_words=args.num_words, num_racetrack=args.num_racetrack,
+                  num_overhead=args.num_overhead, precision=args.precision, layout=args.layout,
+                  analytic=args.analytic, differential=args.differential, encoding=args.encoding)
+    try:
+        rows = run(args.traces, args.strategy or ["naive"], config, parse_costs(args.cost),
+                   args.jobs, args.stream, args.chunk_size)
+    except ArgumentError as e:
+        parser.exit(2, "pyskrm: error: %s\n" % e)
+    if args.json:
+        json.dump(rows, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        sys.stdout.write(render(rows))
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
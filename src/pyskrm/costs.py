@@ -0,0 +1,117 @@
+"""Cost parameters and operation counts as compact vectors.
+
+``CostModel`` keeps the latency and the energy of the four primitives
+(``OPERATIONS`` order) in two slotted vectors. Every ``SKRM`` reads its cost
+attributes (``inject_latency``, ``shift_energy``, ...) from one: its own by
+default, or a model passed as ``SKRM(cost_model=...)``, which any number of
+instances may share, so that tuning it re-prices all of them at once.
+
+``OpCounters`` is the count vector of an instance (``SKRM.counters``).
+``count_matrix`` stacks the vectors of many instances into an ``(n, 4)``
+NumPy array that ``CostModel.price_matrix`` prices in one product::
+
+    model = CostModel()
+    instances = [SKRM(32, 64, strategy=name, cost_model=model) for name in ("naive", "pw")]
+    latency, energy = model.price_matrix(count_matrix(s.counters for s in instances))
+"""
+from array import array
+from typing import TYPE_CHECKING, Iterable, Iterator, Sequence, Tuple
+
+from .argument_error import ArgumentError
+
+if TYPE_CHECKING:  # pragma: no cover
+    import numpy as np
+
+
+OPERATIONS = ("inject", "detect", "remove", "shift")
+LATENCY = (1.0, 0.1, 0.8, 0.5)
+ENERGY = (200, 2, 20, 20)
+
+
+class CostModel:
+    """Latency and energy per operation, as lists in ``OPERATIONS`` order."""
+    __slots__ = ("latency", "energy")
+
+    def __init__(self, latency: Sequence[float] = LATENCY, energy: Sequence[float] = ENERGY) -> None:
+        if len(latency) != len(OPERATIONS) or len(energy) != len(OPERATIONS):
+            raise ArgumentError("A cost model needs one latency and one energy per operation.")
+        self.latency = list(latency)
+        self.energy = list(energy)
+
+    def __repr__(self) -> str:
+        return "CostModel(latency=%r, energy=%r)" % (self.latency, self.energy)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, CostModel):
+            return NotImplemented
+        return self.latency == other.latency and self.energy == other.energy
+
+    def __getstate__(self):
+        return self.latency, self.energy
+
+    def __setstate__(self, state) -> None:
+        self.latency, self.energy = state
+
+    def copy(self) -> "CostModel":
+        return CostModel(self.latency, self.energy)
+
+    def price(self, counts: Sequence[int]) -> Tuple[float, float]:
+        """``(latency, energy)`` of one ``(inject, detect, remove, shift)`` count vector."""
+        return (sum(count * cost for count, cost in zip(counts, self.latency)),
+                sum(count * cost for count, cost in zip(counts, self.energy)))
+
+    def price_matrix(self, counts) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Latency and energy arrays of an ``(n, 4)`` count matrix, in one product each."""
+        import numpy as np
+
+        costs = np.array([self.latency, self.energy], dtype=np.float64).T
+        priced = np.asarray(counts) @ costs
+        return priced[:, 0], priced[:, 1]
+
+
+class OpCounters:
+    """A ``(inject, detect, remove, shift)`` count vector."""
+    __slots__ = ("values",)
+
+    def __init__(self, inject: int = 0, detect: int = 0, remove: int = 0, shift: int = 0) -> None:
+        self.values = array("q", (inject, detect, remove, shift))
+
+    def __repr__(self) -> str:
+        return "OpCounters(%s)" % ", ".join("%s=%d" % item for item in zip(OPERATIONS, self.values))
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.values)
+
+    def __len__(self) -> int:
+        return len(OPERATIONS)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, OpCounters):
+            return self.values == other.values
+        if isinstance(other, (tuple, list)):
+            return tuple(self.values) == tuple(other)
+        return NotImplemented
+
+    def __add__(self, other: "OpCounters") -> "OpCounters":
+        return OpCounters(*(a + b for a, b in zip(self.values, other)))
+
+    def __sub__(self, other: "OpCounters") -> "OpCounters":
+        return OpCounters(*(a - b for a, b in zip(self.values, other)))
+
+    def __getstate__(self):
+        return tuple(self.values)
+
+    def __setstate__(self, state) -> None:
+        self.values = array("q", state)
+
+    @property
+    def total(self) -> int:
+        return sum(self.values)
+
+
+def count_matrix(counters: Iterable[Sequence[int]]):
+    """The ``(n, 4)`` int64 matrix of many count vectors (``OpCounters`` or tuples)."""
+    import numpy as np
+
+    matrix = np.array([tuple(counts) for counts in counters], dtype=np.int64)
+    return matrix.reshape(-1, len(OPERATIONS))
@@ -0,0 +1,295 @@
+"""Word encodings between the IEEE-754 conversion and the write strategies.
+
+``SKRM(encoding=name)`` writes the code word of every value instead of its
+bare IEEE-754 pattern, and decodes (and, for the error-correcting codes,
+corrects) the words it reads. The strategies see the code word as a pattern
+``extra_bits`` wider than the precision, whatever the strategy: pw_plus,
+for example, flip-encodes the code word. Available encodings (``ENCODINGS``):
+
+- ``none``: the IEEE-754 pattern itself;
+- ``dbi``: data-bus inversion, the word is inverted when more than half of
+  its bits are ones, with a flag bit above it (what pw_plus does on its own);
+- ``dbi8``: the same per 8-bit group, one flag bit per group, above the data;
+- ``hamming``: a single-error-correcting Hamming code, the parity bits above
+  the data (systematic form);
+- ``secded``: Hamming plus an overall parity bit, which also detects double
+  errors.
+
+``decode`` returns the data and a status: ``OK``, ``CORRECTED`` (a single
+bit error was repaired) or ``DETECTED`` (an uncorrectable error; the data is
+returned as read). Every encoding also encodes and decodes whole NumPy
+arrays; code words wider than 64 bits (e.g. double precision with ECC) are
+handled as arrays of Python ints.
+
+``compare_encodings`` writes the same values under every encoding and
+reports the extra bits, the skyrmions stored and the latency and energy.
+"""
+import functools
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .argument_error import ArgumentError
+from .ieee754 import popcount
+
+OK, CORRECTED, DETECTED = 0, 1, 2
+
+
+def _as_codes(bits, width: int):
+    """uint64 array when ``width`` bits fit in it, else an array of Python ints."""
+    import numpy as np
+
+    bits = np.asarray(bits)
+    if width <= 64:
+        return bits.astype(np.uint64)
+    return np.array([int(b) for b in bits.ravel().tolist()], dtype=object).reshape(bits.shape)
+
+
+class Encoding:
+    """The identity encoding; subclasses override ``extra_bits``, ``encode`` and ``decode``."""
+    name = "none"
+
+    def extra_bits(self, width: int) -> int:
+        return 0
+
+    def encode(self, bits: int, width: int) -> int:
+        return bits
+
+    def decode(self, code: int, width: int) -> Tuple[int, int]:
+        return code & ((1 << width) - 1), OK
+
+    def encode_array(self, bits, width: int):
+        """``encode`` of every element of an unsigned integer array."""
+        import numpy as np
+
+        codes = _as_codes(bits, width + self.extra_bits(width))
+        if codes.dtype == object:
+            return np.array([self.encode(int(b), width) for b in codes.tolist()], dtype=object)
+        return self._encode_array(codes, width)
+
+    def decode_array(self, codes, width: int):
+        """``(data, status)`` arrays of ``decode`` over every element."""
+        import numpy as np
+
+        codes = _as_codes(codes, width + self.extra_bits(width))
+        if codes.dtype == object:
+            decoded = [self.decode(int(c), width) for c in codes.tolist()]
+            return (np.array([d for d, _ in decoded], dtype=object),
+                    np.array([s for _, s in decoded], dtype=np.int8))
+        return self._decode_array(codes, width)
+
+    def _encode_array(self, bits, width: int):
+        return bits
+
+    def _decode_array(self, codes, width: int):
+        import numpy as np
+
+        return codes & np.uint64((1 << width) - 1), np.zeros(codes.shape, dtype=np.int8)
+
+
+class BusInvert(Encoding):
+    """Data-bus inversion over groups of ``group`` bits (the whole word when None)."""
+    def __init__(self, group: Optional[int] = None) -> None:
+        self.group = group
+        self.name = "dbi" if group is None else "dbi%d" % group
+
+    def _groups(self, width: int) -> List[Tuple[int, int]]:
+        """(shift, length) of every group, lowest first."""
+        size = self.group or width
+        return [(start, min(size, width - start)) for start in range(0, width, size)]
+
+    def extra_bits(self, width: int) -> int:
+        return len(self._groups(width))
+
+    def encode(self, bits: int, width: int) -> int:
+        flags = 0
+        for i, (shift, length) in enumerate(self._groups(width)):
+            mask = ((1 << length) - 1) << shift
+            if popcount(bits & mask) > length / 2:
+                bits ^= mask
+                flags |= 1 << i
+        return (flags << width) | bits
+
+    def decode(self, code: int, width: int) -> Tuple[int, int]:
+        bits = code & ((1 << width) - 1)
+        flags = code >> width
+        for i, (shift, length) in enumerate(self._groups(width)):
+            if (flags >> i) & 1:
+                bits ^= ((1 << length) - 1) << shift
+        return bits, OK
+
+    def _encode_array(self, bits, width: int):
+        import numpy as np
+
+        from .ieee754 import popcount_array
+
+        codes = bits.copy()
+        for i, (shift, length) in enumerate(self._groups(width)):
+            mask = np.uint64(((1 << length) - 1) << shift)
+            invert = popcount_array(bits & mask) > length / 2
+            codes = np.where(invert, (codes ^ mask) | np.uint64(1 << (width + i)), codes)
+        return codes
+
+    def _decode_array(self, codes, width: int):
+        import numpy as np
+
+        bits = codes & np.uint64((1 << width) - 1)
+        for i, (shift, length) in enumerate(self._groups(width)):
+            flagged = (codes >> np.uint64(width + i)) & np.uint64(1)
+            bits ^= flagged * np.uint64(((1 << length) - 1) << shift)
+        return bits, np.zeros(codes.shape, dtype=np.int8)
+
+
+@functools.lru_cache(maxsize=None)
+def _hamming_layout(width: int) -> Tuple[int, Tuple[int, ...], Tuple[int, ...]]:
+    """``(r, masks, fixes)`` of the Hamming code of ``width`` data bits.
+
+    Data bit d sits at the d-th Hamming position (1-based) that is not a power
+    of two; parity bit j covers the data bits of ``masks[j]``; ``fixes[s]`` is
+    the data bit to flip for syndrome ``s`` (0 when it is a parity bit or out
+    of range).
+    """
+    r = 1
+    while (1 << r) < width + r + 1:
+        r += 1
+    positions = [p for p in range(1, width + r + 1) if p & (p - 1)]
+    masks = tuple(sum(1 << d for d, p in enumerate(positions) if p >> j & 1) for j in range(r))
+    fixes = [0] * (1 << r)
+    for d, p in enumerate(positions):
+        fixes[p] = 1 << d
+    return r, masks, tuple(fixes)
+
+
+class Hamming(Encoding):
+    """Hamming single-error correction; with ``secded`` an overall parity bit detects double errors."""
+    def __init__(self, secded: bool = False) -> None:
+        self.secded = secded
+        self.name = "secded" if secded else "hamming"
+
+    def extra_bits(self, width: int) -> int:
+        return _hamming_layout(width)[0] + self.secded
+
+    def _parity(self, bits: int, width: int) -> int:
+        _, masks, _ = _hamming_layout(width)
+        return sum((popcount(bits & mask) & 1) << j for j, mask in enumerate(masks))
+
+    def encode(self, bits: int, width: int) -> int:
+        r = _hamming_layout(width)[0]
+        code = (self._parity(bits, width) << width) | bits
+        if self.secded:
+            code |= (popcount(code) & 1) << (width + r)
+        return code
+
+    def decode(self, code: int, width: int) -> Tuple[int, int]:
+        r, _, fixes = _hamming_layout(width)
+        bits = code & ((1 << width) - 1)
+        syndrome = self._parity(bits, width) ^ ((code >> width) & ((1 << r) - 1))
+        if self.secded:
+            odd = popcount(code) & 1
+            if not syndrome:
+                return bits, CORRECTED if odd else OK  # only the overall parity bit can be wrong
+            if not odd:
+                return bits, DETECTED
+        elif not syndrome:
+            return bits, OK
+        if syndrome > width + r:
+            return bits, DETECTED
+        return bits ^ fixes[syndrome], CORRECTED
+
+    def _parity_array(self, bits, width: int):
+        import numpy as np
+
+        from .ieee754 import popcount_array
+
+        _, masks, _ = _hamming_layout(width)
+        parity = np.zeros(bits.shape, dtype=np.uint64)
+        for j, mask in enumerate(masks):
+            parity |= (popcount_array(bits & np.uint64(mask)).astype(np.uint64) & np.uint64(1)) << np.uint64(j)
+        return parity
+
+    def _encode_array(self, bits, width: int):
+        import numpy as np
+
+        from .ieee754 import popcount_array
+
+        r = _hamming_layout(width)[0]
+        codes = (self._parity_array(bits, width) << np.uint64(width)) | bits
+        if self.secded:
+            codes |= (popcount_array(codes).astype(np.uint64) & np.uint64(1)) << np.uint64(width + r)
+        return codes
+
+    def _decode_array(self, codes, width: int):
+        import numpy as np
+
+        from .ieee754 import popcount_array
+
+        r, _, fixes = _hamming_layout(width)
+        bits = codes & np.uint64((1 << width) - 1)
+        syndrome = (self._parity_array(bits, width) ^ ((codes >> np.uint64(width)) & np.uint64((1 << r) - 1))).astype(np.int64)
+        fix = np.array(fixes, dtype=np.uint64)[syndrome]
+        uncorrectable = syndrome > width + r
+        status = np.where(syndrome != 0, CORRECTED, OK)
+        if self.secded:
+            odd = (popcount_array(codes) & 1).astype(bool)
+            status = np.where(odd, CORRECTED, np.where(syndrome != 0, DETECTED, OK))
+            fix = np.where(odd, fix, np.uint64(0))
+            uncorrectable &= odd
+        status = np.where(uncorrectable, DETECTED, status)
+        bits = np.where(status == CORRECTED, bits ^ fix, bits)
+        return bits, status.astype(np.int8)
+
+
+ENCODINGS: Dict[str, Encoding] = {
+    "none": Encoding(),
+    "dbi": BusInvert(),
+    "dbi8": BusInvert(8),
+    "hamming": Hamming(),
+    "secded": Hamming(secded=True),
+}
+
+
+def get_encoding(name: str) -> Encoding:
+    if name not in ENCODINGS:
+        raise ArgumentError("Encoding should be one of: %s." % ", ".join(ENCODINGS))
+    return ENCODINGS[name]
+
+
+@dataclass
+class EncodingReport:
+    """Cost of writing a batch of values under one encoding."""
+    encoding: str
+    width: int
+    extra_bits: int
+    ones: int
+    latency: float
+    energy: float
+
+    @property
+    def overhead(self) -> float:
+        """Extra bits per data bit."""
+        return self.extra_bits / (self.width - self.extra_bits)
+
+
+def compare_encodings(values, strategy: str = "pw", precision: str = "single",
+                      encodings: Iterable[str] = tuple(ENCODINGS), num_words: Optional[int] = None,
+                      **kwargs) -> Dict[str, EncodingReport]:
+    """Write ``values`` to consecutive words (wrapping around ``num_words``) under every encoding.
+
+    Every encoding gets a fresh ``SKRM`` whose words just hold its code words;
+    ``kwargs`` go to the ``SKRM`` constructor.
+    """
+    import numpy as np
+
+    from .ieee754 import precision_width
+    from .skrm import SKRM
+
+    values = np.asarray(values, dtype=np.float64).ravel()
+    num_words = num_words or max(len(values), 1)
+    data_width = precision_width(precision)
+    reports = {}
+    for name in encodings:
+        extra = get_encoding(name).extra_bits(data_width)
+        skrm = SKRM(data_width + extra, num_words, strategy=strategy, precision=precision, encoding=name, **kwargs)
+        result = skrm.replay(values, np.arange(len(values)) % num_words)
+        reports[name] = EncodingReport(name, data_width + extra, extra, skrm.storage.count(),
+                                       float(result.total_latency), float(result.total_energy))
+    return reports
@@ -0,0 +1,330 @@
+"""Stochastic fault model and Monte Carlo reliability simulation.
+
+``ErrorModel`` gives per-operation error probabilities:
+
+- ``p_inject``: an inject fails and no skyrmion is created;
+- ``p_overshoot`` / ``p_undershoot``: a shift moves the track one position
+  too far / not at all;
+- ``p_detect``: a detect returns the wrong bit.
+
+``ErrorModel.attach`` puts the faults on the primitives of one ``SKRM`` for
+bit-level experiments. ``monte_carlo`` estimates bit and word error rates
+of a write followed by a (non-destructive) read of the word at scale. Each
+trial writes a random pattern over a random old word. A batch of trials is
+stepped through the same operation schedule as the bit-level strategy and
+read (``_Segments``), one NumPy operation per step for the whole batch,
+with a fault drawn per trial and step as the attached primitives would.
+So a shift error in the remove phase only changes what is cleared, one in
+the inject phase displaces the bits injected before it, a failed inject
+loses one skyrmion and a wrong detect of pw/pw_plus miscounts the
+skyrmions to reuse; the rates follow the attached primitives.
+
+Trials are split into chunks with independent child seeds of ``seed``
+(``numpy.random.SeedSequence``), so a run is reproducible whatever the
+number of worker processes.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+from .argument_error import ArgumentError
+from .ieee754 import flip_bits_array, leading_bit_index_array, precision_width
+from .ieee754 import popcount_array as _popcount
+
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+# Uniform draws fetched at once by attached primitives
+_DRAW_BLOCK = 4096
+
+
+@dataclass
+class ErrorModel:
+    p_inject: float = 0.0
+    p_overshoot: float = 0.0
+    p_undershoot: float = 0.0
+    p_detect: float = 0.0
+
+    def __post_init__(self) -> None:
+        for name in ("p_inject", "p_overshoot", "p_undershoot", "p_detect"):
+            if not 0.0 <= getattr(self, name) <= 1.0:
+                raise ArgumentError("Error probabilities must be between 0 and 1.")
+        if self.p_overshoot + self.p_undershoot > 1.0:
+            raise ArgumentError("p_overshoot + p_undershoot must not exceed 1.")
+
+    def attach(self, skrm, seed: Optional[int] = None) -> None:
+        """Make the inject/shift/detect primitives of ``skrm`` faulty.
+
+        The operation counters are unchanged: a failed or repeated operation
+        still counts once. Remove ``skrm.inject``, ``skrm.shift`` and
+        ``skrm.detect`` (``del``) to restore the fault-free primitives.
+        Analytic instances and instances with a transition cache write
+        without the primitives and are refused; ``replay``, ``run_trace`` and
+        ``Bank`` run one bit-level write at a time while faults are attached.
+        """
+        if skrm.analytic or skrm.cache is not None:
+            raise ArgumentError("Faults need bit-level writes: use an instance without analytic mode or a cache.")
+        draws = _Draws(np.random.default_rng(seed))
+        cls = type(skrm)
+        model = self
+
+        def inject(ap, track=0):
+            if draws() < model.p_inject:
+                skrm.inject_count += 1
+                return
+            cls.inject(skrm, ap, track)
+
+        def shift(start_ap, end_ap, track=0):
+            u = draws()
+            if u < model.p_undershoot:
+                skrm.shift_count += 1
+                return
+            cls.shift(skrm, start_ap, end_ap, track)
+            if u < model.p_undershoot + model.p_overshoot:
+                cls.shift(skrm, start_ap, end_ap, track)
+                skrm.shift_count -= 1
+
+        def detect(ap, track=0):
+            bit = cls.detect(skrm, ap, track)
+            return 1 - bit if draws() < model.p_detect else bit
+
+        skrm.inject = inject
+        skrm.shift = shift
+        skrm.detect = detect
+
+
+class _Draws:
+    """Uniform [0, 1) numbers handed out one by one from NumPy blocks."""
+    def __init__(self, rng: np.random.Generator) -> None:
+        self.rng = rng
+        self.block = rng.random(_DRAW_BLOCK).tolist()
+        self.pos = 0
+
+    def __call__(self) -> float:
+        if self.pos == len(self.block):
+            self.block = self.rng.random(_DRAW_BLOCK).tolist()
+            self.pos = 0
+        self.pos += 1
+        return self.block[self.pos - 1]
+
+
+@dataclass
+class ReliabilityResult:
+    strategy: str
+    trials: int
+    bits: int
+    bit_errors: int
+    word_errors: int
+
+    @property
+    def ber(self) -> float:
+        return self.bit_errors / self.bits if self.bits else 0.0
+
+    @property
+    def wer(self) -> float:
+        return self.word_errors / self.trials if self.trials else 0.0
+
+
+class _Segments:
+    """The segments ``[AP target_word | word | AP target_word + 1]`` of a batch of trials.
+
+    Every method is one faulty primitive applied to the trials selected by
+    ``mask`` (all of them when omitted), with the semantics of the bit-level
+    primitives under ``ErrorModel.attach``: a shift moves the whole segment,
+    clearing the port it leaves and dropping whatever sat on the port it
+    moves onto.
+    """
+    def __init__(self, rng: np.random.Generator, model: ErrorModel, words: np.ndarray, word_size: int) -> None:
+        self.rng = rng
+        self.model = model
+        self.n = len(words)
+        self.top = np.uint64(word_size - 1)
+        self.full = np.uint64((1 << word_size) - 1)
+        self.front = np.zeros(self.n, dtype=np.uint64)
+        self.word = words.astype(np.uint64)
+        self.back = np.zeros(self.n, dtype=np.uint64)
+
+    def _mask(self, mask: Optional[np.ndarray]) -> np.ndarray:
+        return np.ones(self.n, dtype=bool) if mask is None else mask
+
+    def _moves(self, mask: Optional[np.ndarray]):
+        """Trials shifting at least once and those shifting twice."""
+        u = self.rng.random(self.n)
+        once = self._mask(mask) & (u >= self.model.p_undershoot)
+        return once, once & (u < self.model.p_undershoot + self.model.p_overshoot)
+
+    def shift_right(self, mask: Optional[np.ndarray] = None) -> None:
+        """Shift toward AP target_word + 1."""
+        for sel in self._moves(mask):
+            self.back = np.where(sel, self.word & np.uint64(1), self.back)
+            self.word = np.where(sel, (self.word >> np.uint64(1)) | (self.front << self.top), self.word)
+            self.front = np.where(sel, np.uint64(0), self.front)
+
+    def shift_left(self, mask: Optional[np.ndarray] = None) -> None:
+        """Shift toward AP target_word."""
+        for sel in self._moves(mask):
+            self.front = np.where(sel, self.word >> self.top, self.front)
+            self.word = np.where(sel, ((self.word << np.uint64(1)) & self.full) | self.back, self.word)
+            self.back = np.where(sel, np.uint64(0), self.back)
+
+    def inject(self, mask: np.ndarray, front: bool = False) -> None:
+        ok = (mask & (self.rng.random(self.n) >= self.model.p_inject)).astype(np.uint64)
+        if front:
+            self.front |= ok
+        else:
+            self.back |= ok
+
+    def place(self, mask: np.ndarray) -> None:
+        self.back |= mask.astype(np.uint64)
+
+    def remove(self, mask: Optional[np.ndarray] = None, front: bool = False) -> None:
+        keep = ~self._mask(mask)
+        if front:
+            self.front &= keep.astype(np.uint64)
+        else:
+            self.back &= keep.astype(np.uint64)
+
+    def detect(self, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """The (possibly wrong) bits on AP target_word + 1, False outside ``mask``."""
+        flipped = self.rng.random(self.n) < self.model.p_detect
+        return self._mask(mask) & ((self.back == 1) ^ flipped)
+
+
+def _naive(seg: _Segments, stored: np.ndarray, ws: int) -> None:
+    for _ in range(ws):
+        seg.shift_right()
+        seg.remove()
+    for i in range(ws - 1, -1, -1):
+        seg.inject(((stored >> np.uint64(i)) & np.uint64(1)) == 1)
+        seg.shift_left()
+
+
+def _permute(seg: _Segments, stored: np.ndarray, ws: int) -> None:
+    seg.shift_right()
+    sky_cnt = np.zeros(seg.n, dtype=np.int64)
+    for _ in range(ws):
+        sky_cnt += seg.detect()
+        seg.shift_right()
+    for i in range(ws - 1, -1, -1):
+        seg.shift_left()
+        bit = ((stored >> np.uint64(i)) & np.uint64(1)) == 1
+        reuse = bit & (sky_cnt > 0)
+        seg.place(reuse)
+        sky_cnt -= reuse
+        seg.inject(bit & ~reuse)
+    seg.shift_left()
+
+
+def _pw_plus(seg: _Segments, stored: np.ndarray, ws: int) -> None:
+    d_popcnt = _popcount(stored).astype(np.int64)
+    d_bsr = leading_bit_index_array(stored, ws)
+
+    # Assemble until the skyrmions of the new word have been counted
+    seg.shift_right()
+    sky_cnt = np.zeros(seg.n, dtype=np.int64)
+    save_assemble = np.full(seg.n, -1, dtype=np.int64)
+    active = np.ones(seg.n, dtype=bool)
+    for i in range(ws - 1, -1, -1):
+        b = seg.detect(active)
+        seg.shift_right(active)
+        sky_cnt += b
+        done = b & (sky_cnt == d_popcnt)
+        save_assemble[done] = i - 1
+        active &= ~done
+
+    # Clear the rest of existing skyrmions, then re-permute & inject
+    clear = save_assemble < d_bsr
+    for j in range(int(save_assemble.max(initial=-1)) + 1):
+        m = clear & (j <= save_assemble)
+        seg.shift_right(m)
+        seg.remove(m)
+    first = np.where(clear, d_bsr, 0)
+    for i in range(ws):
+        m = first <= i
+        seg.shift_left(m)
+        bit = m & (((stored >> np.uint64(ws - 1 - i)) & np.uint64(1)) == 1)
+        reuse = bit & (sky_cnt > 0)
+        seg.place(reuse)
+        sky_cnt -= reuse
+        seg.inject(bit & ~reuse)
+        seg.remove(m & ~clear, front=True)
+    seg.shift_left()
+    seg.remove(front=True)
+
+
+_WRITES = {"naive": _naive, "pw": _permute, "pw_plus": _pw_plus}
+
+
+def _read(seg: _Segments, ws: int) -> np.ndarray:
+    """Non-destructive read: the word comes out last bit first."""
+    word = np.zeros(seg.n, dtype=np.uint64)
+    for i in range(ws):
+        seg.shift_right()
+        b = seg.detect()
+        word |= b.astype(np.uint64) << np.uint64(i)
+        seg.remove(b)
+        seg.inject(b, front=True)
+    seg.shift_right()
+    return word
+
+
+def _trials(strategy: str, precision: str, model: ErrorModel, n: int, seed: np.random.SeedSequence):
+    rng = np.random.default_rng(seed)
+    width = precision_width(precision)
+    patterns = rng.integers(0, (1 << width) - 1, size=n, dtype=np.uint64, endpoint=True)
+    old = rng.integers(0, (1 << width) - 1, size=n, dtype=np.uint64, endpoint=True)
+
+    stored, old_stored, ws = patterns, old, width
+    if strategy == "pw_plus":
+        stored, old_stored, ws = flip_bits_array(patterns, width), flip_bits_array(old, width), width + 1
+
+    seg = _Segments(rng, model, old_stored, ws)
+    _WRITES[strategy](seg, stored, ws)
+    word = _read(seg, ws)
+
+    if strategy == "pw_plus":
+        flipped = (word >> np.uint64(width)) & np.uint64(1)
+        word = (word ^ (flipped * np.uint64((1 << width) - 1))) & np.uint64((1 << width) - 1)
+    wrong = _popcount(word ^ patterns)
+    return int(wrong.sum()), int((wrong > 0).sum())
+
+
+def monte_carlo(strategy: str, model: ErrorModel, trials: int, precision: str = "single",
+                seed: Optional[int] = None, max_workers: Optional[int] = None,
+                chunk_size: int = DEFAULT_CHUNK_SIZE) -> ReliabilityResult:
+    """Bit and word error rates of ``trials`` write-then-read trials of one strategy.
+
+    ``max_workers=0`` runs the chunks in this process.
+    """
+    if strategy not in ("naive", "pw", "pw_plus"):
+        raise ArgumentError("Invalid update strategy.")
+    try:
+        width = precision_width(precision)
+    except ValueError:
+        raise ArgumentError("Invalid precision.")
+    if strategy == "pw_plus" and width > 32:
+        raise ArgumentError("pw_plus words of double-precision values do not fit the vectorized model.")
+    if trials < 0 or chunk_size < 1:
+        raise ArgumentError("trials must not be negative and chunk_size must be positive.")
+
+    sizes = [chunk_size] * (trials // chunk_size) + ([trials % chunk_size] if trials % chunk_size else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(strategy, precision, model, size, child) for size, child in zip(sizes, seeds)]
+    if max_workers == 0 or len(jobs) < 2:
+        outcomes = [_trials(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            outcomes = list(pool.map(_trials, *zip(*jobs)))
+
+    return ReliabilityResult(
+        strategy, trials, trials * width,
+        sum(bit_errors for bit_errors, _ in outcomes),
+        sum(word_errors for _, word_errors in outcomes),
+    )
+
+
+def compare_strategies(model: ErrorModel, trials: int, strategies: Iterable[str] = ("naive", "pw", "pw_plus"),
+                       **kwargs) -> Dict[str, ReliabilityResult]:
+    """``monte_carlo`` of every strategy under the same model and seed."""
+    return {strategy: monte_carlo(strategy, model, trials, **kwargs) for strategy in strategies}
@@ -1,20 +1,118 @@
+import math
 import struct
 
+try:
+    popcount = int.bit_count  # Python 3.10+
+except AttributeError:  # pragma: no cover
+    def popcount(x: int) -> int:
+        return bin(x).count("1")
+
+# precision -> (struct format, bit width, NumPy float dtype, NumPy uint dtype)
+PRECISIONS = {
+    "half": ('!e', 16, "float16", "uint16"),
+    "single": ('!f', 32, "float32", "uint32"),
+    "double": ('!d', 64, "float64", "uint64"),
+}
+
+_uint = {16: struct.Struct('!H'), 32: struct.Struct('!I'), 64: struct.Struct('!Q')}
+_pack = {name: struct.Struct(fmt).pack for name, (fmt, _, _, _) in PRECISIONS.items()}
+_unpack = {name: _uint[width].unpack for name, (_, width, _, _) in PRECISIONS.items()}
+_pack_uint = {name: _uint[width].pack for name, (_, width, _, _) in PRECISIONS.items()}
+_unpack_float = {name: struct.Struct(fmt).unpack for name, (fmt, _, _, _) in PRECISIONS.items()}
+
+def precision_width(precision: str) -> int:
+    if precision not in PRECISIONS:
+        raise ValueError("Precision should be 'half', 'single' or 'double'.")
+    return PRECISIONS[precision][1]
+
 def convert_float_to_ieee754_single(number: float, flip_bit: bool = False, precision:str = "single"):
-    if precision == "single":
-        # 32-bit IEEE 754
-        packed = struct.pack('!f', number)
-        bit_string = ''.join(f"{byte:08b}" for byte in packed)
-    # elif precision == "double":
-    #     # 64-bit IEEE 754
-    #     packed = struct.pack('!d', number)
-    #     bit_string = ''.join(f"{byte:08b}" for byte in packed)
-    # else:
-    #     raise ValueError("Precision should be 'single' or 'double.'")
-
-    return bit_string if flip_bit == False else flip_ieee754(bit_string)
+    width = precision_width(precision)
+    bit_string = format(float_to_bits(number, precision), "0%db" % width)
+
+    return bit_string if flip_bit == False else flip_ieee754(bit_string, width)
 
 def flip_ieee754(ieee754: str, word_size: int = 32):
     if ieee754.count("1") > (word_size / 2):
         return "1" + ieee754.translate(str.maketrans("01", "10"))
-    return "0" + ieee754
\ No newline at end of file
+    return "0" + ieee754
+
+# ---------- Integer form (no strings) ----------
+def float_to_bits(number: float, precision: str = "single") -> int:
+    """Integer form of convert_float_to_ieee754_single (the MSB is the sign bit).
+
+    Values out of the range of ``precision`` round to +-inf, as in ``floats_to_bits``.
+    """
+    try:
+        return _unpack[precision](_pack[precision](number))[0]
+    except OverflowError:
+        return _unpack[precision](_pack[precision](math.copysign(math.inf, number)))[0]
+
+def bits_to_float(bits: int, precision: str = "single") -> float:
+    """Inverse of float_to_bits."""
+    return _unpack_float[precision](_pack_uint[precision](bits))[0]
+
+def unflip_bits(bits: int, word_size: int = 32) -> int:
+    """Inverse of flip_bits: drop the flip bit, inverting the word when it is set."""
+    mask = (1 << word_size) - 1
+    return (bits & mask) ^ mask if (bits >> word_size) & 1 else bits & mask
+
+def flip_bits(bits: int, word_size: int = 32) -> int:
+    """Integer form of flip_ieee754: the flip bit is bit `word_size`."""
+    if popcount(bits) > (word_size / 2):
+        return (1 << word_size) | (~bits & ((1 << word_size) - 1))
+    return bits
+
+def leading_bit_index(bits: int, width: int) -> int:
+    """Position of the first '1' of the `width`-bit string of `bits` (str.find('1')), -1 if none."""
+    return width - bits.bit_length() if bits else -1
+
+# ---------- NumPy array form ----------
+def floats_to_bits(values, precision: str = "single"):
+    """Bit patterns of a whole array as uint16/uint32/uint64 (a view when no conversion is needed).
+
+    Values out of the range of ``precision`` round to +-inf.
+    """
+    import numpy as np
+
+    _, _, float_dtype, uint_dtype = PRECISIONS[precision]
+    with np.errstate(over="ignore"):
+        return np.asarray(values, dtype=float_dtype).view(uint_dtype)
+
+def popcount_array(bits):
+    """Population count of every element of an unsigned integer array (up to 64 bits)."""
+    import numpy as np
+
+    x = np.asarray(bits).astype(np.uint64)
+    x = x - ((x >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    x = (x & np.uint64(0x3333333333333333)) + ((x >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    x = (x + (x >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return ((x * np.uint64(0x0101010101010101)) >> np.uint64(56)).astype(np.int64)
+
+def bit_length_array(bits):
+    """int.bit_length of every element of an unsigned integer array (up to 64 bits)."""
+    import numpy as np
+
+    x = np.asarray(bits).astype(np.uint64)
+    length = np.zeros(x.shape, dtype=np.int64)
+    for step in (32, 16, 8, 4, 2, 1):
+        high = (x >> np.uint64(step)) != 0
+        length += np.where(high, step, 0)
+        x = np.where(high, x >> np.uint64(step), x)
+    return length + (x != 0)
+
+def leading_bit_index_array(bits, width: int):
+    """leading_bit_index of every element of an unsigned integer array."""
+    import numpy as np
+
+    bits = np.asarray(bits)
+    return np.where(bits != 0, width - bit_length_array(bits), -1)
+
+def flip_bits_array(bits, word_size: int = 32):
+    """flip_bits of every element, as uint64 with the flip bit at bit `word_size` (< 64)."""
+    import numpy as np
+
+    if word_size > 63:
+        raise ValueError("The flip-encoded form of %d-bit words does not fit in uint64." % word_size)
+    x = np.asarray(bits).astype(np.uint64)
+    inverted = np.uint64(1 << word_size) | (~x & np.uint64((1 << word_size) - 1))
+    return np.where(popcount_array(x) > word_size / 2, inverted, x)
@@ -0,0 +1,227 @@
+"""Strategy registry and compiled operation plans.
+
+A write strategy only ever works on the segment ``[AP target_word ..
+AP target_word + 1]`` of its target word, so one write is fully described by
+the sequence of primitive operations it performs on the two ports of that
+segment. A *plan* is that sequence as ``bytes``, one code per operation:
+
+- ``op << 1 | port`` for ``INJECT``, ``DETECT``, ``REMOVE``, ``SHIFT`` and
+  ``PLACE`` (a skyrmion moved onto a port, not counted), where ``port`` 0 is
+  AP target_word and 1 is AP target_word + 1; a shift starts at that port
+  and moves toward the other one;
+- ``CHARGE + kind`` for an operation that is only counted (``kind`` in the
+  ``(inject, detect, remove, shift)`` order), as the pw strategies do for
+  the skyrmions left over at the end of a write.
+
+A plan depends on the old segment (through what is detected) and on the
+pattern written (the code word of the value under the instance's encoding),
+and a recorded one on the precision and encoding it was recorded with, so
+``Strategy.plans``, a ``TransitionCache`` shared by every instance, maps
+``(word_size, width, precision, encoding, old segment, pattern)`` to a plan
+and its counts.
+``execute`` applies a plan to the segment in one pass over its codes and
+adds its counts to the instance counters; when a tracer, error model, wear
+tracker or fork shadows the primitives, it runs every operation through
+them instead.
+
+Strategies are registered by name with ``register``. A strategy gives either
+a ``planner(segment, word_size, pattern, width)`` that emits plans directly,
+or a bit-level ``write_fn(skrm, number, target_word, track)`` over the
+primitives, which is recorded into plans on a one-word scratch instance.
+naive, pw and pw_plus are registered with their bit-level writes, so
+``SKRM(strategy=..., engine='plan')`` runs them through the same engine as
+any registered strategy, and ``SKRM(strategy=name)`` accepts every
+registered name.
+"""
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Tuple
+
+from .argument_error import ArgumentError
+from .cache import TransitionCache
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .skrm import SKRM, WriteFn
+
+
+INJECT, DETECT, REMOVE, SHIFT, PLACE = range(5)
+CHARGE = 16
+_COUNTERS = ("inject_count", "detect_count", "remove_count", "shift_count")
+
+DEFAULT_PLAN_BYTES = 1 << 22
+
+Planner = Callable[[int, int, int, int], bytes]
+Counts = Tuple[int, int, int, int]
+
+
+@dataclass
+class Strategy:
+    """A registered strategy; ``flip_bit`` words hold a flip-encoded pattern one bit wider, as pw_plus."""
+    name: str
+    write_fn: Optional["WriteFn"] = None
+    planner: Optional[Planner] = None
+    flip_bit: bool = False
+    plans: TransitionCache = field(default_factory=lambda: TransitionCache(DEFAULT_PLAN_BYTES))
+    _scratch: Dict[Tuple[int, str, str], "SKRM"] = field(default_factory=dict, repr=False)
+
+
+REGISTRY: Dict[str, Strategy] = {}
+
+
+def register(name: str, write_fn: Optional["WriteFn"] = None, planner: Optional[Planner] = None,
+             flip_bit: bool = False, plan_bytes: int = DEFAULT_PLAN_BYTES) -> Strategy:
+    """Register a strategy under ``name``; give exactly one of ``write_fn`` and ``planner``."""
+    if (write_fn is None) == (planner is None):
+        raise ArgumentError("A strategy needs either a write_fn or a planner.")
+    if name in REGISTRY or name == "adaptive":
+        raise ArgumentError("Strategy %r is already registered." % name)
+    strategy = Strategy(name, write_fn, planner, flip_bit, TransitionCache(plan_bytes))
+    REGISTRY[name] = strategy
+    return strategy
+
+
+def unregister(name: str) -> None:
+    if name in ("naive", "pw", "pw_plus"):
+        raise ArgumentError("The built-in strategies can not be unregistered.")
+    REGISTRY.pop(name, None)
+
+
+def counts(plan: bytes) -> Counts:
+    """``(inject, detect, remove, shift)`` counts of a plan."""
+    return tuple(plan.count(kind << 1) + plan.count(kind << 1 | 1) + plan.count(CHARGE + kind)
+                 for kind in (INJECT, DETECT, REMOVE, SHIFT))
+
+
+def apply(plan: bytes, segment: int, word_size: int) -> int:
+    """The segment left by running ``plan`` on ``segment`` (AP target_word is the MSB)."""
+    front = 1 << (word_size + 1)
+    mask = (front << 1) - 1
+    for code in plan:
+        if code >= CHARGE or code >> 1 == DETECT:
+            continue
+        op = code >> 1
+        bit = 1 if code & 1 else front
+        if op == SHIFT:
+            segment = (segment << 1) & mask if code & 1 else segment >> 1
+        elif op == REMOVE:
+            segment &= ~bit
+        else:
+            segment |= bit
+    return segment
+
+
+def _scratch(strategy: Strategy, skrm: "SKRM") -> "SKRM":
+    """One-word instance whose primitives append their codes to ``scratch._plan``."""
+    from .skrm import SKRM
+
+    key = (skrm.word_size, skrm.precision, skrm.encoding)
+    scratch = strategy._scratch.get(key)
+    if scratch is not None:
+        return scratch
+    scratch = SKRM(skrm.word_size - strategy.flip_bit, 1, 1, strategy.name, num_overhead=1,
+                   precision=skrm.precision, encoding=skrm.encoding)
+    plan = scratch._plan = bytearray()
+    inject, detect, remove, shift, place = scratch._inject, scratch._detect, scratch._remove, scratch._shift, scratch._place
+
+    def record_inject(ap: int, track: int = 0):
+        plan.append(INJECT << 1 | ap)
+        inject(ap, track)
+
+    def record_detect(ap: int, track: int = 0):
+        plan.append(DETECT << 1 | ap)
+        return detect(ap, track)
+
+    def record_remove(ap: int, track: int = 0):
+        plan.append(REMOVE << 1 | ap)
+        remove(ap, track)
+
+    def record_shift(start_ap: int, end_ap: int, track: int = 0):
+        plan.append(SHIFT << 1 | start_ap)
+        shift(start_ap, end_ap, track)
+
+    def record_place(ap: int, track: int = 0):
+        plan.append(PLACE << 1 | ap)
+        place(ap, track)
+
+    scratch.inject, scratch.detect, scratch.remove, scratch.shift = record_inject, record_detect, record_remove, record_shift
+    scratch._place = record_place
+    strategy._scratch[key] = scratch
+    return scratch
+
+
+def record(strategy: Strategy, skrm: "SKRM", number: float, segment: int) -> bytes:
+    """The plan of ``strategy.write_fn`` writing ``number`` over ``segment``."""
+    scratch = _scratch(strategy, skrm)
+    scratch._store_segment(segment, 0, 0)
+    scratch.inject_count = scratch.detect_count = scratch.remove_count = scratch.shift_count = 0
+    del scratch._plan[:]
+    strategy.write_fn(scratch, number, 0, 0)
+    plan = bytes(scratch._plan)
+    # Operations only charged to the counters
+    charged = (scratch.inject_count, scratch.detect_count, scratch.remove_count, scratch.shift_count)
+    extra = b"".join(bytes([CHARGE + kind]) * (total - seen)
+                     for kind, (total, seen) in enumerate(zip(charged, counts(plan))))
+    return plan + extra
+
+
+def execute(skrm: "SKRM", plan: bytes, target_word: int, track: int = 0, plan_counts: Optional[Counts] = None) -> None:
+    """Run ``plan`` on word ``target_word``: in one pass over the segment, or through hooked primitives."""
+    if "inject" in skrm.__dict__ or "detect" in skrm.__dict__ or "remove" in skrm.__dict__ or "shift" in skrm.__dict__:
+        ports = (target_word, target_word + 1)
+        for code in plan:
+            if code >= CHARGE:
+                name = _COUNTERS[code - CHARGE]
+                setattr(skrm, name, getattr(skrm, name) + 1)
+                continue
+            op, port = code >> 1, code & 1
+            if op == SHIFT:
+                skrm.shift(ports[port], ports[1 - port], track)
+            elif op == PLACE:
+                skrm._place(ports[port], track)
+            else:
+                (skrm.inject, skrm.detect, skrm.remove)[op](ports[port], track)
+        return
+
+    skrm._store_segment(apply(plan, skrm._read_segment(target_word, track), skrm.word_size), target_word, track)
+    inject, detect, remove, shift = plan_counts if plan_counts is not None else counts(plan)
+    skrm.inject_count += inject
+    skrm.detect_count += detect
+    skrm.remove_count += remove
+    skrm.shift_count += shift
+
+
+def plan_for(skrm: "SKRM", number: float, target_word: int, track: int = 0) -> Tuple[bytes, Counts]:
+    """The (cached) plan of writing ``number`` to ``target_word`` with ``skrm``'s strategy, and its counts."""
+    strategy = REGISTRY[skrm.strategy]
+    pattern = skrm._pattern(number)
+    segment = skrm._read_segment(target_word, track)
+    key = (skrm.word_size, skrm.pattern_width, skrm.precision, skrm.encoding, segment, pattern)
+    entry = strategy.plans.get(key)
+    if entry is not None:
+        return entry
+    if strategy.planner is not None:
+        plan = bytes(strategy.planner(segment, skrm.word_size, pattern, skrm.pattern_width))
+    else:
+        plan = record(strategy, skrm, number, segment)
+    entry = (plan, counts(plan))
+    strategy.plans.put(key, entry)
+    return entry
+
+
+def plan_write(skrm: "SKRM", number: float, target_word: int, track: int = 0) -> None:
+    if target_word < 0 or target_word > skrm.num_words - 1:
+        raise ArgumentError("Target word must be must be between 0 and (num_words - 1).")
+    if track < 0 or track > skrm.num_racetrack - 1:
+        raise ArgumentError("Track must be between 0 and (num_racetrack - 1).")
+    plan, plan_counts = plan_for(skrm, number, target_word, track)
+    execute(skrm, plan, target_word, track, plan_counts)
+
+
+def _register_builtins() -> None:
+    from .skrm import SKRM
+
+    for name, write_fn, flip_bit in (("naive", SKRM.naive_write, False), ("pw", SKRM.permutation_write, False),
+                                     ("pw_plus", SKRM.pw_plus, True)):
+        REGISTRY[name] = Strategy(name, write_fn, flip_bit=flip_bit)
+
+
+_register_builtins()
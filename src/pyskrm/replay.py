@@ -0,0 +1,328 @@
+"""Batched trace replay with NumPy-vectorized cost accounting.
+
+``SKRM.replay(values, targets)`` is the batch counterpart of calling
+``SKRM.write`` once per ``(value, target_word)`` pair. The words the batch
+touches are gathered from the storage into a packed ``uint64`` array, so the
+counts of every write in the batch follow from the closed forms in
+``analytic.py`` evaluated on whole arrays at once, and the final contents are
+scattered back: a batch costs time and memory in proportion to its length,
+not to the size of the instance.
+
+Whenever a skyrmion sitting on an access port could leak into a word (which
+never happens with storage produced by the write strategies on their own
+natural word size), or words or patterns do not fit in 64 bits (e.g. the
+65-bit flip-encoded double-precision pattern of pw_plus), the batch is replayed
+through the scalar closed forms one write at a time instead. So is the
+adaptive strategy, whose every pick depends on the previous write, and so
+is every batch written to the sparse layout. Instances with differential
+writes replay every write through ``SKRM.differential_write``, and instances
+whose primitives are shadowed (error models, tracers, wear trackers) through
+the bit-level strategy, so that every operation reaches the hooks.
+"""
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from . import analytic
+from .argument_error import ArgumentError
+from .ieee754 import bit_length_array as _bit_length
+from .ieee754 import flip_bits, flip_bits_array, floats_to_bits, precision_width
+from .ieee754 import popcount_array as _popcount
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .skrm import SKRM
+
+
+_CLOSED_FORMS = {
+    "naive": analytic.naive_write,
+    "pw": analytic.permutation_write,
+    "pw_plus": analytic.pw_plus,
+}
+
+
+@dataclass
+class ReplayResult:
+    """Per-write operation counts and costs of a replayed batch.
+
+    ``counts`` has one row per write with the columns
+    ``(inject, detect, remove, shift)``.
+    """
+    counts: np.ndarray
+    latency: np.ndarray
+    energy: np.ndarray
+
+    @property
+    def totals(self) -> np.ndarray:
+        return self.counts.sum(axis=0)
+
+    @property
+    def total_latency(self) -> float:
+        return float(self.latency.sum())
+
+    @property
+    def total_energy(self) -> float:
+        return float(self.energy.sum())
+
+
+def _low_mask(length: np.ndarray) -> np.ndarray:
+    """``(1 << length) - 1`` for lengths in [0, 63]."""
+    return (np.uint64(1) << length.astype(np.uint64)) - np.uint64(1)
+
+
+def _select(x: np.ndarray, rank: np.ndarray) -> np.ndarray:
+    """Vectorized analytic._select: index of the ``rank``-th lowest set bit."""
+    lo = np.zeros(x.shape, dtype=np.int64)
+    hi = np.maximum(_bit_length(x) - 1, 0)
+    while (lo < hi).any():
+        mid = (lo + hi) >> 1
+        below = _popcount(x & _low_mask(mid + 1)) < rank
+        lo = np.where(below & (lo < hi), mid + 1, lo)
+        hi = np.where(~below & (lo < hi), mid, hi)
+    return lo
+
+
+def _counts(strategy: str, word_size: int, old: np.ndarray, patterns: np.ndarray, width: int) -> np.ndarray:
+    """Closed-form (inject, detect, remove, shift) counts for a batch of writes."""
+    n = len(patterns)
+    counts = np.empty((n, 4), dtype=np.int64)
+    d_popcnt = _popcount(patterns)
+
+    if strategy == "naive":
+        counts[:, 0] = d_popcnt
+        counts[:, 1] = 0
+        counts[:, 2] = word_size
+        counts[:, 3] = word_size + width
+    elif strategy == "pw":
+        sky_cnt = _popcount(old)
+        extra = np.maximum(0, sky_cnt - d_popcnt)
+        counts[:, 0] = np.maximum(0, d_popcnt - sky_cnt)
+        counts[:, 1] = word_size
+        counts[:, 2] = extra
+        counts[:, 3] = word_size + width + 2 + extra
+    else:
+        old_popcnt = _popcount(old)
+        d_bsr = np.where(patterns != 0, width - _bit_length(patterns), -1)
+
+        # Assemble
+        found = (d_popcnt > 0) & (old_popcnt >= d_popcnt)
+        last = np.where(found, _select(np.where(found, old, np.uint64(0)), d_popcnt), 0)
+        steps = np.where(found, last + 1, word_size)
+        sky_cnt = np.where(found, d_popcnt, old_popcnt)
+        save_assemble = np.where(found, word_size - 2 - last, -1)
+
+        # Clear the rest of existing Skyrmions
+        clear = save_assemble < d_bsr
+        cleared = np.where(clear, save_assemble + 1, 0)
+        idx_leftmost_bit = np.where(clear, d_bsr, 0)
+
+        # Re-permute & inject
+        length = np.maximum(0, word_size - idx_leftmost_bit)
+        written = (patterns >> np.uint64(width - word_size)) & _low_mask(length)
+        counts[:, 0] = np.maximum(0, _popcount(written) - sky_cnt)
+        counts[:, 1] = steps
+        counts[:, 2] = cleared + np.where(clear, 0, length) + 1
+        counts[:, 3] = steps + 1 + cleared + length + 1
+    return counts
+
+
+def _gather_bits(buffer: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    """The storage bits at ``positions`` (big-endian bit order)."""
+    return (buffer[positions >> 3] >> (7 - (positions & 7)).astype(np.uint8)) & np.uint8(1)
+
+
+def _scatter_bits(buffer: np.ndarray, positions: np.ndarray, values: np.ndarray) -> None:
+    """Set the storage bits at ``positions`` (ascending, distinct) to ``values``, a byte at a time."""
+    if not len(positions):
+        return
+    index = positions >> 3
+    masks = (np.uint8(0x80) >> (positions & 7).astype(np.uint8)).astype(np.uint8)
+    starts = np.flatnonzero(np.concatenate(([True], index[1:] != index[:-1])))
+    clear = np.bitwise_or.reduceat(masks, starts)
+    ones = np.bitwise_or.reduceat(masks * values.astype(np.uint8), starts)
+    index = index[starts]
+    buffer[index] = (buffer[index] & ~clear) | ones
+
+
+def _replay_vectorized(skrm: "SKRM", patterns: np.ndarray, targets: np.ndarray, tracks: np.ndarray, width: int) -> np.ndarray:
+    ws = skrm.word_size
+    buffer = np.frombuffer(memoryview(skrm.storage), dtype=np.uint8)
+
+    # The new contents of a word depend on the written pattern only: naive and
+    # pw keep its last `ws` bits, pw_plus writes its first `ws` bits
+    if skrm.strategy == "pw_plus":
+        new_words = patterns >> np.uint64(width - ws)
+    else:
+        new_words = patterns & np.uint64((1 << ws) - 1)
+
+    # The old contents are those left by the previous write to the same word
+    targets = tracks.astype(np.int64) * skrm.num_words + targets
+    tracks = tracks.astype(np.int64)
+    order = np.argsort(targets, kind="stable")
+    sorted_targets = targets[order]
+    sorted_new = new_words[order]
+    first = np.ones(len(targets), dtype=bool)
+    first[1:] = sorted_targets[1:] != sorted_targets[:-1]
+
+    # Only the words the batch touches are read (MSB first) and written back,
+    # in ascending storage order
+    touched = sorted_targets[first]
+    track_of, word_of = np.divmod(touched, skrm.num_words)
+    first_bit = skrm.track_length * track_of + (ws + 1) * (word_of + 1)
+    positions = (first_bit[:, None] + np.arange(ws)).ravel()
+    weights = np.uint64(1) << np.arange(ws - 1, -1, -1, dtype=np.uint64)
+    words = (_gather_bits(buffer, positions).reshape(-1, ws).astype(np.uint64) * weights).sum(axis=1, dtype=np.uint64)
+
+    sorted_old = np.empty_like(sorted_new)
+    sorted_old[first] = words
+    sorted_old[~first] = sorted_new[:-1][~first[1:]]
+    old = np.empty_like(sorted_old)
+    old[order] = sorted_old
+
+    counts = _counts(skrm.strategy, ws, old, patterns, width)
+
+    # Write the final contents of every touched word back into storage
+    last = np.ones(len(targets), dtype=bool)
+    last[:-1] = first[1:]
+    final = sorted_new[last]
+    _scatter_bits(buffer, positions, ((final[:, None] & weights) != 0).ravel())
+
+    # A write clears AP (target + 1); AP target keeps its skyrmion, is cleared
+    # (pw_plus, or a pattern narrower than the word) or receives the bit of a
+    # pattern wider than the word. The last write touching a port wins.
+    if skrm.strategy == "pw_plus" or width < ws:
+        front = np.zeros(len(targets), dtype=np.uint8)
+    else:
+        front = ((patterns >> np.uint64(ws)) & np.uint64(1)).astype(np.uint8)
+    ports = np.concatenate([targets + 1, targets]) + np.concatenate([tracks, tracks])
+    values = np.concatenate([np.zeros(len(targets), dtype=np.uint8), front])
+    time = np.concatenate([np.arange(len(targets)), np.arange(len(targets))])
+    if width == ws and skrm.strategy != "pw_plus":
+        ports, values, time = ports[:len(targets)], values[:len(targets)], time[:len(targets)]
+    order = np.lexsort((time, ports))
+    ports, values = ports[order], values[order]
+    latest = np.ones(len(ports), dtype=bool)
+    latest[:-1] = ports[1:] != ports[:-1]
+    port_track, port = np.divmod(ports[latest], skrm.num_words + 1)
+    _scatter_bits(buffer, skrm.track_length * port_track + ws + (ws + 1) * port, values[latest])
+    return counts
+
+
+def _replay_scalar(skrm: "SKRM", patterns: np.ndarray, targets: np.ndarray, tracks: np.ndarray, width: int) -> np.ndarray:
+    write = _CLOSED_FORMS[skrm.strategy]
+    counts = np.empty((len(targets), 4), dtype=np.int64)
+    for i, (pattern, target, track) in enumerate(zip(patterns.tolist(), targets.tolist(), tracks.tolist())):
+        counts[i] = skrm._write_analytic(write, pattern, width, target, track)
+    return counts
+
+
+def _replay_adaptive(skrm: "SKRM", patterns: np.ndarray, targets: np.ndarray, tracks: np.ndarray) -> np.ndarray:
+    # Every pick depends on the word contents left by the previous write
+    counts = np.empty((len(targets), 4), dtype=np.int64)
+    for i, (pattern, target, track) in enumerate(zip(patterns.tolist(), targets.tolist(), tracks.tolist())):
+        counts[i] = skrm._write_adaptive(pattern, target, track)
+    return counts
+
+
+def _replay_writes(skrm: "SKRM", values: np.ndarray, targets: np.ndarray, tracks: np.ndarray) -> np.ndarray:
+    """One ``write`` per record, through the differential write or the strategy."""
+    from .skrm import DISPATCH
+
+    if skrm.differential is not None:
+        write = skrm.differential_write
+    else:
+        write = getattr(skrm, DISPATCH[skrm.strategy].__name__)
+    counts = np.empty((len(targets), 4), dtype=np.int64)
+    for i, (number, target, track) in enumerate(zip(values.tolist(), targets.tolist(), tracks.tolist())):
+        before = (skrm.inject_count, skrm.detect_count, skrm.remove_count, skrm.shift_count)
+        write(number, target, track)
+        counts[i] = (skrm.inject_count - before[0], skrm.detect_count - before[1],
+                     skrm.remove_count - before[2], skrm.shift_count - before[3])
+    return counts
+
+
+def _vectorizable(skrm: "SKRM", width: int) -> bool:
+    """Whether the counts and new contents of a write depend on old word contents only."""
+    if skrm.layout == "sparse":
+        return False  # the packed word array would be as large as the dense storage
+    if skrm.word_size >= 64 or width > 64:
+        return False
+    if skrm.strategy != "pw_plus" and width >= skrm.word_size:
+        return True
+    if skrm.strategy == "pw_plus" and width < skrm.word_size:
+        return False
+    for track in range(skrm.num_racetrack):
+        start = skrm.track_length * track + skrm.word_size
+        if skrm.storage[start:start + (skrm.word_size + 1) * (skrm.num_words + 1):skrm.word_size + 1].any():
+            return False
+    return True
+
+
+def _as_index(a) -> np.ndarray:
+    """Integer index array; signed or narrow unsigned arrays (e.g. memory-mapped uint32) are not copied."""
+    a = np.asarray(a).ravel()
+    if a.dtype.kind == "i" or (a.dtype.kind == "u" and a.dtype.itemsize < 8):
+        return a
+    return a.astype(np.int64)
+
+
+def replay(skrm: "SKRM", values, targets, tracks=None) -> ReplayResult:
+    """Replay ``skrm.write(values[i], targets[i], tracks[i])`` for every i and account the costs.
+
+    ``values``, ``targets`` and ``tracks`` (all on racetrack 0 when omitted)
+    may be NumPy arrays, memoryviews or any sequence; values are stored in
+    the IEEE-754 precision of ``skrm``. The built-in
+    strategy named by ``skrm.strategy`` (through ``differential_write`` when
+    ``skrm.differential`` is set, bit-level when its primitives are hooked) is replayed, storage and counters are
+    updated exactly as the equivalent loop of writes would.
+    """
+    if skrm.strategy not in _CLOSED_FORMS and skrm.strategy != "adaptive":
+        raise ArgumentError("Replay needs a built-in strategy.")
+    patterns = floats_to_bits(values, skrm.precision).ravel().astype(np.uint64)
+    if skrm._encoder is not None:
+        patterns = skrm._encoder.encode_array(patterns, precision_width(skrm.precision))
+    targets = _as_index(targets)
+    if len(patterns) != len(targets):
+        raise ArgumentError("values and targets must have the same length.")
+    if len(targets) and (targets.min() < 0 or targets.max() > skrm.num_words - 1):
+        raise ArgumentError("Target word must be must be between 0 and (num_words - 1).")
+    if tracks is None:
+        tracks = np.zeros(len(targets), dtype=np.int64)
+    else:
+        tracks = _as_index(tracks)
+        if len(tracks) != len(targets):
+            raise ArgumentError("values and tracks must have the same length.")
+        if len(tracks) and (tracks.min() < 0 or tracks.max() > skrm.num_racetrack - 1):
+            raise ArgumentError("Track must be between 0 and (num_racetrack - 1).")
+
+    hooked = "inject" in skrm.__dict__ or "detect" in skrm.__dict__ or "remove" in skrm.__dict__ or "shift" in skrm.__dict__
+    if skrm.differential is not None or hooked:
+        # A differential write depends on the word it finds; hooked primitives must see every operation
+        counts = _replay_writes(skrm, np.asarray(values, dtype=np.float64).ravel(), targets, tracks)
+        latency, energy = skrm.cost_model.price_matrix(counts)
+        return ReplayResult(counts, latency, energy)
+
+    width = skrm.pattern_width
+    if skrm.strategy == "pw_plus" and width < 64:
+        patterns = flip_bits_array(patterns, width)
+        width += 1
+    elif skrm.strategy == "pw_plus":
+        patterns = np.array([flip_bits(p, width) for p in patterns.tolist()], dtype=object)
+        width += 1
+
+    if skrm.strategy == "adaptive":
+        counts = _replay_adaptive(skrm, patterns, targets, tracks)
+    elif len(targets) == 0:
+        counts = np.zeros((0, 4), dtype=np.int64)
+    elif _vectorizable(skrm, width):
+        counts = _replay_vectorized(skrm, patterns, targets, tracks, width)
+        totals = counts.sum(axis=0).tolist()
+        skrm.inject_count += totals[0]
+        skrm.detect_count += totals[1]
+        skrm.remove_count += totals[2]
+        skrm.shift_count += totals[3]
+    else:
+        counts = _replay_scalar(skrm, patterns, targets, tracks, width)
+
+    latency, energy = skrm.cost_model.price_matrix(counts)
+    return ReplayResult(counts, latency, energy)
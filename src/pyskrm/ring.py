@@ -0,0 +1,105 @@
+"""Offset-based storage for the shift domain (``SKRM(layout='ring')``).
+
+Every word is a circular buffer of ``word_size`` cells with a head offset,
+and the access ports are kept in a separate array. Shifting one segment
+``[AP k, word k, AP k + 1]`` by one position moves the head and rewrites
+two cells, so it costs the same whatever the word size; a shift across
+``n`` segments costs ``n`` such steps.
+
+The flat ``bitarray`` stays the layout everyone else sees. ``RingStorage``
+is loaded from it before the first ring operation and written back into it
+when ``SKRM.storage`` is accessed (see ``SKRM.storage``); the overhead
+regions, which shifts never touch, are only kept in the flat array.
+"""
+from bitarray import bitarray
+
+
+class RingStorage:
+    def __init__(self, word_size: int, num_words: int, num_racetrack: int, track_length: int) -> None:
+        self.word_size = word_size
+        self.num_words = num_words
+        self.num_racetrack = num_racetrack
+        self.track_length = track_length
+        self.aps = bytearray(num_racetrack * (num_words + 1))
+        self.cells = bytearray(num_racetrack * num_words * word_size)
+        self.heads = [0] * (num_racetrack * num_words)
+
+    def load(self, storage: bitarray) -> None:
+        """Take the access ports and words from the flat layout; all heads are reset to 0."""
+        ws = self.word_size
+        for track in range(self.num_racetrack):
+            base = self.track_length * track
+            for ap in range(self.num_words + 1):
+                pos = base + (ws + 1) * (ap + 1) - 1
+                self.aps[track * (self.num_words + 1) + ap] = storage[pos]
+                if ap < self.num_words:
+                    cell = (track * self.num_words + ap) * ws
+                    self.cells[cell:cell + ws] = storage[pos + 1:pos + 1 + ws].unpack()
+        self.heads = [0] * len(self.heads)
+
+    def store(self, storage: bitarray) -> None:
+        """Write the access ports and words back into the flat layout."""
+        ws = self.word_size
+        for track in range(self.num_racetrack):
+            base = self.track_length * track
+            for ap in range(self.num_words + 1):
+                pos = base + (ws + 1) * (ap + 1) - 1
+                storage[pos] = self.aps[track * (self.num_words + 1) + ap]
+                if ap < self.num_words:
+                    word = track * self.num_words + ap
+                    cell, head = word * ws, self.heads[word]
+                    bits = bitarray(endian='big')
+                    bits.pack(bytes(self.cells[cell + head:cell + ws] + self.cells[cell:cell + head]))
+                    storage[pos + 1:pos + 1 + ws] = bits
+
+    def segment(self, target_word: int, track: int) -> int:
+        """The segment [AP target_word, AP target_word + 1] as an integer, as ``SKRM._read_segment``."""
+        ws = self.word_size
+        word = track * self.num_words + target_word
+        cell, head = word * ws, self.heads[word]
+        ap = track * (self.num_words + 1) + target_word
+        bits = self.cells[cell + head:cell + ws] + self.cells[cell:cell + head]
+        value = self.aps[ap]
+        for bit in bits:
+            value = (value << 1) | bit
+        return (value << 1) | self.aps[ap + 1]
+
+    def set_segment(self, segment: int, target_word: int, track: int) -> None:
+        ws = self.word_size
+        word = track * self.num_words + target_word
+        ap = track * (self.num_words + 1) + target_word
+        self.aps[ap] = (segment >> (ws + 1)) & 1
+        self.aps[ap + 1] = segment & 1
+        cell = word * ws
+        self.cells[cell:cell + ws] = bytes((segment >> (ws - j)) & 1 for j in range(ws))
+        self.heads[word] = 0
+
+    def shift(self, start_ap: int, end_ap: int, track: int) -> None:
+        """Same effect as the flat ``SKRM.shift`` between two different access ports."""
+        ws = self.word_size
+        aps, cells, heads = self.aps, self.cells, self.heads
+        ap_base = track * (self.num_words + 1)
+        word_base = track * self.num_words
+        if start_ap < end_ap:
+            # Toward the higher port: the last bit of each word moves onto the port after it
+            for k in range(end_ap - 1, start_ap - 1, -1):
+                word = word_base + k
+                head = heads[word] - 1
+                if head < 0:
+                    head += ws
+                heads[word] = head
+                i = word * ws + head
+                aps[ap_base + k + 1] = cells[i]
+                cells[i] = aps[ap_base + k]
+                aps[ap_base + k] = 0
+        else:
+            # Toward the lower port: the first bit of each word moves onto the port before it
+            for k in range(end_ap, start_ap):
+                word = word_base + k
+                head = heads[word]
+                i = word * ws + head
+                aps[ap_base + k] = cells[i]
+                cells[i] = aps[ap_base + k + 1]
+                aps[ap_base + k + 1] = 0
+                head += 1
+                heads[word] = head if head < ws else 0
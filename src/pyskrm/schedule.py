@@ -0,0 +1,180 @@
+"""Port-position-aware scheduling of access streams.
+
+The write and read strategies assume the target word already sits at its
+access ports. On a racetrack with only ``num_ports`` read/write ports per
+track, the whole track first has to be shifted so that the word lines up
+with one of them. ``ShiftScheduler`` tracks the offset of every track,
+charges ``word_size + 1`` shifts per word position the track moves, and
+picks the order in which a window of pending accesses is served:
+
+- ``'fifo'``: in order;
+- ``'nearest'``: the access needing the fewest alignment shifts;
+- ``'elevator'``: the nearest access in the direction the track last moved,
+  turning around when there is none.
+
+Accesses to the same word are never reordered among themselves. With
+``coalesce=True`` a pending write that is overwritten by a later write
+before anyone reads it is dropped.
+
+The storage keeps its port-aligned layout: alignment shifts are added to
+``shift_count`` but do not move bits.
+"""
+import copy
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .access import WRITE, Access, execute
+from .argument_error import ArgumentError
+from .skrm import SKRM
+
+
+POLICIES = ("fifo", "nearest", "elevator")
+
+
+@dataclass
+class ScheduleResult:
+    """Outcome of ``ShiftScheduler.run``.
+
+    ``order`` lists the stream indices of the executed accesses and
+    ``coalesced`` those of the dropped writes. The baseline figures come from
+    running the same stream in order on a copy of the instance.
+    """
+    order: List[int]
+    coalesced: List[int]
+    alignment_shifts: int
+    latency: float
+    energy: float
+    baseline_alignment_shifts: int
+    baseline_latency: float
+    baseline_energy: float
+    reads: List[float] = field(default_factory=list)
+
+    @property
+    def shift_savings(self) -> int:
+        return self.baseline_alignment_shifts - self.alignment_shifts
+
+    @property
+    def latency_reduction(self) -> float:
+        return self.baseline_latency - self.latency
+
+
+class ShiftScheduler:
+    def __init__(self, skrm: SKRM, num_ports: int = 1, window: int = 8, policy: str = "nearest",
+                 coalesce: bool = False) -> None:
+        if num_ports < 1 or num_ports > skrm.num_words:
+            raise ArgumentError("Number of ports must be between 1 and num_words.")
+        if window < 1:
+            raise ArgumentError("Window must be positive.")
+        if policy not in POLICIES:
+            raise ArgumentError("Policy should be 'fifo', 'nearest' or 'elevator'.")
+        self.skrm = skrm
+        self.num_ports = num_ports
+        self.window = window
+        self.policy = policy
+        self.coalesce = coalesce
+        # Word aligned with each port at offset 0
+        self.ports = [p * skrm.num_words // num_ports for p in range(num_ports)]
+        self.offsets: Dict[int, int] = {}
+        self.alignment_shifts = 0
+
+    def _alignment(self, target_word: int, track: int) -> int:
+        """Signed track movement (in words) bringing `target_word` to its nearest port."""
+        offset = self.offsets.get(track, 0)
+        return min((target_word - port - offset for port in self.ports), key=abs)
+
+    def _pick(self, pending: List[Tuple[int, Access]], directions: Dict[int, int]) -> int:
+        """Position in `pending` of the next access to serve."""
+        if self.policy == "fifo":
+            return 0
+        blocked = set()
+        best = None
+        for pos, (index, (_, _, target_word, track)) in enumerate(pending):
+            key = (track, target_word)
+            if key in blocked:
+                continue
+            blocked.add(key)
+            delta = self._alignment(target_word, track)
+            if self.policy == "elevator":
+                score = (delta * directions.get(track, 1) < 0, abs(delta), index)
+            else:
+                score = (abs(delta), index)
+            if best is None or score < best[0]:
+                best = (score, pos)
+        return best[1]
+
+    def _serve(self, access: Access) -> Tuple[int, Optional[float]]:
+        _, _, target_word, track = access
+        delta = self._alignment(target_word, track)
+        self.offsets[track] = self.offsets.get(track, 0) + delta
+        shifts = abs(delta) * (self.skrm.word_size + 1)
+        self.skrm.shift_count += shifts
+        self.alignment_shifts += shifts
+        return delta, execute(self.skrm, access)
+
+    def _run(self, accesses: Iterable[Access]):
+        order: List[int] = []
+        coalesced: List[int] = []
+        reads: List[float] = []
+        pending: List[Tuple[int, Access]] = []
+        directions: Dict[int, int] = {}
+
+        def serve_one():
+            index, access = pending.pop(self._pick(pending, directions))
+            delta, value = self._serve(access)
+            if delta:
+                directions[access[3]] = 1 if delta > 0 else -1
+            order.append(index)
+            if value is not None:
+                reads.append(value)
+
+        for index, access in enumerate(accesses):
+            if self.coalesce and access[0] == WRITE:
+                key = (access[3], access[2])
+                for pos in range(len(pending) - 1, -1, -1):
+                    if (pending[pos][1][3], pending[pos][1][2]) == key:
+                        if pending[pos][1][0] == WRITE:
+                            coalesced.append(pending.pop(pos)[0])
+                        break
+            pending.append((index, access))
+            if len(pending) >= self.window:
+                serve_one()
+        while pending:
+            serve_one()
+        return order, coalesced, reads
+
+    def run(self, accesses: Iterable[Access], compare: bool = True) -> ScheduleResult:
+        """Serve an access stream; with ``compare`` also run it in order on a copy for the baseline."""
+        accesses = list(accesses)
+        baseline = None
+        if compare:
+            baseline = ShiftScheduler(copy.deepcopy(self.skrm), self.num_ports, window=1, policy="fifo")
+            baseline.offsets = dict(self.offsets)
+
+        skrm = self.skrm
+        start = (skrm.inject_count, skrm.detect_count, skrm.remove_count, skrm.shift_count)
+        shifts_before = self.alignment_shifts
+        order, coalesced, reads = self._run(accesses)
+        latency, energy = _costs(skrm, start)
+
+        result = ScheduleResult(order, coalesced, self.alignment_shifts - shifts_before, latency, energy,
+                                0, 0.0, 0.0, reads)
+        if baseline is not None:
+            base = baseline.skrm
+            base_start = (base.inject_count, base.detect_count, base.remove_count, base.shift_count)
+            baseline._run(accesses)
+            result.baseline_alignment_shifts = baseline.alignment_shifts
+            result.baseline_latency, result.baseline_energy = _costs(base, base_start)
+        return result
+
+
+def _costs(skrm: SKRM, start: Tuple[int, int, int, int]) -> Tuple[float, float]:
+    inject = skrm.inject_count - start[0]
+    detect = skrm.detect_count - start[1]
+    remove = skrm.remove_count - start[2]
+    shift = skrm.shift_count - start[3]
+    return (
+        inject * skrm.inject_latency + detect * skrm.detect_latency +
+        remove * skrm.remove_latency + shift * skrm.shift_latency,
+        inject * skrm.inject_energy + detect * skrm.detect_energy +
+        remove * skrm.remove_energy + shift * skrm.shift_energy,
+    )
@@ -1,14 +1,86 @@
+import copy
+import functools
+import types
 from typing import Callable, Optional
 from bitarray import bitarray
 
-from .ieee754 import convert_float_to_ieee754_single
+from . import analytic
+from .cache import TransitionCache
+from .costs import CostModel, OpCounters
+from .encoding import CORRECTED, DETECTED, Encoding, get_encoding
+from .ring import RingStorage
+from .sparse import SparseStorage
+from .stats import Stats
+from .ieee754 import bits_to_float, float_to_bits, flip_bits, leading_bit_index, popcount, precision_width, unflip_bits
 from .argument_error import ArgumentError
 
 
 # Type alias for a write strategy function
 WriteFn = Callable[["SKRM", float, int], None]
 
+# Methods that tracers and error models shadow per instance
+_INSTANCE_HOOKS = frozenset(("inject", "detect", "remove", "shift", "read",
+                             "naive_write", "permutation_write", "pw_plus", "adaptive_write"))
+
+def _memoized(strategy: str):
+    """Route the built-in ``strategy`` through the instance's transition cache when it has one.
+
+    Entries are keyed on ``strategy`` rather than on ``SKRM.strategy``: an
+    adaptive instance runs whichever strategy it picked.
+    """
+    def decorate(write: WriteFn) -> WriteFn:
+        @functools.wraps(write)
+        def wrapper(self: "SKRM", number: float, target_word: int, track: int = 0):
+            if self.cache is None:
+                return write(self, number, target_word, track)
+            return self._write_cached(strategy, write, number, target_word, track)
+        return wrapper
+    return decorate
+
+def _flip_bit(strategy: str) -> int:
+    """1 when ``strategy`` stores its pattern flip-encoded, one bit wider than the word size given, else 0."""
+    if strategy == 'pw_plus' or strategy == 'adaptive':
+        return 1
+    if strategy == 'naive' or strategy == 'pw':
+        return 0
+    from .plan import REGISTRY
+    if strategy not in REGISTRY:
+        raise ArgumentError("Invalid update strategy.")
+    return int(REGISTRY[strategy].flip_bit)
+
+def _write_func(write) -> Optional[WriteFn]:
+    """The strategy function of a ``write`` attribute, under any tracer or wear wrappers.
+
+    Wrappers point at what they wrap with ``__wrapped__``; None for a plain callable.
+    """
+    while not isinstance(write, types.MethodType) and hasattr(write, "__wrapped__"):
+        write = write.__wrapped__
+    return getattr(write, "__func__", None)
+
+def _frame_aps(bits: str, step: int) -> str:
+    """Render a run of bits, framing every ``step``-th one (the access ports) as `` |b| ``."""
+    full = len(bits) - len(bits) % step
+    return "".join(["%s |%s| " % (bits[i:i + step - 1], bits[i + step - 1]) for i in range(0, full, step)]) + bits[full:]
+
+def _cost(kind: str, index: int) -> property:
+    """An attribute reading and writing one entry of the instance's cost model."""
+    def get(self: "SKRM"):
+        return getattr(self.cost_model, kind)[index]
+
+    def set(self: "SKRM", value) -> None:
+        getattr(self.cost_model, kind)[index] = value
+    return property(get, set)
+
 class SKRM():
+    inject_latency = _cost("latency", 0)
+    detect_latency = _cost("latency", 1)
+    remove_latency = _cost("latency", 2)
+    shift_latency = _cost("latency", 3)
+    inject_energy = _cost("energy", 0)
+    detect_energy = _cost("energy", 1)
+    remove_energy = _cost("energy", 2)
+    shift_energy = _cost("energy", 3)
+
     def __init__(self,
         word_size: int,
         num_words: int,
@@ -16,92 +88,306 @@ class SKRM():
         strategy: str = 'naive',
         num_overhead: int = 2,
         write_fn: Optional[WriteFn] = None,
+        analytic: bool = False,
+        precision: str = 'single',
+        cache_bytes: int = 0,
+        layout: str = 'flat',
+        differential: Optional[str] = None,
+        cost_model: Optional[CostModel] = None,
+        engine: str = 'direct',
+        encoding: str = 'none',
 ) -> None:
         # --- Validate/derive word size based on strategy semantics ---
-        if strategy == 'pw_plus':
-            self.word_size = word_size + 1
-        elif strategy == 'naive' or strategy == 'pw':
-            self.word_size = word_size
-        else:
-            raise ArgumentError("Invalid update strategy.")
+        self.word_size = word_size + _flip_bit(strategy)
+
+
+        # IEEE-754 format of the written values ('half', 'single' or 'double')
+        try:
+            self.pattern_width = precision_width(precision)
+        except ValueError:
+            raise ArgumentError("Invalid precision.")
+        self.precision = precision
 
+        # Word encoding between the IEEE-754 pattern and the strategy (see encoding.py):
+        # the strategies write code words ``extra_bits`` wider than the precision
+        encoder = get_encoding(encoding)
+        self.encoding = encoding
+        self._encoder: Optional[Encoding] = encoder if encoding != 'none' else None
+        self.pattern_width += encoder.extra_bits(self.pattern_width)
+        if self._encoder is not None and word_size < self.pattern_width:
+            raise ArgumentError("Word size must hold the %d-bit code words of encoding %r." % (self.pattern_width, encoding))
+        self.encoding_stats = {"corrected": 0, "detected": 0}
 
         self.strategy = strategy
         self.num_words = num_words
+        self.num_racetrack = num_racetrack
         self.num_overhead = num_overhead
 
+        # Count-only mode: built-in strategies skip the bit-level shift/detect loop
+        # and apply their closed form (see analytic.py) to the target segment
+        self.analytic = analytic
+
+        # Optional LRU memo of (strategy, old segment, new pattern) transitions, 0 disables it
+        self.cache: Optional[TransitionCache] = TransitionCache(cache_bytes) if cache_bytes else None
+
         # Storage layout: [ overhead | AP | word | AP | word | AP | ... | AP | overhead ] repeating on each racetrack
-        self.storage = bitarray((self.word_size * (num_overhead + num_words) + num_words + 1) * num_racetrack)
+        self.track_length = self.word_size * (num_overhead + num_words) + num_words + 1
 
-        # Cost model (can be tuned externally if needed)
-        self.inject_latency = 1.0
-        self.detect_latency = 0.1
-        self.remove_latency = 0.8
-        self.shift_latency = 0.5
+        # Shift-domain layout: 'flat' shifts slices of `storage`, 'ring' keeps every word
+        # as a circular buffer so that a one-step shift is O(1) (see ring.py), 'sparse'
+        # only keeps the ports and words holding skyrmions (see sparse.py)
+        if layout == 'ring':
+            self._ring: Optional[RingStorage] = RingStorage(self.word_size, num_words, num_racetrack, self.track_length)
+        elif layout == 'sparse':
+            self._ring = SparseStorage(self.word_size, num_words, num_racetrack, self.track_length)
+        elif layout == 'flat':
+            self._ring = None
+        else:
+            raise ArgumentError("Layout should be 'flat', 'ring' or 'sparse'.")
+        self.layout = layout
+        if layout == 'sparse':
+            # The sparse storage is the only copy of the contents and never goes stale
+            self._storage = None
+            self._shared = False
+            self._ring_valid = True
+        else:
+            self.storage = bitarray(self.track_length * num_racetrack, endian='big')
 
-        self.inject_energy = 200
-        self.detect_energy = 2
-        self.remove_energy = 20
-        self.shift_energy = 20
+        # Cost model (can be tuned externally if needed, and shared by several instances)
+        self.cost_model = cost_model if cost_model is not None else CostModel()
 
         self.inject_count = 0
         self.detect_count = 0
         self.remove_count = 0
         self.shift_count = 0
 
-        # --- Strategy dispatch table (unbound functions) ---
-        dispatch: dict[str, WriteFn] = {
-            "naive": SKRM.naive_write,
-            "pw": SKRM.permutation_write,
-            "pw_plus": SKRM.pw_plus,
-        }
+        # Adaptive strategy: candidates, the cost it minimizes ('latency' or 'energy'),
+        # and per candidate [picks, latency, energy]
+        self.adaptive_strategies = ("naive", "pw", "pw_plus")
+        self.adaptive_metric = 'latency'
+        self.strategy_picks = {name: [0, 0.0, 0.0] for name in self.adaptive_strategies}
 
+        # Differential mode: skip unchanged words and rewrite only the differing bits when cheaper.
+        # 'oracle' compares with the stored word for free, 'detect' pays a read for it first
+        if differential not in (None, 'oracle', 'detect'):
+            raise ArgumentError("Differential mode should be None, 'oracle' or 'detect'.")
+        if differential is not None and (write_fn is not None or engine != 'direct' or strategy not in DISPATCH):
+            raise ArgumentError("Differential mode needs a built-in strategy.")
+        self.differential = differential
+        self.differential_stats = {"skipped": 0, "partial": 0, "full": 0, "latency_saved": 0.0, "energy_saved": 0.0}
 
-        base_fn: WriteFn = write_fn if write_fn is not None else dispatch[strategy]
+        # Write engine: 'direct' runs the strategy methods, 'plan' runs the compiled operation
+        # plans of the strategy registry (see plan.py), the only engine of registered strategies
+        if strategy not in DISPATCH:
+            engine = 'plan'
+        if engine not in ('direct', 'plan'):
+            raise ArgumentError("Engine should be 'direct' or 'plan'.")
+        if engine == 'plan' and (write_fn is not None or strategy == 'adaptive'):
+            raise ArgumentError("The plan engine runs registered strategies only.")
+        self.engine = engine
+
+        base_fn: WriteFn = write_fn if write_fn is not None else DISPATCH.get(strategy, SKRM.plan_write)
+        if differential is not None:
+            base_fn = SKRM.differential_write
+        elif engine == 'plan':
+            base_fn = SKRM.plan_write
         # Bind to this instance -> becomes a bound method with `self`
         self.write: WriteFn = base_fn.__get__(self, SKRM) # type: ignore[assignment]
 
 
+    # ---------- Storage ----------
+    @property
+    def storage(self) -> bitarray:
+        """The flat bitarray of every racetrack (brought up to date first in the ring layout).
+
+        In the sparse layout this is a dense copy; assign to ``storage`` to change the contents.
+        """
+        if self.layout == 'sparse':
+            bits = bitarray(self.track_length * self.num_racetrack, endian='big')
+            bits.setall(0)
+            self._ring.store(bits)
+            return bits
+        if self._shared:
+            self._unshare()
+        if self._ring_valid:
+            self._ring.store(self._storage)
+            self._ring_valid = False
+        return self._storage
+
+    @storage.setter
+    def storage(self, bits: bitarray) -> None:
+        if self.layout == 'sparse':
+            self._ring.load(bits)
+            return
+        if self.__dict__.get("_shared"):
+            self._unshare(copy_bits=False)
+        self._storage = bits
+        self._shared = False
+        self._ring_valid = False
+
+    def _share(self) -> None:
+        """Copy the flat storage before it is next changed (copy-on-write, see ``fork``).
+
+        Every method changing the flat storage in place (the primitives,
+        ``_place`` and ``_store_segment`` through ``storage``) checks
+        ``_shared`` first, so hooks calling the class methods directly keep
+        the copy-on-write; the ring layout only changes the flat storage
+        through the ``storage`` property.
+        """
+        self._shared = True
+
+    def _unshare(self, copy_bits: bool = True) -> None:
+        if copy_bits:
+            self._storage = bitarray(self._storage)
+        self._shared = False
+
+    def __getstate__(self) -> dict:
+        # Copies and pickles own their storage, leave the hooks (tracers, error
+        # models, wear trackers) on this instance and rebind the write strategy
+        state = dict(self.__dict__)
+        state["_shared"] = False
+        for name in _INSTANCE_HOOKS & set(state):
+            del state[name]
+        write_fn = _write_func(state.get("write"))
+        if write_fn is not None:
+            del state["write"]
+            state["_write_fn"] = write_fn
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        state = dict(state)
+        write_fn = state.pop("_write_fn", None)
+        self.__dict__.update(state)
+        if write_fn is not None:
+            self.write = write_fn.__get__(self, SKRM)
+
+    def fork(self) -> "SKRM":
+        """Independent copy of this instance that shares the storage until either side writes.
+
+        Counters, cost parameters and strategy state are copied; the storage is
+        copied by whichever of the two changes it first. The copy gets an
+        empty transition cache of the same size. Detach tracers and error
+        models (instance-level primitives) before forking.
+        """
+        write = getattr(self.write, "__func__", None)
+        if write is None or _INSTANCE_HOOKS & set(vars(self)):
+            raise ArgumentError("Cannot fork an instance with traced or faulty operations; detach them first.")
+        if self._ring_valid and self.layout == 'ring':
+            self.storage  # write the ring layout back
+        child = copy.copy(self)
+        child.strategy_picks = {name: list(picks) for name, picks in self.strategy_picks.items()}
+        child.differential_stats = dict(self.differential_stats)
+        child.encoding_stats = dict(self.encoding_stats)
+        child.cost_model = self.cost_model.copy()
+        if self.cache is not None:
+            child.cache = TransitionCache(self.cache.max_bytes)
+        if self.layout == 'sparse':
+            # Already proportional to the touched words: copied outright
+            child._ring = self._ring.copy()
+            return child
+        if self._ring is not None:
+            child._ring = RingStorage(self.word_size, self.num_words, self.num_racetrack, self.track_length)
+        child._ring_valid = False
+        self._share()
+        child._share()
+        return child
+
+    def _active_ring(self) -> RingStorage:
+        """The ring storage, reloaded from the flat bitarray if that was changed last."""
+        if not self._ring_valid:
+            self._ring.load(self._storage)
+            self._ring_valid = True
+        return self._ring
+
+    def _place(self, ap: int, track: int = 0) -> None:
+        """Put a skyrmion on an access port without an inject (it was moved there)."""
+        if self._ring is not None:
+            self._active_ring().aps[track * (self.num_words + 1) + ap] = 1
+        else:
+            if self._shared:
+                self._unshare()
+            self._storage[self.track_length * track + (self.word_size + 1) * (ap + 1) - 1] = 1
+
     # ---------- Primitive operations ----------
-    def inject(self, ap: int):
+    def _check_ap(self, ap: int, track: int) -> None:
         # Boundary test
         if ap < 0 or ap > self.num_words:
             raise ArgumentError("AP must be must be between 0 and num_words.")
-        
+        if track < 0 or track > self.num_racetrack - 1:
+            raise ArgumentError("Track must be between 0 and (num_racetrack - 1).")
+
+    def inject(self, ap: int, track: int = 0):
+        self._check_ap(ap, track)
+        self._inject(ap, track)
+
+    def detect(self, ap: int, track: int = 0):
+        self._check_ap(ap, track)
+        return self._detect(ap, track)
+
+    def remove(self, ap: int, track: int = 0):
+        self._check_ap(ap, track)
+        self._remove(ap, track)
+
+    def shift(self, start_ap: int, end_ap: int, track: int = 0):
+        self._check_ap(start_ap, track)
+        self._check_ap(end_ap, track)
+        if start_ap == end_ap:
+            raise ArgumentError("The access ports of shift operation can not be the same.")
+        self._shift(start_ap, end_ap, track)
+
+    # Unchecked primitives, for strategy code that has already checked its target word and track;
+    # the public primitives above check their arguments and run these
+    def _inject(self, ap: int, track: int = 0):
         self.inject_count += 1
-        self.storage[(self.word_size + 1) * (ap + 1) - 1] = 1
-        
-    def detect(self, ap: int):
-        # Boundary test
-        if ap < 0 or ap > self.num_words:
-            raise ArgumentError("AP must be must be between 0 and num_words.")
-        
+        if self._ring is not None:
+            self._active_ring().aps[track * (self.num_words + 1) + ap] = 1
+            return
+        if self._shared:
+            self._unshare()
+        self._storage[self.track_length * track + (self.word_size + 1) * (ap + 1) - 1] = 1
+
+    def _detect(self, ap: int, track: int = 0):
         self.detect_count += 1
-        return self.storage[(self.word_size + 1) * (ap + 1) - 1]
+        if self._ring is not None:
+            return self._active_ring().aps[track * (self.num_words + 1) + ap]
+        return self._storage[self.track_length * track + (self.word_size + 1) * (ap + 1) - 1]
 
-    def remove(self, ap: int):
-        # Boundary test
-        if ap < 0 or ap > self.num_words:
-            raise ArgumentError("AP must be must be between 0 and num_words.")
-        
+    def _remove(self, ap: int, track: int = 0):
         self.remove_count += 1
-        self.storage[(self.word_size + 1) * (ap + 1) - 1] = 0
+        if self._ring is not None:
+            self._active_ring().aps[track * (self.num_words + 1) + ap] = 0
+            return
+        if self._shared:
+            self._unshare()
+        self._storage[self.track_length * track + (self.word_size + 1) * (ap + 1) - 1] = 0
 
-    def shift(self, start_ap: int, end_ap: int):
-        # Boundary test
-        if start_ap < 0 or start_ap > self.num_words or end_ap < 0 or end_ap > self.num_words:
-            raise ArgumentError("AP must be must be between 0 and num_words.")
-        
+    def _shift(self, start_ap: int, end_ap: int, track: int = 0):
+        self.shift_count += 1
+        if self._ring is not None:
+            self._active_ring().shift(start_ap, end_ap, track)
+            return
+
+        if self._shared:
+            self._unshare()
+        storage = self._storage
+        base = self.track_length * track
         if start_ap < end_ap:
-            self.shift_count += 1
-            self.storage[(self.word_size + 1) * (start_ap + 1) : (self.word_size + 1) * (end_ap + 1)] = self.storage[(self.word_size + 1) * (start_ap + 1) - 1 : (self.word_size + 1) * (end_ap + 1) - 1]
-            self.storage[(self.word_size + 1) * (start_ap + 1) - 1] = 0
-        elif end_ap < start_ap:
-            self.shift_count += 1
-            self.storage[(self.word_size + 1) * (end_ap + 1) - 1 : (self.word_size + 1) * (start_ap + 1) - 1] = self.storage[(self.word_size + 1) * (end_ap + 1) : (self.word_size + 1) * (start_ap + 1)]
-            self.storage[(self.word_size + 1) * (start_ap + 1) - 1] = 0
+            storage[base + (self.word_size + 1) * (start_ap + 1) : base + (self.word_size + 1) * (end_ap + 1)] = storage[base + (self.word_size + 1) * (start_ap + 1) - 1 : base + (self.word_size + 1) * (end_ap + 1) - 1]
         else:
-            raise ArgumentError("The access ports of shift operation can not be the same.")
+            storage[base + (self.word_size + 1) * (end_ap + 1) - 1 : base + (self.word_size + 1) * (start_ap + 1) - 1] = storage[base + (self.word_size + 1) * (end_ap + 1) : base + (self.word_size + 1) * (start_ap + 1)]
+        storage[base + (self.word_size + 1) * (start_ap + 1) - 1] = 0
+
+    def _primitives(self):
+        """(inject, detect, remove, shift) for strategy code, without the boundary tests.
+
+        When a tracer, error model, wear tracker or fork shadows a primitive on
+        the instance, the shadowing (checked) primitives are returned instead
+        so that every operation still goes through them.
+        """
+        hooks = self.__dict__
+        if "inject" in hooks or "detect" in hooks or "remove" in hooks or "shift" in hooks:
+            return self.inject, self.detect, self.remove, self.shift
+        return self._inject, self._detect, self._remove, self._shift
 
     # ---------- Convenience: swap out strategy at runtime ----------
     def set_write_fn(self, write_fn: WriteFn) -> None:
@@ -110,26 +396,265 @@ class SKRM():
         """
         self.write = write_fn.__get__(self, SKRM) # bind to instance
 
+    # ---------- Segment access ----------
+    def _segment_span(self, target_word: int, track: int):
+        """Byte range of the segment [AP target_word, AP target_word + 1] and the pad after it."""
+        length = self.word_size + 2
+        start = self.track_length * track + (self.word_size + 1) * (target_word + 1) - 1
+        lo = start >> 3
+        hi = (start + length + 7) >> 3
+        return lo, hi, (hi << 3) - start - length
+
+    def _read_segment(self, target_word: int, track: int = 0) -> int:
+        """The segment [AP target_word, AP target_word + 1] as an integer, AP target_word is the MSB."""
+        if self._ring_valid:
+            return self._ring.segment(target_word, track)
+        lo, hi, pad = self._segment_span(target_word, track)
+        return (int.from_bytes(memoryview(self._storage)[lo:hi], 'big') >> pad) & ((1 << (self.word_size + 2)) - 1)
+
+    def _store_segment(self, segment: int, target_word: int, track: int = 0) -> None:
+        if self._ring_valid:
+            self._ring.set_segment(segment, target_word, track)
+            return
+        lo, hi, pad = self._segment_span(target_word, track)
+        mask = ((1 << (self.word_size + 2)) - 1) << pad
+        buffer = memoryview(self.storage)
+        chunk = int.from_bytes(buffer[lo:hi], 'big')
+        buffer[lo:hi] = ((chunk & ~mask) | (segment << pad)).to_bytes(hi - lo, 'big')
+
+    # ---------- Count-only execution ----------
+    def _write_analytic(self, write: Callable[[int, int, int, int], tuple], pattern: int, width: int, target_word: int, track: int = 0):
+        """Apply a closed-form strategy to the segment [AP target_word, AP target_word + 1].
+
+        The segment is read and written back through the storage buffer as one
+        integer, so no bit-level shift is performed.
+        """
+        if self._ring_valid:
+            segment, counts = write(self._read_segment(target_word, track), self.word_size, pattern, width)
+            self._store_segment(segment, target_word, track)
+        else:
+            # Flat layout: the bytes holding the segment are read and written back once
+            if self._shared:
+                self._unshare()
+            lo, hi, pad = self._segment_span(target_word, track)
+            mask = (1 << (self.word_size + 2)) - 1
+            buffer = memoryview(self._storage)
+            chunk = int.from_bytes(buffer[lo:hi], 'big')
+            segment, counts = write((chunk >> pad) & mask, self.word_size, pattern, width)
+            buffer[lo:hi] = ((chunk & ~(mask << pad)) | (segment << pad)).to_bytes(hi - lo, 'big')
+
+        inject, detect, remove, shift = counts
+        self.inject_count += inject
+        self.detect_count += detect
+        self.remove_count += remove
+        self.shift_count += shift
+        return inject, detect, remove, shift
+
+    # ---------- Transition cache ----------
+    def _write_cached(self, strategy: str, write: WriteFn, number: float, target_word: int, track: int = 0):
+        """Run `write`, the built-in `strategy`, through the transition cache (see cache.py)."""
+        # Boundary test
+        if target_word < 0 or target_word > self.num_words - 1:
+            raise ArgumentError("Target word must be must be between 0 and (num_words - 1).")
+        if track < 0 or track > self.num_racetrack - 1:
+            raise ArgumentError("Track must be between 0 and (num_racetrack - 1).")
+
+        key = (strategy, self._read_segment(target_word, track), self._pattern(number))
+        entry = self.cache.get(key)
+        if entry is None:
+            before = (self.inject_count, self.detect_count, self.remove_count, self.shift_count)
+            write(self, number, target_word, track)
+            entry = (self._read_segment(target_word, track), (
+                self.inject_count - before[0], self.detect_count - before[1],
+                self.remove_count - before[2], self.shift_count - before[3],
+            ))
+            self.cache.put(key, entry)
+            return
+
+        segment, (inject, detect, remove, shift) = entry
+        self._store_segment(segment, target_word, track)
+        self.inject_count += inject
+        self.detect_count += detect
+        self.remove_count += remove
+        self.shift_count += shift
+
+    # ---------- Read path ----------
+    def read(self, target_word: int, track: int = 0, destructive: bool = False) -> float:
+        """Shift the word out across AP target_word + 1, detecting every bit, and decode it.
+
+        Every detected skyrmion is removed. A destructive read leaves the word
+        empty; otherwise the skyrmions are injected again at AP target_word and
+        the word is shifted back in place. pw_plus words are flip-decoded.
+        """
+        # Boundary test
+        if target_word < 0 or target_word > self.num_words - 1:
+            raise ArgumentError("Target word must be must be between 0 and (num_words - 1).")
+        if track < 0 or track > self.num_racetrack - 1:
+            raise ArgumentError("Track must be between 0 and (num_racetrack - 1).")
+
+        if self.analytic:
+            segment, word, (inject, detect, remove, shift) = analytic.read(self._read_segment(target_word, track), self.word_size, destructive)
+            self._store_segment(segment, target_word, track)
+            self.inject_count += inject
+            self.detect_count += detect
+            self.remove_count += remove
+            self.shift_count += shift
+            return self._decode(word)
+
+        # The word comes out last bit first
+        inject, detect, remove, shift = self._primitives()
+        word = 0
+        for i in range(self.word_size):
+            shift(target_word, target_word + 1, track)
+            if detect(target_word + 1, track) == 1:
+                word |= 1 << i
+                remove(target_word + 1, track)
+                if not destructive:
+                    inject(target_word, track)
+        if not destructive:
+            shift(target_word, target_word + 1, track)
+        return self._decode(word)
+
+    def read_destructive(self, target_word: int, track: int = 0) -> float:
+        return self.read(target_word, track, destructive=True)
+
+    def _pattern(self, number: float) -> int:
+        """The pattern the strategies write for ``number``: its IEEE-754 bits, encoded."""
+        bits = float_to_bits(number, self.precision)
+        if self._encoder is None:
+            return bits
+        return self._encoder.encode(bits, precision_width(self.precision))
+
+    def _decode(self, word: int) -> float:
+        """The value of a word as laid out by the built-in strategies."""
+        if _flip_bit(self.strategy):
+            bits = unflip_bits(word & ((1 << (self.pattern_width + 1)) - 1), self.pattern_width)
+        else:
+            bits = word & ((1 << self.pattern_width) - 1)
+        if self._encoder is not None:
+            bits, status = self._encoder.decode(bits, precision_width(self.precision))
+            if status == CORRECTED:
+                self.encoding_stats["corrected"] += 1
+            elif status == DETECTED:
+                self.encoding_stats["detected"] += 1
+        return bits_to_float(bits, self.precision)
+
+    # ---------- Batched replay ----------
+    def replay(self, values, targets, tracks=None):
+        """Write values[i] to word targets[i] (of racetrack tracks[i]) for the whole batch at once.
+
+        Returns a ``ReplayResult`` with per-write counts, latency and energy.
+        See replay.py.
+        """
+        from .replay import replay
+        return replay(self, values, targets, tracks)
+
+    def write_block(self, values, start_word: int, track: int = 0):
+        """Write values[i] to word start_word + i as one burst sharing its shifts.
+
+        Returns a ``BlockResult`` comparing the burst with per-word writes.
+        See block.py.
+        """
+        from .block import write_block
+        return write_block(self, values, start_word, track)
+
+    def plan_write(self, number: float, target_word: int, track: int = 0):
+        """Write through the compiled, cached operation plan of the strategy (see plan.py)."""
+        from .plan import plan_write
+        plan_write(self, number, target_word, track)
+
+    def _write_batch(self, values, targets, tracks=None):
+        """Run a batch through replay when `write` is the built-in strategy, else one write at a time."""
+        if getattr(self.write, "__func__", None) is DISPATCH.get(self.strategy):
+            self.replay(values, targets, tracks)
+            return
+        if tracks is None:
+            tracks = [0] * len(targets)
+        for number, target_word, track in zip(values, targets, tracks):
+            self.write(float(number), int(target_word), int(track))
+
     # ---------- Visualization & accounting ----------
     # --- Render function: Only produce string ---
-    def render_visualization(self) -> str:
+    def render_visualization(self, words=None, tracks=None, mode: str = 'bits') -> str:
+        """One line per racetrack.
+
+        ``words`` and ``tracks`` are ``(start, stop)`` ranges that limit the
+        output; a word window starts at AP ``start``. ``mode`` 'bits' prints
+        the bits with every AP framed as ``|b|``, 'ones' the number of
+        skyrmions and 'values' the decoded value of each word.
+        """
+        if mode not in ('bits', 'ones', 'values'):
+            raise ArgumentError("Visualization mode should be 'bits', 'ones' or 'values'.")
+        first_word, last_word = words if words is not None else (0, self.num_words)
+        first_track, last_track = tracks if tracks is not None else (0, self.num_racetrack)
+        if not 0 <= first_word <= last_word <= self.num_words or not 0 <= first_track <= last_track <= self.num_racetrack:
+            raise ArgumentError("Visualization window out of range.")
+
+        # Only the segments in the window are read (no dense copy of a sparse layout)
+        step = self.word_size + 1
+        mask = (1 << self.word_size) - 1
         parts = []
-        line = []
-        for idx, val in enumerate(self.storage):
-            if idx % (self.word_size + 1) == self.word_size:
-                line.append(" |")
-            line.append(str(int(val)))
-            if idx % (self.word_size + 1) == self.word_size:
-                line.append("| ")
-        parts.append("".join(line))
-        parts.append("\n")
+        for track in range(first_track, last_track):
+            base = self.track_length * track
+            if mode == 'ones':
+                line = " ".join(str(popcount((self._read_segment(word, track) >> 1) & mask))
+                                for word in range(first_word, last_word))
+            elif mode == 'values':
+                line = " ".join(str(self._decode((self._read_segment(word, track) >> 1) & mask))
+                                for word in range(first_word, last_word))
+            else:
+                # AP first_word, then every word with the AP behind it
+                if first_word < self.num_words:
+                    front = self._read_segment(first_word, track) >> step
+                else:
+                    front = self._read_segment(first_word - 1, track) & 1
+                window = str(front) + "".join(format(self._read_segment(word, track) & ((1 << step) - 1), "0%db" % step)
+                                              for word in range(first_word, last_word))
+                if words is None:
+                    end = base + step * (self.num_words + 1)
+                    line = _frame_aps(self._overhead_bits(base, base + step - 1) + window +
+                                      self._overhead_bits(end, base + self.track_length), step)
+                else:
+                    line = " |%s| " % window[0] + _frame_aps(window[1:], step)
+            parts.append(line)
+            parts.append("\n")
         return "".join(parts)
 
+    def _overhead_bits(self, start: int, stop: int) -> str:
+        """Bits ``start`` to ``stop`` of an overhead region of the flat layout, as a string."""
+        if self.layout == 'sparse':
+            return "".join("1" if pos in self._ring.overhead else "0" for pos in range(start, stop))
+        # The ring layout only keeps the words and APs, the overhead stays in the flat storage
+        return self._storage[start:stop].to01()
+
+    @property
+    def counters(self) -> OpCounters:
+        """The operation counts as an ``OpCounters`` vector (see costs.py).
+
+        Every read builds a new vector from the ``*_count`` attributes, so changing
+        it in place (``s.counters.values[i] += 1``) does nothing; assign a whole
+        vector to ``counters``, or change the attributes, instead.
+        """
+        return OpCounters(self.inject_count, self.detect_count, self.remove_count, self.shift_count)
+
+    @counters.setter
+    def counters(self, counts) -> None:
+        self.inject_count, self.detect_count, self.remove_count, self.shift_count = counts
+
+    def stats(self) -> Stats:
+        """Counts, latency and energy per kind of operation (see stats.py)."""
+        counts = (self.inject_count, self.detect_count, self.remove_count, self.shift_count)
+        return Stats(
+            *counts,
+            *(count * cost for count, cost in zip(counts, self.cost_model.latency)),
+            *(count * cost for count, cost in zip(counts, self.cost_model.energy)),
+            {name: list(picks) for name, picks in self.strategy_picks.items()} if self.strategy == 'adaptive' else {},
+        )
+
     def render_latency(self) -> str:
-        inject_latency = self.inject_count * self.inject_latency
-        detect_latency = self.detect_count * self.detect_latency
-        remove_latency = self.remove_count * self.remove_latency
-        shift_latency = self.shift_count * self.shift_latency
+        counts = (self.inject_count, self.detect_count, self.remove_count, self.shift_count)
+        inject_latency, detect_latency, remove_latency, shift_latency = (
+            count * cost for count, cost in zip(counts, self.cost_model.latency))
         total = inject_latency + detect_latency + remove_latency + shift_latency
 
         return (
@@ -142,10 +667,9 @@ class SKRM():
         )
 
     def render_energy(self) -> str:
-        inject_energy = self.inject_count * self.inject_energy
-        detect_energy = self.detect_count * self.detect_energy
-        remove_energy = self.remove_count * self.remove_energy
-        shift_energy = self.shift_count * self.shift_energy
+        counts = (self.inject_count, self.detect_count, self.remove_count, self.shift_count)
+        inject_energy, detect_energy, remove_energy, shift_energy = (
+            count * cost for count, cost in zip(counts, self.cost_model.energy))
         total = inject_energy + detect_energy + remove_energy + shift_energy
 
         return (
@@ -157,7 +681,50 @@ class SKRM():
             "%-14s %-15s\n" % ("Total energy:", total)
         )
 
+    def render_picks(self) -> str:
+        lines = ["%-9s %-7s %-15s %-15s\n" % ("Strategy", "Picks", "Latency", "Energy")]
+        for name, (picks, latency, energy) in self.strategy_picks.items():
+            lines.append("%-9s %-7s %-15s %-15s\n" % (name, picks, latency, energy))
+        return "".join(lines)
+
+    def render_differential(self) -> str:
+        stats = self.differential_stats
+        return (
+            "%-15s %-15s\n" % ("Skipped:", stats["skipped"]) +
+            "%-15s %-15s\n" % ("Partial:", stats["partial"]) +
+            "%-15s %-15s\n" % ("Full:", stats["full"]) +
+            "%-15s %-15s\n" % ("Latency saved:", stats["latency_saved"]) +
+            "%-15s %-15s\n" % ("Energy saved:", stats["energy_saved"])
+        )
+
+    def render_encoding(self) -> str:
+        return (
+            "%-15s %-15s\n" % ("Encoding:", self.encoding) +
+            "%-15s %-15s\n" % ("Extra bits:", self.pattern_width - precision_width(self.precision)) +
+            "%-15s %-15s\n" % ("Corrected:", self.encoding_stats["corrected"]) +
+            "%-15s %-15s\n" % ("Detected:", self.encoding_stats["detected"])
+        )
+
     def render_summary(self) -> str:
+        picks = ""
+        if self.strategy == 'adaptive':
+            picks = (
+                f"\n#############################\n\n" +
+                f"Adaptive strategy picks:\n\n" +
+                f"{self.render_picks()}"
+            )
+        if self.differential is not None:
+            picks += (
+                f"\n#############################\n\n" +
+                f"Differential writes:\n\n" +
+                f"{self.render_differential()}"
+            )
+        if self._encoder is not None:
+            picks += (
+                f"\n#############################\n\n" +
+                f"Word encoding:\n\n" +
+                f"{self.render_encoding()}"
+            )
         return (
             f"#############################\n"
             f"##         Summary         ##\n"
@@ -174,7 +741,8 @@ class SKRM():
             f"{self.render_latency()}\n" +
             f"#############################\n\n" +
             f"Energy:\n\n" +
-            f"{self.render_energy()}"
+            f"{self.render_energy()}" +
+            picks
         )
 
     def visualize(self):
@@ -190,51 +758,67 @@ class SKRM():
         print(self.render_summary())
     
     # ---------- Built-in strategies (kept as instance methods) ----------
-    def naive_write(self, number: float, target_word: int):
+    @_memoized("naive")
+    def naive_write(self, number: float, target_word: int, track: int = 0):
         # Boundary test
         if target_word < 0 or target_word > self.num_words - 1:
             raise ArgumentError("Target word must be must be between 0 and (num_words - 1).")
+        if track < 0 or track > self.num_racetrack - 1:
+            raise ArgumentError("Track must be between 0 and (num_racetrack - 1).")
+
+        if self.analytic:
+            self._write_analytic(analytic.naive_write, self._pattern(number), self.pattern_width, target_word, track)
+            return
 
         # Init value
-        ieee_num = convert_float_to_ieee754_single(number)
+        ieee_num = self._pattern(number)
+        inject, detect, remove, shift = self._primitives()
 
         # Remove
         for _ in range(self.word_size):
-            self.shift(target_word, target_word + 1)
-            self.remove(target_word + 1)
+            shift(target_word, target_word + 1, track)
+            remove(target_word + 1, track)
 
-        # Inject
-        for c in ieee_num:
-            if c == '1':
-                self.inject(target_word + 1)
-            self.shift(target_word + 1, target_word)
+        # Inject, MSB first
+        for i in range(self.pattern_width - 1, -1, -1):
+            if (ieee_num >> i) & 1:
+                inject(target_word + 1, track)
+            shift(target_word + 1, target_word, track)
 
-    def permutation_write(self, number: float, target_word: int):
+    @_memoized("pw")
+    def permutation_write(self, number: float, target_word: int, track: int = 0):
         # Boundary test
         if target_word < 0 or target_word > self.num_words - 1:
             raise ArgumentError("Target word must be must be between 0 and (num_words - 1).")
+        if track < 0 or track > self.num_racetrack - 1:
+            raise ArgumentError("Track must be between 0 and (num_racetrack - 1).")
         
+        if self.analytic:
+            self._write_analytic(analytic.permutation_write, self._pattern(number), self.pattern_width, target_word, track)
+            return
+
         # Init value
-        ieee_num = convert_float_to_ieee754_single(number)
+        ieee_num = self._pattern(number)
+        inject, detect, remove, shift = self._primitives()
         sky_cnt = 0
 
         # Assemble
-        self.shift(target_word, target_word + 1)
+        shift(target_word, target_word + 1, track)
         for _ in range(self.word_size):
-            if self.detect(target_word + 1) == 1:
+            if detect(target_word + 1, track) == 1:
                 sky_cnt += 1
-            self.shift(target_word, target_word + 1)
+            shift(target_word, target_word + 1, track)
         
-        # Re-permute & inject
-        for c in ieee_num:
-            self.shift(target_word + 1, target_word)
-            if c == '1':
+        # Re-permute & inject, MSB first
+        for i in range(self.pattern_width - 1, -1, -1):
+            shift(target_word + 1, target_word, track)
+            if (ieee_num >> i) & 1:
                 if sky_cnt > 0:
                     sky_cnt -= 1
-                    self.storage[(self.word_size + 1) * (target_word + 2) - 1] = 1
+                    self._place(target_word + 1, track)
                 else:
-                    self.inject(target_word + 1)
-        self.shift(target_word + 1, target_word)
+                    inject(target_word + 1, track)
+        shift(target_word + 1, target_word, track)
         # self.shift_count += 1 # Shift 1 bit to align word to interport
 
         # Remove extra skyrmions
@@ -243,30 +827,40 @@ class SKRM():
             self.remove_count += 1
             sky_cnt -= 1
 
-    def pw_plus(self, number: float, target_word: int):
+    @_memoized("pw_plus")
+    def pw_plus(self, number: float, target_word: int, track: int = 0):
         # Boundary test
         if target_word < 0 or target_word > self.num_words - 1:
             raise ArgumentError("Target word must be must be between 0 and (num_words - 1).")
+        if track < 0 or track > self.num_racetrack - 1:
+            raise ArgumentError("Track must be between 0 and (num_racetrack - 1).")
+
+        if self.analytic:
+            d = flip_bits(self._pattern(number), self.pattern_width)
+            self._write_analytic(analytic.pw_plus, d, self.pattern_width + 1, target_word, track)
+            return
 
-        # Input info
-        d: str = convert_float_to_ieee754_single(number, True)
-        d_popcnt = d.count('1')
-        d_bsr = d.find('1')
+        # Input info: flip-encoded pattern, d[0] (the flip bit) is the MSB
+        d = flip_bits(self._pattern(number), self.pattern_width)
+        d_width = self.pattern_width + 1
+        d_popcnt = popcount(d)
+        d_bsr = leading_bit_index(d, d_width)
 
         # Init value
         sky_cnt = 0
         save_assemble = -1
         save_permute = d_bsr
         permute_removal = True
+        inject, detect, remove, shift = self._primitives()
 
         # Assemble
-        self.shift(target_word, target_word +1)  
+        shift(target_word, target_word +1, track)  
         for i in range(self.word_size - 1, -1, -1):
-            b = self.detect(target_word + 1)
+            b = detect(target_word + 1, track)
             if b == 0:
-                self.shift(target_word, target_word +1)
+                shift(target_word, target_word +1, track)
             else:
-                self.shift(target_word, target_word +1)
+                shift(target_word, target_word +1, track)
                 sky_cnt += 1
                 if sky_cnt == d_popcnt:
                     save_assemble = i - 1
@@ -277,22 +871,183 @@ class SKRM():
         if save_assemble < save_permute:
             # Clear the rest of existing Skyrmions
             for i in range(save_assemble, -1, -1):
-                self.shift(target_word, target_word + 1)
-                self.remove(target_word + 1)
+                shift(target_word, target_word + 1, track)
+                remove(target_word + 1, track)
             idx_leftmost_bit = d_bsr
             permute_removal = False
         for i in range(idx_leftmost_bit, self.word_size):
-            if d[i] == '0':
-                self.shift(target_word + 1, target_word)
+            if not (d >> (d_width - 1 - i)) & 1:
+                shift(target_word + 1, target_word, track)
             else:
                 if sky_cnt > 0:
-                    self.shift(target_word + 1, target_word)
-                    self.storage[(self.word_size + 1) * (target_word + 2) - 1] = 1
+                    shift(target_word + 1, target_word, track)
+                    self._place(target_word + 1, track)
                     sky_cnt -= 1
                 else:
-                    self.shift(target_word + 1, target_word)
-                    self.inject(target_word + 1)
+                    shift(target_word + 1, target_word, track)
+                    inject(target_word + 1, track)
             if permute_removal:
-                self.remove(target_word)
-        self.shift(target_word + 1, target_word)
-        self.remove(target_word)
\ No newline at end of file
+                remove(target_word, track)
+        shift(target_word + 1, target_word, track)
+        remove(target_word, track)
+
+    # ---------- Adaptive strategy ----------
+    def _predict(self, pattern: int, target_word: int, track: int = 0):
+        """(strategy, new segment, counts) of the cheapest candidate for writing `pattern`.
+
+        naive and pw store the pattern as is, so the flip bit in front of it is
+        cleared; pw_plus stores it flip-encoded. Either way the word decodes
+        like a pw_plus word.
+        """
+        segment = self._read_segment(target_word, track)
+        weights = self.cost_model.energy if self.adaptive_metric == 'energy' else self.cost_model.latency
+
+        best = None
+        for name in self.adaptive_strategies:
+            if name == 'pw_plus':
+                new, counts = analytic.pw_plus(segment, self.word_size, flip_bits(pattern, self.pattern_width), self.pattern_width + 1)
+            else:
+                new, counts = _ADAPTIVE_FORMS[name](segment, self.word_size, pattern, self.pattern_width)
+            cost = sum(c * w for c, w in zip(counts, weights))
+            if best is None or cost < best[0]:
+                best = (cost, name, new, counts)
+        return best[1], best[2], best[3]
+
+    def _record_pick(self, strategy: str, counts) -> None:
+        latency, energy = self.cost_model.price(counts)
+        pick = self.strategy_picks[strategy]
+        pick[0] += 1
+        pick[1] += latency
+        pick[2] += energy
+
+    def _write_adaptive(self, pattern: int, target_word: int, track: int = 0):
+        """Closed-form adaptive write of an IEEE-754 pattern; returns the counts."""
+        strategy, segment, (inject, detect, remove, shift) = self._predict(pattern, target_word, track)
+        self._record_pick(strategy, (inject, detect, remove, shift))
+        self._store_segment(segment, target_word, track)
+        self.inject_count += inject
+        self.detect_count += detect
+        self.remove_count += remove
+        self.shift_count += shift
+        return inject, detect, remove, shift
+
+    def adaptive_write(self, number: float, target_word: int, track: int = 0):
+        # Boundary test
+        if target_word < 0 or target_word > self.num_words - 1:
+            raise ArgumentError("Target word must be must be between 0 and (num_words - 1).")
+        if track < 0 or track > self.num_racetrack - 1:
+            raise ArgumentError("Track must be between 0 and (num_racetrack - 1).")
+
+        pattern = self._pattern(number)
+        if self.analytic:
+            self._write_adaptive(pattern, target_word, track)
+            return
+
+        strategy, _, counts = self._predict(pattern, target_word, track)
+        self._record_pick(strategy, counts)
+        if strategy == 'naive':
+            self.naive_write(number, target_word, track)
+        elif strategy == 'pw':
+            self.permutation_write(number, target_word, track)
+        else:
+            self.pw_plus(number, target_word, track)
+
+    # ---------- Differential writes ----------
+    def _full_counts(self, pattern: int, segment: int, target_word: int, track: int = 0):
+        """Counts of writing `pattern` through the strategy, without writing it."""
+        if self.strategy == 'adaptive':
+            return self._predict(pattern, target_word, track)[2]
+        if self.strategy == 'pw_plus':
+            return analytic.pw_plus(segment, self.word_size, flip_bits(pattern, self.pattern_width), self.pattern_width + 1)[1]
+        return _ADAPTIVE_FORMS[self.strategy](segment, self.word_size, pattern, self.pattern_width)[1]
+
+    def _rewrite_bits(self, word: int, target: int, target_word: int, track: int = 0) -> None:
+        """Bit-level ``analytic.differential_write``."""
+        k, high = analytic.differential_span(word, self.word_size, target)
+        inject, _, remove, shift = self._primitives()
+        if high:
+            # Open the word from AP target_word, then inject the top bits, lowest first
+            for _ in range(k):
+                shift(target_word + 1, target_word, track)
+                remove(target_word, track)
+            for i in range(self.word_size - k, self.word_size):
+                if (target >> i) & 1:
+                    inject(target_word, track)
+                shift(target_word, target_word + 1, track)
+        else:
+            for _ in range(k):
+                shift(target_word, target_word + 1, track)
+                remove(target_word + 1, track)
+            for i in range(k - 1, -1, -1):
+                if (target >> i) & 1:
+                    inject(target_word + 1, track)
+                shift(target_word + 1, target_word, track)
+
+    def differential_write(self, number: float, target_word: int, track: int = 0):
+        """Write through the strategy unless rewriting only the differing bits is faster.
+
+        The stored word is compared with every layout the strategy may store the
+        value in (both for adaptive). An identical word is skipped; otherwise
+        the bits from the closer end of the word to the farthest differing bit
+        are rewritten (see ``analytic.differential_write``) when that beats the
+        strategy in latency. Savings against always writing through the
+        strategy are kept in ``differential_stats``.
+        """
+        # Boundary test
+        if target_word < 0 or target_word > self.num_words - 1:
+            raise ArgumentError("Target word must be must be between 0 and (num_words - 1).")
+        if track < 0 or track > self.num_racetrack - 1:
+            raise ArgumentError("Track must be between 0 and (num_racetrack - 1).")
+
+        start = (self.inject_count, self.detect_count, self.remove_count, self.shift_count)
+        if self.differential == 'detect':
+            self.read(target_word, track)
+        pattern = self._pattern(number)
+        segment = self._read_segment(target_word, track)
+        word = (segment >> 1) & ((1 << self.word_size) - 1)
+        latencies, energies = self.cost_model.latency, self.cost_model.energy
+
+        full = self._full_counts(pattern, segment, target_word, track)
+        targets = [pattern]
+        if self.strategy == 'pw_plus':
+            targets = [flip_bits(pattern, self.pattern_width)]
+        elif self.strategy == 'adaptive':
+            targets.append(flip_bits(pattern, self.pattern_width))
+        best = None
+        for target in targets:
+            new, counts = analytic.differential_write(segment, self.word_size, target)
+            latency = sum(c * w for c, w in zip(counts, latencies))
+            if best is None or latency < best[0]:
+                best = (latency, target, new, counts)
+
+        stats = self.differential_stats
+        if best[0] < sum(c * w for c, w in zip(full, latencies)):
+            _, target, new, counts = best
+            stats["partial" if any(counts) else "skipped"] += 1
+            if self.analytic:
+                self._store_segment(new, target_word, track)
+                self.inject_count += counts[0]
+                self.detect_count += counts[1]
+                self.remove_count += counts[2]
+                self.shift_count += counts[3]
+            else:
+                self._rewrite_bits(word, target, target_word, track)
+        else:
+            stats["full"] += 1
+            getattr(self, DISPATCH[self.strategy].__name__)(number, target_word, track)
+
+        spent = (self.inject_count - start[0], self.detect_count - start[1],
+                 self.remove_count - start[2], self.shift_count - start[3])
+        stats["latency_saved"] += sum((f - c) * w for f, c, w in zip(full, spent, latencies))
+        stats["energy_saved"] += sum((f - c) * w for f, c, w in zip(full, spent, energies))
+
+
+_ADAPTIVE_FORMS = {"naive": analytic.naive_write, "pw": analytic.permutation_write}
+
+# --- Strategy dispatch table (unbound functions) ---
+DISPATCH: dict[str, WriteFn] = {
+    "naive": SKRM.naive_write,
+    "pw": SKRM.permutation_write,
+    "pw_plus": SKRM.pw_plus,
+    "adaptive": SKRM.adaptive_write,
+}
@@ -0,0 +1,204 @@
+"""Binary snapshots of ``SKRM`` instances, for checkpointing and resuming.
+
+A snapshot holds everything a write depends on: the geometry, strategy,
+precision and layout, the operation counters, the cost parameters, the
+adaptive strategy state and the storage bits (zlib-compressed unless
+``compress=False``), plus a ``records`` count that ``trace.run_trace``
+uses to resume a replay. Layout, little-endian:
+
+- a fixed header (``_HEADER``): magic, format version, flags, word size
+  (as stored, including the pw_plus flip bit), num_words, num_racetrack,
+  num_overhead, strategy, precision, layout and adaptive metric (8-byte
+  ASCII each), cache size, the four counters, the eight cost parameters,
+  the record count and the byte length of the storage block;
+- since version 2 (version 1 snapshots are restored without encoding and
+  with zeroed statistics): the encoding name (8-byte ASCII) and the
+  ``_STATS`` entry of the ``differential_stats`` and ``encoding_stats``;
+- one ``_PICKS`` entry per ``strategy_picks`` candidate, then the storage
+  block: the storage bits, or in the sparse layout (since version 2) the
+  ``_SPARSE`` counts of set ports, words and overhead bits followed by the
+  port positions, the word indices each with its value (``word_size`` bits,
+  padded to whole bytes) and the overhead positions, as unsigned 64-bit
+  integers.
+
+The transition cache contents are not saved (the restored instance gets
+an empty cache of the same size), nor is a custom ``write_fn``: restoring
+a snapshot taken with one requires passing it again.
+"""
+import os
+import struct
+import zlib
+from typing import NamedTuple, Optional
+
+from bitarray import bitarray
+
+from .argument_error import ArgumentError
+from .skrm import DISPATCH, SKRM, WriteFn, _flip_bit, _write_func
+from .sparse import SparseStorage
+
+
+MAGIC = b"PYSKRMSS"
+VERSION = 2
+COMPRESSED = 0x1
+ANALYTIC = 0x2
+CUSTOM_WRITE = 0x4
+DIFFERENTIAL = 0x8
+DIFFERENTIAL_DETECT = 0x10
+PLAN = 0x20
+
+_HEADER = struct.Struct("<8sHHIIII8s8s8s8sQ4Q8dQBQ")
+_ENCODING = struct.Struct("<8s")
+_STATS = struct.Struct("<3Q2d2Q")
+_PICKS = struct.Struct("<8sQdd")
+_SPARSE = struct.Struct("<3Q")
+_DIFFERENTIAL_STATS = ("skipped", "partial", "full", "latency_saved", "energy_saved")
+_ENCODING_STATS = ("corrected", "detected")
+_COSTS = ("inject_latency", "detect_latency", "remove_latency", "shift_latency",
+          "inject_energy", "detect_energy", "remove_energy", "shift_energy")
+
+
+class Checkpoint(NamedTuple):
+    skrm: SKRM
+    records: int
+
+
+def _name(text: str) -> bytes:
+    data = text.encode("ascii")
+    if len(data) > 8:
+        raise ArgumentError("Names in snapshots must be at most 8 ASCII characters: %s" % text)
+    return data
+
+
+def _sparse_bytes(sparse: SparseStorage) -> bytes:
+    size = (sparse.word_size + 7) // 8
+    words = b"".join(struct.pack("<Q", word) + value.to_bytes(size, "little")
+                     for word, value in sorted(sparse.words.items()))
+    return (_SPARSE.pack(len(sparse.aps), len(sparse.words), len(sparse.overhead)) +
+            struct.pack("<%dQ" % len(sparse.aps), *sorted(sparse.aps)) + words +
+            struct.pack("<%dQ" % len(sparse.overhead), *sorted(sparse.overhead)))
+
+
+def _load_sparse(sparse: SparseStorage, data: bytes) -> None:
+    size = (sparse.word_size + 7) // 8
+    try:
+        num_aps, num_words, num_overhead = _SPARSE.unpack_from(data)
+        offset = _SPARSE.size
+        aps = struct.unpack_from("<%dQ" % num_aps, data, offset)
+        offset += 8 * num_aps
+        for _ in range(num_words):
+            word = struct.unpack_from("<Q", data, offset)[0]
+            sparse.words[word] = int.from_bytes(data[offset + 8:offset + 8 + size], "little")
+            offset += 8 + size
+        sparse.overhead = set(struct.unpack_from("<%dQ" % num_overhead, data, offset))
+        offset += 8 * num_overhead
+    except struct.error:
+        raise ArgumentError("Truncated pySKRM snapshot.")
+    if offset != len(data):
+        raise ArgumentError("Snapshot storage does not match its geometry.")
+    sparse.aps.update((ap, 1) for ap in aps)
+
+
+def snapshot(skrm: SKRM, records: int = 0, compress: bool = True) -> bytes:
+    """Serialize ``skrm``; ``records`` is kept for the caller (e.g. the trace position)."""
+    flags = COMPRESSED if compress else 0
+    if skrm.analytic:
+        flags |= ANALYTIC
+    if skrm.differential is not None:
+        flags |= DIFFERENTIAL | (DIFFERENTIAL_DETECT if skrm.differential == 'detect' else 0)
+    elif skrm.engine == 'plan' and _write_func(skrm.write) is SKRM.plan_write:
+        flags |= PLAN
+    elif _write_func(skrm.write) is not DISPATCH.get(skrm.strategy):
+        flags |= CUSTOM_WRITE
+    if skrm.layout == 'sparse':
+        bits = _sparse_bytes(skrm._ring)
+    else:
+        bits = skrm.storage.tobytes()
+    if compress:
+        bits = zlib.compress(bits, 1)
+
+    header = _HEADER.pack(
+        MAGIC, VERSION, flags, skrm.word_size, skrm.num_words, skrm.num_racetrack, skrm.num_overhead,
+        _name(skrm.strategy), _name(skrm.precision), _name(skrm.layout), _name(skrm.adaptive_metric),
+        skrm.cache.max_bytes if skrm.cache is not None else 0,
+        skrm.inject_count, skrm.detect_count, skrm.remove_count, skrm.shift_count,
+        *(float(getattr(skrm, name)) for name in _COSTS),
+        records, len(skrm.strategy_picks), len(bits),
+    )
+    picks = b"".join(_PICKS.pack(_name(name), picks, latency, energy)
+                     for name, (picks, latency, energy) in skrm.strategy_picks.items())
+    stats = _STATS.pack(*(skrm.differential_stats[key] for key in _DIFFERENTIAL_STATS),
+                        *(skrm.encoding_stats[key] for key in _ENCODING_STATS))
+    return header + _ENCODING.pack(_name(skrm.encoding)) + stats + picks + bits
+
+
+def restore(data: bytes, write_fn: Optional[WriteFn] = None) -> Checkpoint:
+    """Rebuild the instance saved by ``snapshot``."""
+    if len(data) < _HEADER.size or data[:8] != MAGIC:
+        raise ArgumentError("Not a pySKRM snapshot.")
+    (_, version, flags, word_size, num_words, num_racetrack, num_overhead, strategy, precision, layout,
+     metric, cache_bytes, inject, detect, remove, shift, *rest) = _HEADER.unpack_from(data)
+    costs, (records, num_picks, length) = rest[:8], rest[8:]
+    if version not in (1, VERSION):
+        raise ArgumentError("Unsupported snapshot format version %d." % version)
+    if flags & CUSTOM_WRITE and write_fn is None:
+        raise ArgumentError("The snapshot was taken with a custom write_fn; pass it to restore.")
+
+    offset = _HEADER.size
+    encoding, stats = "none", None
+    if version >= 2:
+        encoding = _ENCODING.unpack_from(data, offset)[0].rstrip(b"\0").decode("ascii")
+        stats = _STATS.unpack_from(data, offset + _ENCODING.size)
+        offset += _ENCODING.size + _STATS.size
+
+    strategy = strategy.rstrip(b"\0").decode("ascii")
+    skrm = SKRM(
+        word_size - _flip_bit(strategy), num_words, num_racetrack,
+        strategy, num_overhead, write_fn, analytic=bool(flags & ANALYTIC),
+        precision=precision.rstrip(b"\0").decode("ascii"), cache_bytes=cache_bytes,
+        layout=layout.rstrip(b"\0").decode("ascii"),
+        differential=('detect' if flags & DIFFERENTIAL_DETECT else 'oracle') if flags & DIFFERENTIAL else None,
+        engine='plan' if flags & PLAN else 'direct', encoding=encoding,
+    )
+    skrm.inject_count, skrm.detect_count, skrm.remove_count, skrm.shift_count = inject, detect, remove, shift
+    for name, value in zip(_COSTS, costs):
+        setattr(skrm, name, value)
+    skrm.adaptive_metric = metric.rstrip(b"\0").decode("ascii")
+    if stats is not None:
+        skrm.differential_stats.update(zip(_DIFFERENTIAL_STATS, stats))
+        skrm.encoding_stats.update(zip(_ENCODING_STATS, stats[len(_DIFFERENTIAL_STATS):]))
+
+    skrm.strategy_picks = {}
+    for _ in range(num_picks):
+        name, picks, latency, energy = _PICKS.unpack_from(data, offset)
+        skrm.strategy_picks[name.rstrip(b"\0").decode("ascii")] = [picks, latency, energy]
+        offset += _PICKS.size
+    skrm.adaptive_strategies = tuple(skrm.strategy_picks)
+
+    bits = bytes(data[offset:offset + length])
+    if len(bits) != length:
+        raise ArgumentError("Truncated pySKRM snapshot.")
+    if flags & COMPRESSED:
+        bits = zlib.decompress(bits)
+    if skrm.layout == 'sparse' and version >= 2:
+        _load_sparse(skrm._ring, bits)
+        return Checkpoint(skrm, records)
+    storage = bitarray(endian="big")
+    storage.frombytes(bits)
+    del storage[len(skrm.storage):]
+    if len(storage) != len(skrm.storage):
+        raise ArgumentError("Snapshot storage does not match its geometry.")
+    skrm.storage = storage
+    return Checkpoint(skrm, records)
+
+
+def save(skrm: SKRM, path: str, records: int = 0, compress: bool = True) -> None:
+    """Write a snapshot to ``path``, replacing it atomically."""
+    tmp = "%s.tmp" % path
+    with open(tmp, "wb") as f:
+        f.write(snapshot(skrm, records, compress))
+    os.replace(tmp, path)
+
+
+def load(path: str, write_fn: Optional[WriteFn] = None) -> Checkpoint:
+    with open(path, "rb") as f:
+        return restore(f.read(), write_fn)
@@ -0,0 +1,144 @@
+"""Sparse storage for very large memories (``SKRM(layout='sparse')``).
+
+Only the access ports and words holding skyrmions are kept: the ports in a
+dict of set positions, every word as an integer (MSB first, as in
+``SKRM._read_segment``) in a dict keyed by its index, and nothing at all for
+the zeros. Memory therefore follows the touched working set rather than the
+size of the array. It plugs into ``SKRM`` where ``RingStorage`` does, with
+the same ``aps`` / ``segment`` / ``set_segment`` / ``shift`` interface, but
+is the only copy of the contents: ``SKRM.storage`` materializes a dense
+``bitarray`` from it on demand and assigning ``SKRM.storage`` loads one.
+"""
+from bitarray import bitarray
+from bitarray.util import ba2int, int2ba
+
+
+class _Ports(dict):
+    """Access-port bits by position: missing ports read 0, ports set to 0 are dropped."""
+    def __missing__(self, key: int) -> int:
+        return 0
+
+    def __setitem__(self, key: int, bit: int) -> None:
+        if bit:
+            dict.__setitem__(self, key, 1)
+        else:
+            self.pop(key, None)
+
+
+class SparseStorage:
+    def __init__(self, word_size: int, num_words: int, num_racetrack: int, track_length: int) -> None:
+        self.word_size = word_size
+        self.num_words = num_words
+        self.num_racetrack = num_racetrack
+        self.track_length = track_length
+        self.aps = _Ports()
+        self.words: dict = {}
+        # Set bits of the overhead regions, which no operation moves
+        self.overhead: set = set()
+
+    def __len__(self) -> int:
+        """Number of words holding at least one skyrmion."""
+        return len(self.words)
+
+    def copy(self) -> "SparseStorage":
+        other = SparseStorage(self.word_size, self.num_words, self.num_racetrack, self.track_length)
+        other.aps.update(self.aps)
+        other.words = dict(self.words)
+        other.overhead = set(self.overhead)
+        return other
+
+    def track_copy(self, track: int) -> "SparseStorage":
+        """Single-track copy holding racetrack ``track``."""
+        other = SparseStorage(self.word_size, self.num_words, 1, self.track_length)
+        ap_base, word_base, pos_base = track * (self.num_words + 1), track * self.num_words, track * self.track_length
+        other.aps.update((ap - ap_base, 1) for ap in self.aps if 0 <= ap - ap_base <= self.num_words)
+        other.words = {word - word_base: value for word, value in self.words.items()
+                       if 0 <= word - word_base < self.num_words}
+        other.overhead = {pos - pos_base for pos in self.overhead if 0 <= pos - pos_base < self.track_length}
+        return other
+
+    def put_track(self, track: int, other: "SparseStorage") -> None:
+        """Replace racetrack ``track`` with the single track of ``other`` (see ``track_copy``)."""
+        ap_base, word_base, pos_base = track * (self.num_words + 1), track * self.num_words, track * self.track_length
+        for ap in [ap for ap in self.aps if 0 <= ap - ap_base <= self.num_words]:
+            del self.aps[ap]
+        for word in [word for word in self.words if 0 <= word - word_base < self.num_words]:
+            del self.words[word]
+        self.overhead = {pos for pos in self.overhead if not 0 <= pos - pos_base < self.track_length}
+        self.aps.update((ap_base + ap, 1) for ap in other.aps)
+        self.words.update((word_base + word, value) for word, value in other.words.items())
+        self.overhead.update(pos_base + pos for pos in other.overhead)
+
+    def load(self, storage: bitarray) -> None:
+        """Take the contents of a dense flat-layout bitarray."""
+        ws = self.word_size
+        self.aps.clear()
+        self.words.clear()
+        self.overhead.clear()
+        for pos in storage.search(1):
+            track, offset = divmod(pos, self.track_length)
+            k, r = divmod(offset + 1, ws + 1)
+            if 1 <= k <= self.num_words + 1 and r == 0:
+                self.aps[track * (self.num_words + 1) + k - 1] = 1
+            elif 1 <= k <= self.num_words and offset < (ws + 1) * (self.num_words + 1):
+                word = track * self.num_words + k - 1
+                start = self.track_length * track + (ws + 1) * k
+                if word not in self.words:
+                    self.words[word] = ba2int(storage[start:start + ws])
+            else:
+                self.overhead.add(pos)
+
+    def store(self, storage: bitarray) -> None:
+        """Write the contents into a zeroed dense flat-layout bitarray."""
+        ws = self.word_size
+        for ap in self.aps:
+            track, k = divmod(ap, self.num_words + 1)
+            storage[self.track_length * track + (ws + 1) * (k + 1) - 1] = 1
+        for word, value in self.words.items():
+            track, k = divmod(word, self.num_words)
+            start = self.track_length * track + (ws + 1) * (k + 1)
+            storage[start:start + ws] = int2ba(value, ws, endian="big")
+        for pos in self.overhead:
+            storage[pos] = 1
+
+    def segment(self, target_word: int, track: int) -> int:
+        """The segment [AP target_word, AP target_word + 1] as an integer, as ``SKRM._read_segment``."""
+        ap = track * (self.num_words + 1) + target_word
+        word = self.words.get(track * self.num_words + target_word, 0)
+        return (self.aps[ap] << (self.word_size + 1)) | (word << 1) | self.aps[ap + 1]
+
+    def set_segment(self, segment: int, target_word: int, track: int) -> None:
+        ws = self.word_size
+        ap = track * (self.num_words + 1) + target_word
+        self.aps[ap] = (segment >> (ws + 1)) & 1
+        self.aps[ap + 1] = segment & 1
+        self._set_word(track * self.num_words + target_word, (segment >> 1) & ((1 << ws) - 1))
+
+    def _set_word(self, word: int, value: int) -> None:
+        if value:
+            self.words[word] = value
+        else:
+            self.words.pop(word, None)
+
+    def shift(self, start_ap: int, end_ap: int, track: int) -> None:
+        """Same effect as the flat ``SKRM.shift`` between two different access ports."""
+        ws = self.word_size
+        aps, words = self.aps, self.words
+        ap_base = track * (self.num_words + 1)
+        word_base = track * self.num_words
+        if start_ap < end_ap:
+            # Toward the higher port: the last bit of each word moves onto the port after it
+            for k in range(end_ap - 1, start_ap - 1, -1):
+                value = words.get(word_base + k, 0)
+                aps[ap_base + k + 1] = value & 1
+                self._set_word(word_base + k, (aps[ap_base + k] << (ws - 1)) | (value >> 1))
+                aps[ap_base + k] = 0
+        else:
+            # Toward the lower port: the first bit of each word moves onto the port before it
+            top = ws - 1
+            mask = (1 << ws) - 1
+            for k in range(end_ap, start_ap):
+                value = words.get(word_base + k, 0)
+                aps[ap_base + k] = value >> top
+                self._set_word(word_base + k, ((value << 1) & mask) | aps[ap_base + k + 1])
+                aps[ap_base + k + 1] = 0
@@ -0,0 +1,60 @@
+"""Structured operation reports.
+
+``SKRM.stats()`` returns the numbers behind ``render_summary`` as a ``Stats``
+dataclass, so large sweeps can add reports up (``+`` or ``aggregate``) and
+turn them into table rows (``as_row``) without formatting strings.
+"""
+from dataclasses import asdict, dataclass, field, fields
+from typing import Dict, Iterable, List
+
+
+@dataclass
+class Stats:
+    """Operation counts with their total latency and energy per kind of operation."""
+    inject_count: int = 0
+    detect_count: int = 0
+    remove_count: int = 0
+    shift_count: int = 0
+    inject_latency: float = 0.0
+    detect_latency: float = 0.0
+    remove_latency: float = 0.0
+    shift_latency: float = 0.0
+    inject_energy: float = 0.0
+    detect_energy: float = 0.0
+    remove_energy: float = 0.0
+    shift_energy: float = 0.0
+    # Adaptive strategy: candidate -> [picks, latency, energy]
+    strategy_picks: Dict[str, List[float]] = field(default_factory=dict)
+
+    @property
+    def total_count(self) -> int:
+        return self.inject_count + self.detect_count + self.remove_count + self.shift_count
+
+    @property
+    def total_latency(self) -> float:
+        return self.inject_latency + self.detect_latency + self.remove_latency + self.shift_latency
+
+    @property
+    def total_energy(self) -> float:
+        return self.inject_energy + self.detect_energy + self.remove_energy + self.shift_energy
+
+    def __add__(self, other: "Stats") -> "Stats":
+        totals = {f.name: getattr(self, f.name) + getattr(other, f.name)
+                  for f in fields(self) if f.name != "strategy_picks"}
+        picks = {name: list(values) for name, values in self.strategy_picks.items()}
+        for name, values in other.strategy_picks.items():
+            picks[name] = [a + b for a, b in zip(picks.get(name, [0, 0.0, 0.0]), values)]
+        return Stats(**totals, strategy_picks=picks)
+
+    def as_row(self) -> Dict[str, float]:
+        """Flat dict of every field and total (picks as ``picks_<name>``)."""
+        row = asdict(self)
+        for name, (picks, _, _) in row.pop("strategy_picks").items():
+            row["picks_%s" % name] = picks
+        row.update(total_count=self.total_count, total_latency=self.total_latency, total_energy=self.total_energy)
+        return row
+
+
+def aggregate(reports: Iterable[Stats]) -> Stats:
+    """Sum of many reports."""
+    return sum(reports, Stats())
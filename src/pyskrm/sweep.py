@@ -0,0 +1,150 @@
+"""Design-space sweeps over structural and cost parameters.
+
+A sweep runs one trace through every combination of a parameter grid. The
+operation counts depend on the structural parameters only (``STRUCTURAL``),
+so every structural configuration is simulated once, in a process pool when
+``max_workers`` is not 0, and then re-priced for every combination of the
+cost constants (``COSTS``). Results are rows of plain dicts, written to CSV or
+JSON lines by ``write_table``.
+
+Command line::
+
+    python -m pyskrm.sweep trace.csv -g word_size=32,64 -g strategy=naive,pw_plus \\
+        -g shift_latency=0.5,1.0 --jobs 4 -o sweep.csv
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from .argument_error import ArgumentError
+from .skrm import SKRM
+from .trace import DEFAULT_CHUNK_SIZE, run_trace
+
+
+STRUCTURAL = ("word_size", "num_words", "num_racetrack", "strategy", "num_overhead", "precision")
+COSTS = (
+    "inject_latency", "detect_latency", "remove_latency", "shift_latency",
+    "inject_energy", "detect_energy", "remove_energy", "shift_energy",
+)
+COUNTS = ("inject_count", "detect_count", "remove_count", "shift_count")
+
+Grid = Dict[str, Sequence[Any]]
+Row = Dict[str, Any]
+
+
+def _combinations(grid: Grid, names: Iterable[str]) -> List[Dict[str, Any]]:
+    keys = [name for name in names if name in grid]
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[key] for key in keys))]
+
+
+def _simulate(config: Dict[str, Any], trace, chunk_size: int):
+    """Counts of one structural configuration and the default cost constants of its instance."""
+    skrm = SKRM(**config)
+    if isinstance(trace, (str, os.PathLike)):
+        for _ in run_trace(skrm, trace, chunk_size):
+            pass
+    else:
+        skrm._write_batch(*trace)
+    counts = (skrm.inject_count, skrm.detect_count, skrm.remove_count, skrm.shift_count)
+    return counts, {name: getattr(skrm, name) for name in COSTS}
+
+
+def sweep(trace, grid: Grid, max_workers: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[Row]:
+    """Run ``trace`` through every combination of ``grid``.
+
+    ``trace`` is a trace file path or a ``(values, targets[, tracks])`` tuple of
+    arrays. ``grid`` maps parameter names from ``STRUCTURAL`` and ``COSTS`` to
+    the values to sweep; ``word_size`` and ``num_words`` are required, every
+    other parameter keeps the ``SKRM`` default when absent. ``max_workers=0``
+    simulates in this process.
+    """
+    unknown = set(grid) - set(STRUCTURAL) - set(COSTS)
+    if unknown:
+        raise ArgumentError("Unknown sweep parameter: %s" % ", ".join(sorted(unknown)))
+    if "word_size" not in grid or "num_words" not in grid:
+        raise ArgumentError("The sweep grid must give word_size and num_words.")
+    if any(len(values) == 0 for values in grid.values()):
+        raise ArgumentError("Every sweep parameter needs at least one value.")
+
+    configs = _combinations(grid, STRUCTURAL)
+    if max_workers == 0 or len(configs) < 2:
+        outcomes = [_simulate(config, trace, chunk_size) for config in configs]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            n = len(configs)
+            outcomes = list(pool.map(_simulate, configs, [trace] * n, [chunk_size] * n))
+
+    rows = []
+    pricings = _combinations(grid, COSTS)
+    for config, (counts, defaults) in zip(configs, outcomes):
+        for pricing in pricings:
+            costs = dict(defaults, **pricing)
+            row: Row = dict(config)
+            row.update(costs)
+            row.update(zip(COUNTS, counts))
+            row["latency"] = sum(count * costs[name] for count, name in zip(counts, COSTS[:4]))
+            row["energy"] = sum(count * costs[name] for count, name in zip(counts, COSTS[4:]))
+            rows.append(row)
+    return rows
+
+
+def write_table(rows: List[Row], path: str, fmt: Optional[str] = None) -> None:
+    """Write sweep rows as CSV or JSON lines (``fmt`` 'csv'/'jsonl', else picked from the file name)."""
+    if fmt is None:
+        fmt = "jsonl" if str(path).endswith((".jsonl", ".json")) else "csv"
+    if fmt == "jsonl":
+        with open(path, "w") as f:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+    elif fmt == "csv":
+        fields = list(rows[0]) if rows else []
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        raise ArgumentError("Output format should be 'csv' or 'jsonl'.")
+
+
+def _parse_value(text: str):
+    for kind in (int, float):
+        try:
+            return kind(text)
+        except ValueError:
+            pass
+    return text
+
+
+def parse_grid(specs: Iterable[str]) -> Grid:
+    """Parse ``name=v1,v2,...`` specs into a grid."""
+    grid: Grid = {}
+    for spec in specs:
+        name, sep, values = spec.partition("=")
+        if not sep or not values:
+            raise ArgumentError("Grid parameters look like name=v1,v2,...: %s" % spec)
+        grid[name.strip()] = [_parse_value(v.strip()) for v in values.split(",")]
+    return grid
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m pyskrm.sweep", description="Sweep a trace over a parameter grid.")
+    parser.add_argument("trace", help="trace file (.csv, .bin, .skt, optionally .gz)")
+    parser.add_argument("-g", "--grid", action="append", default=[], metavar="NAME=V1,V2",
+                        help="parameter values to sweep, repeatable")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (0: run inline)")
+    parser.add_argument("-o", "--output", required=True, help="output table (.csv or .jsonl)")
+    parser.add_argument("--format", choices=("csv", "jsonl"), default=None)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    rows = sweep(args.trace, parse_grid(args.grid), max_workers=args.jobs, chunk_size=args.chunk_size)
+    write_table(rows, args.output, args.format)
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -0,0 +1,352 @@
+"""Streaming trace ingestion with bounded memory.
+
+A trace is a sequence of writes ``(value, target_word, track)``. Traces are
+never loaded whole: records are streamed from the file by generators and
+grouped into fixed-size NumPy chunks, so memory use depends on
+``chunk_size`` only, not on the trace length.
+
+Supported inputs (picked from the file name, ``.gz`` is decompressed on the fly):
+
+- ``*.csv``: one ``value,target_word[,track]`` record per line; blank lines,
+  ``#`` comments and a header line are skipped. Values are kept as float64,
+  so that double-precision instances see them unrounded.
+- ``*.bin``: headerless packed little-endian records of ``float32 value,
+  uint32 target_word`` (``RECORD_DTYPE``), memory-mapped when not compressed.
+- ``*.skt``: the pySKRM binary trace format, see ``TraceFile``. Produced from
+  CSV by ``convert_csv`` (float64 values with ``double=True``); always
+  memory-mapped, so it cannot be gzipped.
+"""
+import gzip
+import io
+import os
+import struct
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterable, Iterator, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .argument_error import ArgumentError
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .skrm import SKRM
+
+
+RECORD_DTYPE = np.dtype([("value", "<f4"), ("target", "<u4")])
+
+# .skt header: magic, version, flags, word_size, num_words, strategy hint, record count
+SKT_MAGIC = b"PYSKRMTR"
+SKT_VERSION = 2
+SKT_HAS_TRACK = 0x1
+SKT_DOUBLE = 0x2
+_SKT_HEADER = struct.Struct("<8sHHII8sQ28x")
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+Record = Tuple[float, int, int]
+
+
+class TraceChunk(NamedTuple):
+    values: np.ndarray
+    targets: np.ndarray
+    tracks: Optional[np.ndarray]
+
+
+@dataclass
+class TraceProgress:
+    """Rolling totals after a chunk of the trace has been simulated."""
+    records: int
+    inject_count: int
+    detect_count: int
+    remove_count: int
+    shift_count: int
+    latency: float
+    energy: float
+
+
+def _open(path: str, mode: str = "rt"):
+    if str(path).endswith(".gz"):
+        return gzip.open(path, mode)
+    return open(path, mode)
+
+
+def _trace_format(path: str) -> str:
+    name = str(path)
+    if name.endswith(".gz"):
+        name = name[:-3]
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith(".bin"):
+        return "bin"
+    if name.endswith(".skt") and name == str(path):
+        return "skt"
+    raise ArgumentError("Unknown trace format: %s" % path)
+
+
+def read_csv(path: str) -> Iterator[Record]:
+    """Stream ``(value, target_word, track)`` records from a (gzipped) CSV trace."""
+    with _open(path) as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            fields = line.split(",")
+            try:
+                value = float(fields[0])
+                target_word = int(fields[1])
+                track = int(fields[2]) if len(fields) > 2 and fields[2].strip() else 0
+            except (ValueError, IndexError):
+                if lineno == 1:
+                    continue  # header
+                raise ArgumentError("Malformed trace record at %s:%d" % (path, lineno))
+            yield value, target_word, track
+
+
+def _binary_blocks(path: str, chunk_size: int) -> Iterator[np.ndarray]:
+    if str(path).endswith(".gz"):
+        with gzip.open(path, "rb") as f:
+            while True:
+                block = f.read(chunk_size * RECORD_DTYPE.itemsize)
+                if not block:
+                    return
+                if len(block) % RECORD_DTYPE.itemsize:
+                    raise ArgumentError("Truncated binary trace: %s" % path)
+                yield np.frombuffer(block, dtype=RECORD_DTYPE)
+    else:
+        with open(path, "rb") as f:
+            f.seek(0, io.SEEK_END)
+            size = f.tell()
+        if size % RECORD_DTYPE.itemsize:
+            raise ArgumentError("Truncated binary trace: %s" % path)
+        if size == 0:
+            return
+        records = np.memmap(path, dtype=RECORD_DTYPE, mode="r")
+        for start in range(0, len(records), chunk_size):
+            yield records[start:start + chunk_size]
+
+
+def read_binary(path: str) -> Iterator[Record]:
+    """Stream ``(value, target_word, track)`` records from a (gzipped) binary trace."""
+    for block in _binary_blocks(path, DEFAULT_CHUNK_SIZE):
+        for value, target_word in zip(block["value"].tolist(), block["target"].tolist()):
+            yield value, target_word, 0
+
+
+def skt_dtype(has_track: bool, double: bool) -> np.dtype:
+    """The record dtype of a ``.skt`` trace with the given flags."""
+    fields = [("value", "<f8" if double else "<f4"), ("target", "<u4")]
+    if has_track:
+        fields.append(("track", "<u2"))
+    return np.dtype(fields)
+
+
+class TraceFile:
+    """Memory-mapped ``.skt`` trace.
+
+    Layout: a 64-byte little-endian header (``SKT_MAGIC``, format version,
+    flags, word_size, num_words, an 8-byte ASCII strategy hint, record count)
+    followed by packed records of a value (``float64`` with the ``SKT_DOUBLE``
+    flag, else ``float32``), ``uint32 target_word`` and, when the
+    ``SKT_HAS_TRACK`` flag is set, ``uint16 track``. A word_size or num_words
+    of 0 and an empty strategy mean "no hint". Float32 traces are written as
+    version 1, which has no ``SKT_DOUBLE`` flag; version 2 adds it.
+
+    ``records`` is a ``numpy.memmap`` over the file; ``chunks`` slices it
+    without copying, so the values handed to ``SKRM.replay`` are views of the
+    mapped file.
+    """
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as f:
+            header = f.read(_SKT_HEADER.size)
+            f.seek(0, io.SEEK_END)
+            size = f.tell()
+        if len(header) < _SKT_HEADER.size or header[:8] != SKT_MAGIC:
+            raise ArgumentError("Not a pySKRM trace file: %s" % path)
+        magic, version, flags, word_size, num_words, strategy, count = _SKT_HEADER.unpack(header)
+        if version not in (1, SKT_VERSION):
+            raise ArgumentError("Unsupported trace format version %d: %s" % (version, path))
+
+        self.path = path
+        self.has_track = bool(flags & SKT_HAS_TRACK)
+        self.double = bool(flags & SKT_DOUBLE)
+        self.word_size = word_size
+        self.num_words = num_words
+        self.strategy = strategy.rstrip(b"\0").decode("ascii")
+        dtype = skt_dtype(self.has_track, self.double)
+        if size != _SKT_HEADER.size + count * dtype.itemsize:
+            raise ArgumentError("Truncated binary trace: %s" % path)
+        if count:
+            self.records = np.memmap(path, dtype=dtype, mode="r", offset=_SKT_HEADER.size, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=dtype)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def chunks(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[TraceChunk]:
+        if chunk_size < 1:
+            raise ArgumentError("chunk_size must be positive.")
+        for start in range(0, len(self.records), chunk_size):
+            block = self.records[start:start + chunk_size]
+            yield TraceChunk(block["value"], block["target"], block["track"] if self.has_track else None)
+
+    def __iter__(self) -> Iterator[Record]:
+        for chunk in self.chunks():
+            tracks = chunk.tracks.tolist() if chunk.tracks is not None else [0] * len(chunk.values)
+            yield from zip(chunk.values.tolist(), chunk.targets.tolist(), tracks)
+
+    def new_skrm(self, **kwargs) -> "SKRM":
+        """An SKRM built from the header hints; keyword arguments override them."""
+        from .skrm import SKRM
+
+        params = {}
+        if self.word_size:
+            params["word_size"] = self.word_size
+        if self.num_words:
+            params["num_words"] = self.num_words
+        if self.strategy:
+            params["strategy"] = self.strategy
+        params.update(kwargs)
+        return SKRM(**params)
+
+
+def convert_csv(csv_path: str, out_path: str, word_size: int = 0, num_words: int = 0,
+                strategy: str = "", with_track: bool = False, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                double: bool = False) -> int:
+    """Convert a (gzipped) CSV trace into a ``.skt`` file, streaming; returns the record count.
+
+    When ``num_words`` is 0 the header records the highest target word + 1.
+    Values are stored as float32, or as float64 (a version 2 file) when ``double`` is True.
+    """
+    hint = strategy.encode("ascii")
+    if len(hint) > 8:
+        raise ArgumentError("Strategy hint must be at most 8 ASCII characters.")
+    dtype = skt_dtype(with_track, double)
+
+    count = 0
+    highest = -1
+    with open(out_path, "wb") as out:
+        out.write(bytes(_SKT_HEADER.size))
+        for chunk in chunked(read_csv(csv_path), chunk_size):
+            if not with_track and chunk.tracks.any():
+                raise ArgumentError("Trace addresses racetracks; convert it with with_track=True.")
+            block = np.empty(len(chunk.values), dtype=dtype)
+            block["value"] = chunk.values
+            block["target"] = chunk.targets
+            if with_track:
+                block["track"] = chunk.tracks
+            out.write(block.tobytes())
+            count += len(block)
+            highest = max(highest, int(chunk.targets.max()))
+
+        out.seek(0)
+        flags = (SKT_HAS_TRACK if with_track else 0) | (SKT_DOUBLE if double else 0)
+        version = SKT_VERSION if double else 1
+        out.write(_SKT_HEADER.pack(SKT_MAGIC, version, flags, word_size, num_words or highest + 1, hint, count))
+    return count
+
+
+def read_trace(path: str) -> Iterator[Record]:
+    """Stream records from any supported trace file."""
+    fmt = _trace_format(path)
+    if fmt == "csv":
+        return read_csv(path)
+    if fmt == "skt":
+        return iter(TraceFile(path))
+    return read_binary(path)
+
+
+def chunked(records: Iterable[Record], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[TraceChunk]:
+    """Group a record stream into ``TraceChunk`` arrays of at most ``chunk_size`` records."""
+    if chunk_size < 1:
+        raise ArgumentError("chunk_size must be positive.")
+    chunk = TraceChunk(np.empty(chunk_size, np.float64), np.empty(chunk_size, np.int64), np.empty(chunk_size, np.int64))
+    n = 0
+    for value, target_word, track in records:
+        chunk.values[n] = value
+        chunk.targets[n] = target_word
+        chunk.tracks[n] = track
+        n += 1
+        if n == chunk_size:
+            yield chunk
+            chunk = TraceChunk(np.empty(chunk_size, np.float64), np.empty(chunk_size, np.int64), np.empty(chunk_size, np.int64))
+            n = 0
+    if n:
+        yield TraceChunk(chunk.values[:n], chunk.targets[:n], chunk.tracks[:n])
+
+
+def read_chunks(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[TraceChunk]:
+    """Stream a trace file as ``TraceChunk`` arrays.
+
+    Binary traces are sliced straight out of the file without going through
+    per-record Python objects; their chunks have ``tracks`` set to None when
+    the file carries no track field.
+    """
+    fmt = _trace_format(path)
+    if fmt == "csv":
+        yield from chunked(read_csv(path), chunk_size)
+        return
+    if fmt == "skt":
+        yield from TraceFile(path).chunks(chunk_size)
+        return
+    if chunk_size < 1:
+        raise ArgumentError("chunk_size must be positive.")
+    for block in _binary_blocks(path, chunk_size):
+        yield TraceChunk(block["value"], block["target"], None)
+
+
+def _skip(chunks: Iterable[TraceChunk], count: int) -> Iterator[TraceChunk]:
+    for chunk in chunks:
+        if count >= len(chunk.values):
+            count -= len(chunk.values)
+            continue
+        if count:
+            chunk = TraceChunk(chunk.values[count:], chunk.targets[count:],
+                               chunk.tracks[count:] if chunk.tracks is not None else None)
+            count = 0
+        yield chunk
+
+
+def run_trace(skrm: "SKRM", trace, chunk_size: int = DEFAULT_CHUNK_SIZE, checkpoint: Optional[str] = None,
+              checkpoint_every: int = 1, start: int = 0) -> Iterator[TraceProgress]:
+    """Feed a trace into ``skrm`` chunk by chunk, yielding rolling totals after each chunk.
+
+    ``trace`` is a file path or an iterable of ``TraceChunk``. The totals are
+    computed from the instance counters and cover the records replayed by
+    this call; ``records`` counts from the start of the trace.
+
+    With ``checkpoint`` set, the instance and the number of records replayed
+    are saved to that path (``snapshot.save``) every ``checkpoint_every``
+    chunks and at the end. ``start`` skips records to resume from one::
+
+        skrm, records = snapshot.load(path)
+        run_trace(skrm, trace, checkpoint=path, start=records)
+    """
+    if checkpoint_every < 1:
+        raise ArgumentError("checkpoint_every must be positive.")
+    if checkpoint is not None:
+        from .snapshot import save
+
+    chunks = read_chunks(trace, chunk_size) if isinstance(trace, (str, os.PathLike)) else trace
+    if start:
+        chunks = _skip(chunks, start)
+    begin = (skrm.inject_count, skrm.detect_count, skrm.remove_count, skrm.shift_count)
+    records = start
+    for n, chunk in enumerate(chunks, 1):
+        skrm._write_batch(chunk.values, chunk.targets, chunk.tracks)
+        records += len(chunk.values)
+        if checkpoint is not None and n % checkpoint_every == 0:
+            save(skrm, checkpoint, records)
+
+        inject = skrm.inject_count - begin[0]
+        detect = skrm.detect_count - begin[1]
+        remove = skrm.remove_count - begin[2]
+        shift = skrm.shift_count - begin[3]
+        yield TraceProgress(
+            records, inject, detect, remove, shift,
+            latency=inject * skrm.inject_latency + detect * skrm.detect_latency +
+                    remove * skrm.remove_latency + shift * skrm.shift_latency,
+            energy=inject * skrm.inject_energy + detect * skrm.detect_energy +
+                   remove * skrm.remove_energy + shift * skrm.shift_energy,
+        )
+    if checkpoint is not None:
+        save(skrm, checkpoint, records)
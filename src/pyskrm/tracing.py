@@ -0,0 +1,200 @@
+"""Opt-in operation tracing.
+
+``Tracer.attach(skrm)`` shadows the primitives, ``write``, ``read`` and the
+built-in strategies of one instance with recording wrappers (instance
+attributes, like ``SKRM.write``); ``detach`` removes them again. An
+instance without a tracer runs the plain class methods, so tracing costs
+nothing while it is off. Copies and pickles of a traced instance are not
+traced (see ``SKRM.__getstate__``).
+
+Every primitive is recorded with its AP, track, and the strategy and word of
+the write or read that issued it; writes and reads themselves are recorded
+with their duration (so analytic-mode writes, which issue no primitives,
+show up too). The most recent ``capacity`` events are kept in a ring buffer
+and can be exported as histograms or as a Chrome trace
+(``chrome://tracing`` / Perfetto JSON).
+"""
+import json
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional
+
+from .argument_error import ArgumentError
+
+
+PRIMITIVES = ("inject", "detect", "remove", "shift")
+# Traced methods issuing primitives -> the strategy label of their events
+ACCESSES = {
+    "write": None,
+    "read": "read",
+    "naive_write": "naive",
+    "permutation_write": "pw",
+    "pw_plus": "pw_plus",
+    "adaptive_write": "adaptive",
+}
+
+
+class Event(NamedTuple):
+    ts: int           # perf_counter_ns at the start
+    dur: int          # nanoseconds; 0 for primitives
+    op: str
+    ap: int           # -1 for writes and reads; the start AP for shifts
+    track: int
+    strategy: str     # "" outside writes and reads
+    word: int         # -1 outside writes and reads
+
+
+class Tracer:
+    def __init__(self, capacity: int = 1 << 16) -> None:
+        if capacity < 1:
+            raise ArgumentError("Tracer capacity must be positive.")
+        self.capacity = capacity
+        self._buffer: List[Optional[tuple]] = [None] * capacity
+        self._count = 0
+        self._callbacks: List[Callable[[Event], None]] = []
+        self._skrm = None
+        self._saved: Dict[str, object] = {}
+        # (strategy, word) of the innermost write/read in progress
+        self._context = ("", -1)
+
+    # ---------- Recording ----------
+    def _record(self, event: tuple) -> None:
+        self._buffer[self._count % self.capacity] = event
+        self._count += 1
+        for callback in self._callbacks:
+            callback(Event(*event))
+
+    def add_callback(self, callback: Callable[[Event], None]) -> None:
+        """Call ``callback(event)`` for every event as it is recorded."""
+        self._callbacks.append(callback)
+
+    def _wrap_primitive(self, name: str, inner):
+        record = self._record
+        clock = time.perf_counter_ns
+        tracer = self
+
+        if name == "shift":
+            def traced(start_ap, end_ap, track=0):
+                strategy, word = tracer._context
+                record((clock(), 0, name, start_ap, track, strategy, word))
+                return inner(start_ap, end_ap, track)
+        else:
+            def traced(ap, track=0):
+                strategy, word = tracer._context
+                record((clock(), 0, name, ap, track, strategy, word))
+                return inner(ap, track)
+        return traced
+
+    def _wrap_access(self, name: str, label: Optional[str], inner, skrm):
+        tracer = self
+        clock = time.perf_counter_ns
+
+        def run(args, target_word, track):
+            outer = tracer._context
+            strategy = label if label is not None else skrm.strategy
+            tracer._context = (strategy, target_word)
+            start = clock()
+            try:
+                return inner(*args)
+            finally:
+                tracer._context = outer
+                # Nested calls (adaptive -> its pick) are covered by the outer span
+                if not outer[0]:
+                    tracer._record((start, clock() - start, "read" if name == "read" else "write",
+                                    -1, track, strategy, target_word))
+
+        if name == "read":
+            def traced(target_word, track=0, destructive=False):
+                return run((target_word, track, destructive), target_word, track)
+        else:
+            def traced(number, target_word, track=0):
+                return run((number, target_word, track), target_word, track)
+        traced.__wrapped__ = inner
+        return traced
+
+    # ---------- Attach / detach ----------
+    def attach(self, skrm) -> "Tracer":
+        if self._skrm is not None:
+            raise ArgumentError("Tracer is already attached.")
+        self._skrm = skrm
+        for name in PRIMITIVES:
+            self._saved[name] = skrm.__dict__.get(name)
+            setattr(skrm, name, self._wrap_primitive(name, getattr(skrm, name)))
+        for name, label in ACCESSES.items():
+            self._saved[name] = skrm.__dict__.get(name)
+            setattr(skrm, name, self._wrap_access(name, label, getattr(skrm, name), skrm))
+        return self
+
+    def detach(self) -> None:
+        skrm = self._skrm
+        if skrm is None:
+            return
+        for name, previous in self._saved.items():
+            if previous is None:
+                del skrm.__dict__[name]
+            else:
+                setattr(skrm, name, previous)
+        self._saved = {}
+        self._skrm = None
+
+    @contextmanager
+    def attached(self, skrm) -> Iterator["Tracer"]:
+        self.attach(skrm)
+        try:
+            yield self
+        finally:
+            self.detach()
+
+    # ---------- Queries & exports ----------
+    @property
+    def dropped(self) -> int:
+        """Events overwritten because the ring buffer was full."""
+        return max(0, self._count - self.capacity)
+
+    def events(self) -> List[Event]:
+        """The kept events, oldest first."""
+        if self._count <= self.capacity:
+            kept = self._buffer[:self._count]
+        else:
+            start = self._count % self.capacity
+            kept = self._buffer[start:] + self._buffer[:start]
+        return [Event(*event) for event in kept]
+
+    def clear(self) -> None:
+        self._buffer = [None] * self.capacity
+        self._count = 0
+
+    def histogram(self, by: str = "word") -> Dict[object, Counter]:
+        """Primitive counts per op, grouped by ``'word'``, ``'strategy'``, ``'ap'`` or ``'track'``."""
+        if by not in ("word", "strategy", "ap", "track"):
+            raise ArgumentError("Histograms group by 'word', 'strategy', 'ap' or 'track'.")
+        groups: Dict[object, Counter] = {}
+        for event in self.events():
+            if event.op in PRIMITIVES:
+                groups.setdefault(getattr(event, by), Counter())[event.op] += 1
+        return groups
+
+    def chrome_trace(self) -> dict:
+        """Chrome trace-event JSON object: one thread per track, writes/reads as spans, primitives as instants."""
+        events = self.events()
+        origin = events[0].ts if events else 0
+        trace = []
+        for event in events:
+            entry = {
+                "name": event.op, "cat": event.strategy or "primitive", "pid": 0, "tid": event.track,
+                "ts": (event.ts - origin) / 1000.0,
+                "args": {"ap": event.ap, "word": event.word, "strategy": event.strategy},
+            }
+            if event.op in PRIMITIVES:
+                entry["ph"] = "i"
+                entry["s"] = "t"
+            else:
+                entry["ph"] = "X"
+                entry["dur"] = event.dur / 1000.0
+            trace.append(entry)
+        return {"traceEvents": trace, "displayTimeUnit": "ns"}
+
+    def write_chrome_trace(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
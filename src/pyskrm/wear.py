@@ -0,0 +1,233 @@
+"""Wear tracking and wear leveling.
+
+``WearTracker(skrm)`` counts, per racetrack position, the injects and
+removes at every access port (nucleation/annihilation sites) and the shifts
+of every segment ``[AP k, word k, AP k + 1]``, in NumPy arrays:
+
+- ``injects`` / ``removes``: ``(num_racetrack, num_words + 1)``, one column per AP;
+- ``shifts``: ``(num_racetrack, num_words)``, one column per segment.
+
+The primitives of the instance are shadowed by counting wrappers (instance
+attributes, see ``tracing``), so an instance without a tracker pays
+nothing; copies of the instance (``Bank`` tracks, the baseline of
+``ShiftScheduler``) are not tracked. Operations a write only counts without issuing a primitive
+(analytic mode, transition-cache hits, the trailing removes of pw) are
+attributed to where the built-in strategies perform them: injects and
+removes at AP ``target_word + 1`` (re-injects of a read at AP
+``target_word``), shifts to segment ``target_word``. Writes are simulated
+one at a time while a tracker is attached.
+
+``WearLeveler`` remaps logical words to physical words in front of
+``write``/``read`` with Start-Gap: one word per track is kept as a gap and
+moved by one position every ``interval`` writes to the track, copying its
+neighbour with a read and a write, so the copies are charged like any
+other access.
+"""
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+
+from .argument_error import ArgumentError
+
+
+@dataclass
+class WearSummary:
+    """Per-site totals of one kind of operation (``'inject'``, ``'remove'`` or ``'shift'``)."""
+    kind: str
+    total: int
+    max: int
+    mean: float
+    hotspot: tuple   # (track, AP or segment) of the most worn site
+
+    @property
+    def leveling(self) -> float:
+        """mean / max wear: 1.0 when the load is spread evenly."""
+        return self.mean / self.max if self.max else 1.0
+
+
+class WearTracker:
+    """Wear counters of one instance; attached to it on construction."""
+    def __init__(self, skrm) -> None:
+        self.skrm = None
+        tracks, words = skrm.num_racetrack, skrm.num_words
+        self.injects = np.zeros((tracks, words + 1), dtype=np.uint64)
+        self.removes = np.zeros((tracks, words + 1), dtype=np.uint64)
+        self.shifts = np.zeros((tracks, words), dtype=np.uint64)
+        self.writes = 0
+        # Primitives counted during the access in progress
+        self._seen = [0, 0, 0]
+        self._saved: Dict[str, object] = {}
+        self.attach(skrm)
+
+    # ---------- Attach / detach ----------
+    def attach(self, skrm) -> "WearTracker":
+        if self.skrm is not None:
+            raise ArgumentError("WearTracker is already attached.")
+        if self.shifts.shape != (skrm.num_racetrack, skrm.num_words):
+            raise ArgumentError("WearTracker geometry does not match the instance.")
+        self.skrm = skrm
+        aps = skrm.num_words + 1
+        injects, removes, shifts = self.injects.reshape(-1), self.removes.reshape(-1), self.shifts.reshape(-1)
+        seen = self._seen
+        inject, remove, shift = skrm.inject, skrm.remove, skrm.shift
+
+        def counted_inject(ap, track=0):
+            inject(ap, track)
+            injects[track * aps + ap] += 1
+            seen[0] += 1
+
+        def counted_remove(ap, track=0):
+            remove(ap, track)
+            removes[track * aps + ap] += 1
+            seen[1] += 1
+
+        def counted_shift(start_ap, end_ap, track=0):
+            shift(start_ap, end_ap, track)
+            base = track * (aps - 1)
+            shifts[base + min(start_ap, end_ap):base + max(start_ap, end_ap)] += 1
+            seen[2] += 1
+
+        hooks = {"inject": counted_inject, "remove": counted_remove, "shift": counted_shift,
+                 "write": self._wrap(skrm.write, write=True), "read": self._wrap(skrm.read, write=False)}
+        for name, hook in hooks.items():
+            self._saved[name] = skrm.__dict__.get(name)
+            setattr(skrm, name, hook)
+        return self
+
+    def detach(self) -> None:
+        skrm = self.skrm
+        if skrm is None:
+            return
+        for name, previous in self._saved.items():
+            if previous is None:
+                del skrm.__dict__[name]
+            else:
+                setattr(skrm, name, previous)
+        self._saved = {}
+        self.skrm = None
+
+    def _wrap(self, inner, write: bool):
+        skrm = self.skrm
+        seen = self._seen
+        tracker = self
+
+        def run(args, target_word, track):
+            before = (skrm.inject_count, skrm.remove_count, skrm.shift_count)
+            seen[:] = [0, 0, 0]
+            try:
+                return inner(*args)
+            finally:
+                # Counts without a primitive go where the built-in strategies perform them
+                inject = skrm.inject_count - before[0] - seen[0]
+                remove = skrm.remove_count - before[1] - seen[1]
+                shift = skrm.shift_count - before[2] - seen[2]
+                tracker.injects[track, target_word + 1 if write else target_word] += max(inject, 0)
+                tracker.removes[track, target_word + 1] += max(remove, 0)
+                tracker.shifts[track, target_word] += max(shift, 0)
+                if write:
+                    tracker.writes += 1
+
+        if write:
+            def counted(number, target_word, track=0):
+                return run((number, target_word, track), target_word, track)
+        else:
+            def counted(target_word, track=0, destructive=False):
+                return run((target_word, track, destructive), target_word, track)
+        counted.__wrapped__ = inner
+        return counted
+
+    # ---------- Summaries ----------
+    def counts(self, kind: str) -> np.ndarray:
+        if kind == "inject":
+            return self.injects
+        if kind == "remove":
+            return self.removes
+        if kind == "shift":
+            return self.shifts
+        raise ArgumentError("Wear kind should be 'inject', 'remove' or 'shift'.")
+
+    def summary(self, kind: str) -> WearSummary:
+        counts = self.counts(kind)
+        hotspot = np.unravel_index(int(np.argmax(counts)), counts.shape)
+        return WearSummary(kind, int(counts.sum()), int(counts.max()), float(counts.mean()),
+                           (int(hotspot[0]), int(hotspot[1])))
+
+    def histogram(self, kind: str, bins: int = 10):
+        """``numpy.histogram`` of the per-site counts: how many sites fall in each wear range."""
+        return np.histogram(self.counts(kind), bins=bins)
+
+    def lifetime(self, endurance: float, kind: str = "inject") -> float:
+        """Writes until the most worn site reaches ``endurance`` operations, at the observed rate."""
+        worst = int(self.counts(kind).max())
+        return float("inf") if worst == 0 else endurance * self.writes / worst
+
+    def render(self) -> str:
+        lines = ["Wear (sites: total / max / mean / leveling / hotspot):"]
+        for kind in ("inject", "remove", "shift"):
+            s = self.summary(kind)
+            lines.append("  %-6s %d / %d / %.2f / %.3f / track %d, %s %d" % (
+                kind, s.total, s.max, s.mean, s.leveling, s.hotspot[0],
+                "segment" if kind == "shift" else "AP", s.hotspot[1]))
+        return "\n".join(lines) + "\n"
+
+
+class WearLeveler:
+    """Start-Gap remapping of logical words onto the physical words of each track.
+
+    ``num_words - 1`` logical words are available per track; ``policy='none'``
+    maps them straight through (for comparison). With ``randomize`` the
+    logical addresses are also scrambled by a fixed random permutation first,
+    which spreads clustered hot words across the track.
+    """
+    def __init__(self, skrm, policy: str = "start_gap", interval: int = 100,
+                 randomize: bool = False, seed: Optional[int] = None) -> None:
+        if policy not in ("none", "start_gap"):
+            raise ArgumentError("Wear leveling policy should be 'none' or 'start_gap'.")
+        if interval < 1:
+            raise ArgumentError("interval must be positive.")
+        if skrm.num_words < 2:
+            raise ArgumentError("Start-Gap needs at least 2 words per track.")
+        self.skrm = skrm
+        self.policy = policy
+        self.interval = interval
+        self.num_words = skrm.num_words - 1
+        self.permutation = (np.random.default_rng(seed).permutation(self.num_words).tolist()
+                            if randomize else list(range(self.num_words)))
+        tracks = skrm.num_racetrack
+        self.start = [0] * tracks
+        self.gap = [self.num_words] * tracks
+        self.pending = [0] * tracks
+        self.gap_moves = 0
+
+    def physical(self, word: int, track: int = 0) -> int:
+        if word < 0 or word > self.num_words - 1:
+            raise ArgumentError("Target word must be must be between 0 and (num_words - 2).")
+        word = self.permutation[word]
+        if self.policy == "none":
+            return word
+        address = (word + self.start[track]) % self.num_words
+        return address + 1 if address >= self.gap[track] else address
+
+    def _move_gap(self, track: int) -> None:
+        gap = self.gap[track]
+        source = self.num_words if gap == 0 else gap - 1
+        self.skrm.write(self.skrm.read(source, track), gap, track)
+        if gap == 0:
+            self.gap[track] = self.num_words
+            self.start[track] = (self.start[track] + 1) % self.num_words
+        else:
+            self.gap[track] = gap - 1
+        self.gap_moves += 1
+
+    def write(self, number: float, target_word: int, track: int = 0):
+        result = self.skrm.write(number, self.physical(target_word, track), track)
+        if self.policy != "none":
+            self.pending[track] += 1
+            if self.pending[track] == self.interval:
+                self.pending[track] = 0
+                self._move_gap(track)
+        return result
+
+    def read(self, target_word: int, track: int = 0, destructive: bool = False) -> float:
+        return self.skrm.read(self.physical(target_word, track), track, destructive)
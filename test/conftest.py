@@ -9,6 +9,10 @@ SRC = os.path.join(ROOT, "src")
 if SRC not in sys.path:
     sys.path.insert(0, SRC)
 
+def counters(s):
+    """The (inject, detect, remove, shift) counts of ``s``, as a tuple to compare."""
+    return s.inject_count, s.detect_count, s.remove_count, s.shift_count
+
 @pytest.fixture
 def make_skrm():
     """Factory: Use make_skrm(strategy='pw_plus', num_racetrack=4, ...) to construct SKRM。"""
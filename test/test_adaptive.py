@@ -0,0 +1,68 @@
+import copy
+
+import numpy as np
+import pytest
+from conftest import counters
+
+
+VALUES = [0.0, 0.125, 0.124, -1.0, 123.456, 3.4e38, 0.124, 0.0, -2.5e-38, 1.0, -1.0, 0.125]
+
+
+def cost(s, metric="latency"):
+    if metric == "energy":
+        return (s.inject_count * s.inject_energy + s.detect_count * s.detect_energy +
+                s.remove_count * s.remove_energy + s.shift_count * s.shift_energy)
+    return (s.inject_count * s.inject_latency + s.detect_count * s.detect_latency +
+            s.remove_count * s.remove_latency + s.shift_count * s.shift_latency)
+
+
+@pytest.mark.parametrize("metric", ["latency", "energy"])
+def test_adaptive_picks_the_cheapest_strategy(make_skrm, metric):
+    s = make_skrm(strategy="adaptive")
+    s.adaptive_metric = metric
+    for i, value in enumerate(VALUES):
+        target = i % 3
+        candidates = []
+        for method in ("naive_write", "permutation_write", "pw_plus"):
+            trial = copy.deepcopy(s)
+            before = cost(trial, metric)
+            getattr(trial, method)(value, target)
+            candidates.append(cost(trial, metric) - before)
+
+        before = cost(s, metric)
+        s.write(value, target)
+        assert cost(s, metric) - before == pytest.approx(min(candidates))
+        assert s.read(target) == float(np.float32(value))
+
+    picks = s.strategy_picks
+    assert sum(p[0] for p in picks.values()) == len(VALUES)
+    assert len([name for name, p in picks.items() if p[0]]) >= 2
+    assert sum(p[1] for p in picks.values()) < cost(s)   # reads are not picks
+
+
+def test_adaptive_analytic_and_replay_match_bit_level(make_skrm):
+    bit = make_skrm(strategy="adaptive", num_racetrack=2)
+    fast = make_skrm(strategy="adaptive", num_racetrack=2, analytic=True)
+    batched = make_skrm(strategy="adaptive", num_racetrack=2)
+    tracks = [i % 2 for i in range(len(VALUES))]
+    targets = [i % 3 for i in range(len(VALUES))]
+
+    for value, target, track in zip(VALUES, targets, tracks):
+        bit.write(value, target, track)
+        fast.write(value, target, track)
+    result = batched.replay(np.array(VALUES, dtype=np.float32), targets, tracks)
+
+    for s in (fast, batched):
+        assert s.storage == bit.storage
+        assert counters(s) == counters(bit)
+        assert s.strategy_picks == pytest.approx(bit.strategy_picks)
+    assert tuple(result.totals) == counters(bit)
+
+
+def test_summary_reports_picks(make_skrm):
+    s = make_skrm(strategy="adaptive")
+    s.write(0.125, 0)
+    summary = s.render_summary()
+    assert "Adaptive strategy picks:" in summary
+    assert "pw_plus" in summary
+    assert "Adaptive strategy picks:" not in make_skrm(strategy="pw").render_summary()
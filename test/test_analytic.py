@@ -0,0 +1,63 @@
+import random
+
+import pytest
+from bitarray import bitarray
+
+from pyskrm import analytic
+from conftest import counters
+
+
+VALUES = [0.0, 0.125, 0.124, 0.125, -1.0, 123.456, 3.4e38, -2.5e-38, 1.0, 0.0]
+
+
+@pytest.mark.parametrize("strategy", ["naive", "pw", "pw_plus"])
+@pytest.mark.parametrize("word_size", [32, 8])
+def test_analytic_matches_bit_level(make_skrm, strategy, word_size):
+    bit = make_skrm(word_size=word_size, num_words=3, strategy=strategy)
+    fast = make_skrm(word_size=word_size, num_words=3, strategy=strategy, analytic=True)
+
+    for i, value in enumerate(VALUES):
+        bit.write(value, i % 3)
+        fast.write(value, i % 3)
+        assert counters(fast) == counters(bit)
+        assert fast.storage == bit.storage
+
+
+@pytest.mark.parametrize("strategy", ["naive", "pw", "pw_plus"])
+def test_analytic_matches_bit_level_from_arbitrary_storage(make_skrm, strategy):
+    """Stray skyrmions on the access ports and in the words must be handled identically."""
+    rng = random.Random(2024)
+    for _ in range(50):
+        bit = make_skrm(num_words=2, strategy=strategy)
+        fast = make_skrm(num_words=2, strategy=strategy, analytic=True)
+        noise = bitarray([rng.getrandbits(1) for _ in range(len(bit.storage))])
+        bit.storage[:] = noise
+        fast.storage[:] = noise
+
+        value = rng.choice(VALUES + [rng.uniform(-1e6, 1e6)])
+        target = rng.randrange(2)
+        bit.write(value, target)
+        fast.write(value, target)
+        assert counters(fast) == counters(bit)
+        assert fast.storage == bit.storage
+
+
+@pytest.mark.parametrize("strategy", ["naive", "pw", "pw_plus"])
+@pytest.mark.parametrize("precision,word_size", [("half", 16), ("double", 64)])
+def test_analytic_matches_bit_level_other_precisions(make_skrm, strategy, precision, word_size):
+    bit = make_skrm(word_size=word_size, num_words=2, strategy=strategy, precision=precision)
+    fast = make_skrm(word_size=word_size, num_words=2, strategy=strategy, precision=precision, analytic=True)
+
+    for i, value in enumerate([0.125, -1.5, 1e-3, 0.0, 65504.0, 0.125]):
+        bit.write(value, i % 2)
+        fast.write(value, i % 2)
+        assert counters(fast) == counters(bit)
+        assert fast.storage == bit.storage
+
+
+def test_analytic_count_formulas():
+    # Empty segment, pattern of 0.125 (5 ones), same numbers as test_operation_count_of_update_under_strategies
+    pattern = 0x3E000000
+    assert analytic.naive_write(0, 32, pattern, 32) == (pattern << 1, (5, 0, 32, 64))
+    assert analytic.permutation_write(0, 32, pattern, 32) == (pattern << 1, (5, 32, 0, 66))
+    assert analytic.pw_plus(0, 33, pattern, 33) == (pattern << 1, (5, 33, 1, 65))
@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from pyskrm import bench
+
+
+def test_quick_suite_covers_every_case():
+    results = bench.run_suite(quick=True, repeat=1)
+    names = {result.name for result in results}
+
+    assert "shift/num_words=4096" in names
+    assert "write/pw_plus/word_size=64/repeated" in names
+    assert "shift1/ring/word_size=16384" in names
+    assert len(names) == (len(bench.PRIMITIVE_SIZES) * 4 + len(bench.LAYOUTS) * len(bench.SHIFT_WORD_SIZES) +
+                          3 * len(bench.WORD_SIZES) * len(bench.DISTRIBUTIONS))
+    assert all(result.ops_per_sec > 0 and result.peak_bytes >= 0 for result in results)
+
+
+def test_values_distributions():
+    assert bench.values("zeros", 3) == [0.0, 0.0, 0.0]
+    assert len(set(bench.values("repeated", 100))) <= 4
+    assert len(set(bench.values("random", 100))) == 100
+    with pytest.raises(ValueError):
+        bench.values("gaussian", 1)
+
+
+def test_compare_flags_slowdowns():
+    baseline = [bench.BenchResult("a", 10, 1.0, 10.0, 0), bench.BenchResult("b", 10, 1.0, 10.0, 0)]
+    results = [bench.BenchResult("a", 10, 1.0, 9.5, 0), bench.BenchResult("b", 10, 2.0, 5.0, 0),
+               bench.BenchResult("c", 10, 1.0, 1.0, 0)]
+
+    regressions = bench.compare(results, baseline, tolerance=0.1)
+    assert [r.name for r in regressions] == ["b"]
+    assert regressions[0].ratio == pytest.approx(0.5)
+
+
+def test_cli_saves_and_compares(tmp_path, capsys):
+    out = tmp_path / "bench.json"
+    assert bench.main(["--quick", "--repeat", "1", "-k", "detect", "-o", str(out)]) == 0
+    report = json.loads(out.read_text())
+    assert {r["name"] for r in report["results"]} == {"detect/num_words=%d" % n for n in bench.PRIMITIVE_SIZES}
+    assert "ops/sec" in capsys.readouterr().out
+
+    for result in report["results"]:
+        result["ops_per_sec"] *= 1000
+    out.write_text(json.dumps(report))
+    assert bench.main(["--quick", "--repeat", "1", "-k", "detect", "--baseline", str(out)]) == 1
+    assert "Regression: detect/num_words=16" in capsys.readouterr().out
@@ -0,0 +1,169 @@
+import random
+
+import pytest
+
+from pyskrm.tracing import Tracer
+from conftest import counters
+
+try:
+    from pyskrm.argument_error import ArgumentError
+except Exception:  # pragma: no cover
+    ArgumentError = Exception
+
+VALUES = [1.5, -2.25, 0.1, 3.0]
+
+
+def _scramble(s, seed):
+    """Random word contents with the ports left empty, as the strategies leave them."""
+    rng = random.Random(seed)
+    for track in range(s.num_racetrack):
+        for word in range(s.num_words):
+            s._store_segment(rng.getrandbits(s.word_size) << 1, word, track)
+
+
+@pytest.mark.parametrize("layout", ["flat", "ring", "sparse"])
+@pytest.mark.parametrize("analytic", [False, True])
+def test_naive_block_runs_in_lockstep(make_skrm, layout, analytic):
+    block = make_skrm(num_words=6, num_racetrack=2, layout=layout, analytic=analytic)
+    single = make_skrm(num_words=6, num_racetrack=2, layout=layout)
+    _scramble(block, 1)
+    _scramble(single, 1)
+    result = block.write_block(VALUES, 1, track=1)
+    for i, number in enumerate(VALUES):
+        single.write(number, 1 + i, 1)
+
+    assert result.lockstep
+    assert block.storage == single.storage
+    assert counters(block) == result.counts
+    assert result.counts[:3] == counters(single)[:3]
+    assert result.counts[3] == 64 and result.shifts_saved == 3 * 64
+    assert result.word_latency == pytest.approx(
+        single.inject_count * single.inject_latency + single.remove_count * single.remove_latency +
+        single.shift_count * single.shift_latency)
+    assert 0 < result.latency < result.word_latency
+    assert result.energy < result.word_energy
+    assert [block.read(1 + i, 1) for i in range(4)] == [pytest.approx(v) for v in VALUES]
+
+
+def test_lockstep_schedule_is_the_issued_operations(make_skrm):
+    s = make_skrm(num_words=4)
+    issued = []
+    for name in ("inject", "detect", "remove", "shift"):
+        def hook(*args, _name=name, _inner=getattr(s, name)):
+            issued.append(_name)
+            return _inner(*args)
+        setattr(s, name, hook)
+    result = s.write_block([1.0, -2.0, 0.5], 0)
+    assert tuple(issued.count(op) for op in ("inject", "detect", "remove", "shift")) == result.counts
+    ones = bin(1065353216 | 3221225472 | 1056964608).count("1")
+    assert result.latency == pytest.approx(32 * (s.shift_latency + s.remove_latency) + 32 * s.shift_latency +
+                                           ones * s.inject_latency)
+
+
+@pytest.mark.parametrize("layout", ["flat", "sparse"])
+@pytest.mark.parametrize("analytic", [False, True])
+def test_pw_block_runs_in_lockstep(make_skrm, layout, analytic):
+    block = make_skrm(strategy="pw", num_words=6, num_racetrack=2, layout=layout, analytic=analytic)
+    single = make_skrm(strategy="pw", num_words=6, num_racetrack=2, layout=layout)
+    _scramble(block, 3)
+    _scramble(single, 3)
+    passed = sum(bin(block._read_segment(1 + i, 1)).count("1") for i in range(3))
+    result = block.write_block(VALUES, 1, track=1)
+    for i, number in enumerate(VALUES):
+        single.write(number, 1 + i, 1)
+
+    assert result.lockstep
+    assert block.storage == single.storage
+    assert counters(block) == result.counts
+    single_counts = counters(single)
+    assert result.counts[:2] == single_counts[:2]
+    # The skyrmions passing the ports between the words are removed
+    assert result.counts[2] == single_counts[2] + passed
+    assert result.shifts_saved == 3 * 66
+    assert 0 < result.latency < result.word_latency
+    assert [block.read(1 + i, 1) for i in range(4)] == [pytest.approx(v) for v in VALUES]
+
+
+@pytest.mark.parametrize("strategy", ["naive", "pw"])
+def test_lockstep_schedule_is_the_issued_operations_of_every_strategy(make_skrm, strategy):
+    s = make_skrm(strategy=strategy, num_words=4)
+    _scramble(s, 5)
+    issued = []
+    for name in ("inject", "detect", "remove", "shift"):
+        def hook(*args, _name=name, _inner=getattr(s, name)):
+            issued.append(_name)
+            return _inner(*args)
+        setattr(s, name, hook)
+    before = counters(s)
+    result = s.write_block([1.0, -2.0, 0.5], 0)
+    counts = tuple(now - then for now, then in zip(counters(s), before))
+    assert result.lockstep and counts == result.counts
+    assert tuple(issued.count(op) for op in ("inject", "detect")) == result.counts[:2]
+    # pw charges a shift and a remove for every skyrmion it does not reuse
+    extra = result.counts[3] - issued.count("shift")
+    assert issued.count("remove") + extra == result.counts[2]
+    assert extra == 0 if strategy == "naive" else extra > 0
+    assert [s.read(i) for i in range(3)] == [1.0, -2.0, 0.5]
+
+
+@pytest.mark.parametrize("strategy", ["naive", "pw"])
+@pytest.mark.parametrize("precision", ["half", "single"])
+def test_random_lockstep_blocks_match_bit_level_writes(make_skrm, strategy, precision):
+    rng = random.Random(7)
+    for seed in range(20):
+        block = make_skrm(strategy=strategy, num_words=8, precision=precision)
+        single = make_skrm(strategy=strategy, num_words=8, precision=precision)
+        _scramble(block, seed)
+        _scramble(single, seed)
+        start, count = rng.randrange(4), rng.randrange(1, 5)
+        values = [rng.uniform(-1e3, 1e3) for _ in range(count)]
+        assert block.write_block(values, start).lockstep
+        for i, number in enumerate(values):
+            single.write(number, start + i)
+        assert block.storage == single.storage
+        assert counters(block)[:2] == counters(single)[:2]
+
+
+@pytest.mark.parametrize("strategy", ["pw_plus", "adaptive"])
+@pytest.mark.parametrize("analytic", [False, True])
+def test_other_strategies_fall_back_to_word_writes(make_skrm, strategy, analytic):
+    block = make_skrm(strategy=strategy, num_words=6, analytic=analytic)
+    single = make_skrm(strategy=strategy, num_words=6, analytic=analytic)
+    result = block.write_block(VALUES, 2)
+    for i, number in enumerate(VALUES):
+        single.write(number, 2 + i)
+    assert not result.lockstep
+    assert block.storage == single.storage
+    assert counters(block) == counters(single) == result.counts
+    assert result.shifts_saved == 0
+    assert result.latency == pytest.approx(result.word_latency)
+
+
+def test_traced_block_falls_back_to_word_writes(make_skrm):
+    s = make_skrm(num_words=4)
+    with Tracer().attached(s) as tracer:
+        result = s.write_block(VALUES[:2], 0)
+    assert not result.lockstep
+    assert sum(event.op == "write" for event in tracer.events()) == 2
+
+
+def test_occupied_ports_fall_back_to_word_writes(make_skrm):
+    block = make_skrm(num_words=4)
+    single = make_skrm(num_words=4)
+    for s in (block, single):
+        s.inject(2)
+    result = block.write_block(VALUES[:3], 0)
+    for i, number in enumerate(VALUES[:3]):
+        single.write(number, i)
+    assert not result.lockstep
+    assert block.storage == single.storage and counters(block) == counters(single)
+
+
+def test_block_bounds(make_skrm):
+    s = make_skrm(num_words=4)
+    with pytest.raises(ArgumentError):
+        s.write_block(VALUES, 1)
+    with pytest.raises(ArgumentError):
+        s.write_block(VALUES, 0, track=1)
+    empty = s.write_block([], 2)
+    assert empty.counts == (0, 0, 0, 0) and empty.latency == 0
@@ -0,0 +1,89 @@
+import random
+
+import pytest
+
+from pyskrm.cache import TransitionCache
+from conftest import counters
+
+try:
+    from pyskrm.argument_error import ArgumentError
+except Exception:  # pragma: no cover
+    ArgumentError = Exception
+
+
+@pytest.mark.parametrize("analytic", [False, True])
+def test_cached_writes_match_uncached(skrm_each_strategy, make_skrm, analytic):
+    _, strategy = skrm_each_strategy
+    rng = random.Random(7)
+    plain = make_skrm(strategy=strategy, num_racetrack=2, analytic=analytic)
+    cached = make_skrm(strategy=strategy, num_racetrack=2, analytic=analytic, cache_bytes=1 << 20)
+
+    for _ in range(200):
+        value = rng.choice([0.125, 0.124, -1.0, 3.5])
+        target, track = rng.randrange(3), rng.randrange(2)
+        plain.write(value, target, track)
+        cached.write(value, target, track)
+        assert counters(cached) == counters(plain)
+        assert cached.storage == plain.storage
+
+    stats = cached.cache.stats()
+    assert stats.hits > stats.misses > 0
+    assert stats.hits + stats.misses == 200
+    assert 0 < stats.bytes <= stats.max_bytes
+
+
+def test_cached_adaptive_writes_follow_the_pick(make_skrm):
+    rng = random.Random(3)
+    plain = make_skrm(strategy="adaptive")
+    cached = make_skrm(strategy="adaptive", cache_bytes=1 << 20)
+
+    for step in range(300):
+        if step == 150:
+            # Make detects dear: transitions picked as pw before now go to naive or pw_plus
+            for s in (plain, cached):
+                s.detect_latency = 1000.0
+        value, target = rng.choice([0.125, 0.124, -1.0, 3.5]), rng.randrange(3)
+        plain.write(value, target)
+        cached.write(value, target)
+        assert counters(cached) == counters(plain)
+        assert cached.storage == plain.storage
+    assert cached.strategy_picks == plain.strategy_picks
+    assert all(count for count, _, _ in plain.strategy_picks.values())
+
+
+def test_cache_is_disabled_by_default(make_skrm):
+    assert make_skrm().cache is None
+
+
+def test_cache_evicts_least_recently_used():
+    cache = TransitionCache(max_bytes=1000)
+    cache.put(("pw", 0, 1), (2, (1, 0, 0, 1)))
+    entry_size = cache.bytes
+    cache = TransitionCache(max_bytes=2 * entry_size)
+
+    cache.put(("pw", 0, 1), (2, (1, 0, 0, 1)))
+    cache.put(("pw", 0, 2), (4, (1, 0, 0, 1)))
+    assert cache.get(("pw", 0, 1)) is not None      # ("pw", 0, 2) is now least recently used
+    cache.put(("pw", 0, 3), (6, (2, 0, 0, 1)))
+
+    assert cache.get(("pw", 0, 2)) is None
+    assert cache.get(("pw", 0, 3)) == (6, (2, 0, 0, 1))
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions, stats.entries) == (2, 1, 1, 2)
+    assert stats.hit_rate == pytest.approx(2 / 3)
+
+    cache.clear()
+    assert len(cache) == 0 and cache.bytes == 0
+
+
+def test_cache_rejects_bad_size():
+    with pytest.raises(ArgumentError):
+        TransitionCache(0)
+
+
+def test_cached_write_checks_bounds(make_skrm):
+    s = make_skrm(cache_bytes=4096)
+    with pytest.raises(ArgumentError):
+        s.write(1.0, 3)
+    with pytest.raises(ArgumentError):
+        s.write(1.0, 0, track=1)
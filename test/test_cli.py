@@ -0,0 +1,67 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from pyskrm import SKRM
+from pyskrm.cli import main, parse_costs
+
+try:
+    from pyskrm.argument_error import ArgumentError
+except Exception:  # pragma: no cover
+    ArgumentError = Exception
+
+WRITES = [(1.5, 0, 0), (-2.25, 2, 0), (0.1, 1, 0), (3.0, 0, 0), (7.75, 3, 0)]
+
+
+@pytest.fixture
+def trace(tmp_path):
+    path = tmp_path / "trace.csv"
+    path.write_text("value,target_word,track\n" + "".join("%r,%d,%d\n" % w for w in WRITES))
+    return str(path)
+
+
+def _run(capsys, *argv):
+    assert main(list(argv)) == 0
+    return json.loads(capsys.readouterr().out)
+
+
+def test_json_counters_match_the_library(capsys, trace):
+    rows = _run(capsys, trace, "-n", "4", "-s", "pw", "-s", "pw_plus", "-c", "shift_latency=0.5", "--json")
+    assert [row["strategy"] for row in rows] == ["pw", "pw_plus"]
+    for row in rows:
+        s = SKRM(word_size=32, num_words=4, strategy=row["strategy"])
+        s.shift_latency = 0.5
+        for number, target_word, track in WRITES:
+            s.write(number, target_word, track)
+        assert row["records"] == len(WRITES)
+        assert (row["inject_count"], row["detect_count"], row["remove_count"], row["shift_count"]) == \
+            (s.inject_count, s.detect_count, s.remove_count, s.shift_count)
+        assert row["total_latency"] == pytest.approx(s.stats().total_latency)
+
+
+def test_stream_and_jobs_give_the_same_rows(capsys, trace):
+    base = _run(capsys, trace, trace, "-n", "4", "-s", "naive", "-s", "adaptive", "--json")
+    assert _run(capsys, trace, trace, "-n", "4", "-s", "naive", "-s", "adaptive", "--stream", "--chunk-size", "2",
+                "--json") == base
+    assert _run(capsys, trace, trace, "-n", "4", "-s", "naive", "-s", "adaptive", "--jobs", "2", "--json") == base
+
+    assert main([trace, "-n", "4"]) == 0
+    table = capsys.readouterr().out
+    assert table.startswith("Trace") and "naive" in table
+
+
+def test_errors(capsys, trace):
+    with pytest.raises(ArgumentError):
+        parse_costs(["shift_speed=1"])
+    with pytest.raises(SystemExit) as exc:
+        main([trace, "-n", "4", "-c", "shift_latency=fast"])
+    assert exc.value.code == 2
+    assert "name=value" in capsys.readouterr().err
+
+
+def test_startup_defers_heavy_imports():
+    code = "import sys, pyskrm.cli; print(sorted({'numpy', 'concurrent.futures'} & set(sys.modules)))"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert out.strip() == "[]"
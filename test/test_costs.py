@@ -0,0 +1,70 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from pyskrm.costs import CostModel, OpCounters, count_matrix
+from pyskrm.tracing import Tracer
+
+try:
+    from pyskrm.argument_error import ArgumentError
+except Exception:  # pragma: no cover
+    ArgumentError = Exception
+
+
+def test_cost_attributes_read_the_model(make_skrm):
+    s = make_skrm(strategy="pw")
+    assert s.cost_model == CostModel()
+    s.shift_latency = 0.25
+    assert s.cost_model.latency[3] == 0.25
+    s.cost_model.energy[0] = 100
+    assert s.inject_energy == 100
+    with pytest.raises(ArgumentError):
+        CostModel(latency=(1.0, 2.0))
+
+
+def test_shared_model_prices_every_instance(make_skrm):
+    model = CostModel()
+    instances = [make_skrm(strategy=name, cost_model=model) for name in ("naive", "pw", "pw_plus")]
+    for s in instances:
+        s.write(1.5, 0)
+        s.write(-0.75, 1)
+    model.latency[3] = 2.0
+    latency, energy = model.price_matrix(count_matrix(s.counters for s in instances))
+    assert latency.tolist() == pytest.approx([s.stats().total_latency for s in instances])
+    assert energy.tolist() == pytest.approx([s.stats().total_energy for s in instances])
+
+    child = instances[0].fork()
+    child.shift_latency = 9.0
+    assert model.latency[3] == 2.0
+
+
+def test_counters(make_skrm):
+    s = make_skrm(strategy="pw_plus")
+    s.write(2.5, 2)
+    counters = s.counters
+    assert counters == (s.inject_count, s.detect_count, s.remove_count, s.shift_count)
+    assert counters.total == sum(counters)
+    assert (counters + counters - counters) == counters
+    assert pickle.loads(pickle.dumps(counters)) == counters
+    s.counters = OpCounters()
+    assert s.stats().total_count == 0
+    assert count_matrix([]).shape == (0, 4)
+    assert isinstance(count_matrix([counters, (1, 2, 3, 4)]), np.ndarray)
+
+
+@pytest.mark.parametrize("strategy", ["naive", "pw", "pw_plus"])
+def test_unchecked_primitives_match_hooked_ones(make_skrm, strategy):
+    plain = make_skrm(strategy=strategy)
+    traced = make_skrm(strategy=strategy)
+    tracer = Tracer()
+    tracer.attach(traced)
+    for s in (plain, traced):
+        s.write(1.5, 0)
+        s.write(-3.0, 0)
+        s.read(0)
+    assert plain.storage == traced.storage
+    assert plain.counters == traced.counters
+    assert sum(event.op == "detect" for event in tracer.events()) == plain.detect_count
+    with pytest.raises(ArgumentError):
+        plain.shift(1, 1)
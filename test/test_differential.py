@@ -0,0 +1,101 @@
+import random
+
+import pytest
+
+from pyskrm import analytic
+from pyskrm.snapshot import restore, snapshot
+from conftest import counters
+
+try:
+    from pyskrm.argument_error import ArgumentError
+except Exception:  # pragma: no cover
+    ArgumentError = Exception
+
+WRITES = [(1.5, 0, 0), (1.5, 0, 0), (1.75, 0, 0), (-2.25, 2, 1), (-2.5, 2, 1), (0.1, 1, 1), (1.75, 0, 0)]
+
+
+@pytest.mark.parametrize("strategy", ["naive", "pw", "pw_plus", "adaptive"])
+def test_bit_level_matches_analytic_and_plain_writes(make_skrm, strategy):
+    bits = make_skrm(strategy=strategy, num_racetrack=2, differential="oracle")
+    fast = make_skrm(strategy=strategy, num_racetrack=2, differential="oracle", analytic=True)
+    plain = make_skrm(strategy=strategy, num_racetrack=2)
+    for number, target_word, track in WRITES:
+        bits.write(number, target_word, track)
+        fast.write(number, target_word, track)
+        plain.write(number, target_word, track)
+        assert bits.storage == fast.storage
+        assert bits.read(target_word, track) == fast.read(target_word, track) == plain.read(target_word, track)
+    assert counters(bits) == counters(fast)
+    assert bits.differential_stats == fast.differential_stats
+    assert bits.differential_stats["skipped"] >= 1
+    assert bits.differential_stats["latency_saved"] > 0
+
+
+def test_identical_write_is_free(make_skrm):
+    s = make_skrm(strategy="pw", differential="oracle")
+    s.write(3.0, 1)
+    before = counters(s)
+    s.write(3.0, 1)
+    assert counters(s) == before
+    assert s.differential_stats["skipped"] == 1
+
+
+def test_partial_rewrite_counts():
+    # 0b1011 -> 0b1000: the two low bits differ, opened from the low port
+    assert analytic.differential_span(0b1011, 4, 0b1000) == (2, False)
+    # 0b1011 -> 0b0011: only the top bit differs, opened from the high port
+    assert analytic.differential_span(0b1011, 4, 0b0011) == (1, True)
+    segment, counts = analytic.differential_write(0b010110, 4, 0b0011)
+    assert segment == 0b000110 and counts == (0, 0, 1, 2)
+
+
+@pytest.mark.parametrize("layout", ["flat", "ring"])
+def test_analytic_form_models_occupied_ports(make_skrm, layout):
+    rng = random.Random(5)
+    for _ in range(400):
+        word_size = rng.choice([4, 8, 16, 32])
+        s = make_skrm(word_size=word_size, layout=layout)
+        target_word = rng.randrange(3)
+        segment = rng.getrandbits(word_size + 2)
+        word = (segment >> 1) & ((1 << word_size) - 1)
+        target = rng.getrandbits(word_size) if rng.random() < 0.7 else word ^ (1 << rng.randrange(word_size))
+        s._store_segment(segment, target_word, 0)
+        s._rewrite_bits(word, target, target_word, 0)
+        assert (s._read_segment(target_word, 0), counters(s)) == analytic.differential_write(segment, word_size, target)
+
+
+@pytest.mark.parametrize("analytic_mode", [False, True])
+def test_replay_runs_differential_writes(make_skrm, analytic_mode):
+    looped = make_skrm(strategy="pw", num_racetrack=2, differential="oracle", analytic=analytic_mode)
+    batched = make_skrm(strategy="pw", num_racetrack=2, differential="oracle", analytic=analytic_mode)
+    for number, target_word, track in WRITES:
+        looped.write(number, target_word, track)
+    result = batched.replay(*zip(*WRITES))
+    assert batched.storage == looped.storage
+    assert counters(batched) == counters(looped) == tuple(result.counts.sum(axis=0))
+    assert batched.differential_stats == looped.differential_stats
+
+
+def test_detect_mode_pays_a_read(make_skrm):
+    oracle = make_skrm(strategy="pw", differential="oracle")
+    detect = make_skrm(strategy="pw", differential="detect")
+    for s in (oracle, detect):
+        s.write(1.5, 0)
+        s.write(1.5, 0)
+    assert detect.detect_count > oracle.detect_count
+    assert detect.differential_stats["latency_saved"] < oracle.differential_stats["latency_saved"]
+    assert "Differential writes:" in detect.render_summary()
+
+    restored = restore(snapshot(detect)).skrm
+    assert restored.differential == "detect"
+    assert restored.storage == detect.storage
+    assert detect.fork().differential_stats == detect.differential_stats
+
+
+def test_invalid_modes(make_skrm):
+    with pytest.raises(ArgumentError):
+        make_skrm(differential="always")
+    with pytest.raises(ArgumentError):
+        make_skrm(differential="oracle", write_fn=lambda self, number, target_word, track=0: None)
+    with pytest.raises(ArgumentError):
+        make_skrm(differential="oracle").write(1.0, 3)
@@ -0,0 +1,126 @@
+import numpy as np
+import pytest
+
+from pyskrm import SKRM
+from pyskrm.encoding import CORRECTED, DETECTED, ENCODINGS, OK, compare_encodings, get_encoding
+from pyskrm.ieee754 import floats_to_bits, precision_width
+from pyskrm.snapshot import restore, snapshot
+
+try:
+    from pyskrm.argument_error import ArgumentError
+except Exception:  # pragma: no cover
+    ArgumentError = Exception
+
+VALUES = [1.5, -2.25, 0.1, 3.0, -0.0, 65504.0, 1e-3, 7.75]
+
+
+def _width(precision, encoding):
+    width = precision_width(precision)
+    return width + ENCODINGS[encoding].extra_bits(width)
+
+
+@pytest.mark.parametrize("encoding", list(ENCODINGS))
+@pytest.mark.parametrize("precision", ["half", "single", "double"])
+def test_array_matches_scalar_round_trip(encoding, precision):
+    enc = get_encoding(encoding)
+    width = precision_width(precision)
+    bits = floats_to_bits(np.array(VALUES), precision).astype(np.uint64)
+    codes = enc.encode_array(bits, width)
+    assert [int(c) for c in codes] == [enc.encode(int(b), width) for b in bits.tolist()]
+    data, status = enc.decode_array(codes, width)
+    assert [int(d) for d in data] == bits.tolist()
+    assert not status.any()
+
+
+@pytest.mark.parametrize("encoding", ["hamming", "secded"])
+def test_single_errors_are_corrected(encoding):
+    enc = get_encoding(encoding)
+    width = 32
+    bits = int(floats_to_bits(np.array([-2.25]), "single")[0])
+    code = enc.encode(bits, width)
+    flipped = [code ^ (1 << i) for i in range(width + enc.extra_bits(width))]
+    assert all(enc.decode(c, width) == (bits, CORRECTED) for c in flipped)
+    data, status = enc.decode_array(np.array(flipped, dtype=np.uint64), width)
+    assert data.tolist() == [bits] * len(flipped)
+    assert (status == CORRECTED).all()
+
+
+def test_secded_detects_double_errors():
+    enc = get_encoding("secded")
+    bits = 0x3FC00000
+    code = enc.encode(bits, 32)
+    doubles = [code ^ (1 << i) ^ (1 << j) for i in range(39) for j in range(i)]
+    assert all(enc.decode(c, 32)[1] == DETECTED for c in doubles)
+    assert (enc.decode_array(np.array(doubles, dtype=np.uint64), 32)[1] == DETECTED).all()
+    assert enc.decode(code, 32) == (bits, OK)
+
+
+@pytest.mark.parametrize("encoding", ["dbi", "dbi8"])
+def test_bus_inversion_keeps_at_most_half_ones(encoding):
+    enc = get_encoding(encoding)
+    group = enc.group or 32
+    for bits in (0xFFFFFFFF, 0xFF00FF0F, 0x0000000F):
+        data = enc.encode(bits, 32) & 0xFFFFFFFF
+        assert all(bin((data >> s) & ((1 << group) - 1)).count("1") <= group // 2 for s in range(0, 32, group))
+        assert enc.decode(enc.encode(bits, 32), 32) == (bits, OK)
+
+
+@pytest.mark.parametrize("strategy", ["naive", "pw", "pw_plus", "adaptive"])
+@pytest.mark.parametrize("encoding", ["dbi", "secded"])
+def test_encoded_writes_agree_across_execution_modes(strategy, encoding):
+    width = _width("single", encoding)
+    bits = SKRM(width, 3, strategy=strategy, encoding=encoding)
+    fast = SKRM(width, 3, strategy=strategy, encoding=encoding, analytic=True)
+    batch = SKRM(width, 3, strategy=strategy, encoding=encoding)
+    targets = [i % 3 for i in range(len(VALUES))]
+    for number, target in zip(VALUES, targets):
+        bits.write(number, target)
+        fast.write(number, target)
+    batch.replay(VALUES, targets)
+    assert bits.counters == fast.counters == batch.counters
+    assert bits.storage == fast.storage == batch.storage
+    last = {target: number for number, target in zip(VALUES, targets)}
+    assert [bits.read(t) for t in range(3)] == [float(np.float32(last[t])) for t in range(3)]
+
+
+def test_plan_engine_and_snapshot_keep_the_encoding():
+    direct = SKRM(39, 2, strategy="pw", encoding="secded")
+    planned = SKRM(39, 2, strategy="pw", encoding="secded", engine="plan")
+    for number in VALUES:
+        direct.write(number, 1)
+        planned.write(number, 1)
+    assert direct.counters == planned.counters and direct.storage == planned.storage
+    copy = restore(snapshot(planned)).skrm
+    assert copy.encoding == "secded" and copy.storage == planned.storage
+    assert copy.read(1) == VALUES[-1]
+
+
+def test_read_corrects_and_counts_errors():
+    s = SKRM(39, 2, strategy="pw", encoding="secded")
+    s.write(-2.25, 0)
+    segment = s._read_segment(0, 0)
+    s._store_segment(segment ^ (1 << 5), 0, 0)
+    assert s.read(0) == -2.25
+    s._store_segment(segment ^ (1 << 5) ^ (1 << 9), 0, 0)
+    s.read(0)
+    assert s.encoding_stats == {"corrected": 1, "detected": 1}
+    assert "Corrected:" in s.render_summary()
+
+
+def test_compare_encodings_reports_overhead_and_costs():
+    values = np.random.default_rng(0).standard_normal(64)
+    reports = compare_encodings(values, strategy="pw", num_words=8)
+    assert list(reports) == list(ENCODINGS)
+    assert reports["none"].extra_bits == 0 and reports["none"].overhead == 0
+    assert reports["secded"].width == 39 and reports["secded"].overhead == 7 / 32
+    assert reports["dbi"].ones < reports["none"].ones
+    plain = SKRM(32, 8, strategy="pw")
+    plain.replay(values, np.arange(64) % 8)
+    assert reports["none"].latency == pytest.approx(plain.stats().total_latency)
+
+
+def test_invalid_encodings():
+    with pytest.raises(ArgumentError):
+        SKRM(32, 2, encoding="parity")
+    with pytest.raises(ArgumentError):
+        SKRM(32, 2, encoding="secded")
@@ -0,0 +1,144 @@
+import random
+
+import pytest
+
+from pyskrm import SKRM
+from pyskrm.error_model import ErrorModel, compare_strategies, monte_carlo
+from pyskrm.ieee754 import flip_bits, unflip_bits
+
+try:
+    from pyskrm.argument_error import ArgumentError
+except Exception:  # pragma: no cover
+    ArgumentError = Exception
+
+
+def test_error_model_validates_probabilities():
+    with pytest.raises(ArgumentError):
+        ErrorModel(p_inject=1.5)
+    with pytest.raises(ArgumentError):
+        ErrorModel(p_overshoot=0.6, p_undershoot=0.6)
+    with pytest.raises(ArgumentError):
+        monte_carlo("random", ErrorModel(), 10)
+    with pytest.raises(ArgumentError):
+        monte_carlo("pw_plus", ErrorModel(), 10, precision="double")
+
+
+def test_fault_free_model_has_no_errors():
+    for result in compare_strategies(ErrorModel(), 5000, seed=0, max_workers=0).values():
+        assert result.bits == 5000 * 32
+        assert result.bit_errors == result.word_errors == 0
+
+
+def test_extreme_probabilities():
+    always = ErrorModel(p_detect=1.0)
+    assert monte_carlo("naive", always, 2000, seed=1).ber == 1.0
+    # Inverting every bit including the flip bit decodes to the same value
+    assert monte_carlo("pw_plus", always, 2000, seed=1).ber == 0.0
+
+    lost = monte_carlo("naive", ErrorModel(p_inject=1.0), 20000, seed=1)
+    assert lost.ber == pytest.approx(0.5, abs=0.01)
+    # pw reuses the skyrmions of the old word and only loses the injected ones
+    assert monte_carlo("pw", ErrorModel(p_inject=1.0), 20000, seed=1).ber < lost.ber / 4
+
+    # Every shift overshoots: only every other bit is written and read back
+    assert monte_carlo("naive", ErrorModel(p_overshoot=1.0), 20000, seed=1).ber == pytest.approx(0.25, abs=0.01)
+
+
+def _attached_rates(strategy, model, trials, width=16):
+    """Bit and word error rates of writes and reads on attached bit-level instances."""
+    rng = random.Random(0)
+    bit_errors = word_errors = 0
+    for _ in range(trials):
+        s = SKRM(width, 1, strategy=strategy, precision="half")
+        # Write and read raw patterns, NaN payloads included
+        s._pattern = lambda number: number
+        s._decode = lambda word: word
+        old, new = rng.getrandbits(width), rng.getrandbits(width)
+        s._store_segment((flip_bits(old, width) if strategy == "pw_plus" else old) << 1, 0)
+        model.attach(s, seed=rng.getrandbits(32))
+        s.write(new, 0)
+        word = s.read(0)
+        word = unflip_bits(word, width) if strategy == "pw_plus" else word
+        wrong = bin(word ^ new).count("1")
+        bit_errors += wrong
+        word_errors += wrong > 0
+    return bit_errors / (trials * width), word_errors / trials
+
+
+@pytest.mark.parametrize("strategy", ["naive", "pw", "pw_plus"])
+def test_monte_carlo_matches_attached_primitives(strategy):
+    model = ErrorModel(p_inject=0.02, p_overshoot=0.004, p_undershoot=0.004, p_detect=0.002)
+    ber, wer = _attached_rates(strategy, model, 4000)
+    result = monte_carlo(strategy, model, 100000, precision="half", seed=3, max_workers=0)
+    assert result.ber == pytest.approx(ber, rel=0.15)
+    assert result.wer == pytest.approx(wer, rel=0.15)
+
+
+def test_detection_error_rate_is_estimated():
+    result = monte_carlo("pw", ErrorModel(p_detect=0.01), 100000, seed=2, chunk_size=30000)
+    assert result.ber == pytest.approx(0.01, rel=0.05)
+    assert result.wer == pytest.approx(1 - 0.99 ** 32, rel=0.05)
+
+
+def test_monte_carlo_is_reproducible_across_workers():
+    model = ErrorModel(p_inject=0.01, p_overshoot=0.001, p_undershoot=0.002, p_detect=0.001)
+    inline = monte_carlo("pw_plus", model, 20000, seed=7, max_workers=0, chunk_size=4000)
+    pooled = monte_carlo("pw_plus", model, 20000, seed=7, max_workers=2, chunk_size=4000)
+    assert inline == pooled
+    assert inline.bit_errors > 0
+
+
+@pytest.mark.parametrize("path", ["write", "replay", "run_trace", "bank"])
+def test_attached_faults_reach_every_write_path(make_skrm, tmp_path, path):
+    from pyskrm import Bank
+    from pyskrm.trace import run_trace
+
+    values, targets = [1.5, -2.25, 3.0], [0, 1, 2]
+    s = make_skrm(strategy="pw")
+    ErrorModel(p_inject=1.0).attach(s, seed=0)
+    if path == "write":
+        for number, target in zip(values, targets):
+            s.write(number, target)
+    elif path == "replay":
+        s.replay(values, targets)
+    elif path == "run_trace":
+        trace = tmp_path / "t.csv"
+        trace.write_text("".join("%r,%d\n" % record for record in zip(values, targets)))
+        list(run_trace(s, str(trace)))
+    else:
+        Bank(s, max_workers=0).run([(number, target, 0) for number, target in zip(values, targets)])
+    assert s.inject_count > 0 and not s.storage.any()
+
+
+def test_faults_refuse_count_only_and_cached_instances(make_skrm):
+    for s in (make_skrm(analytic=True), make_skrm(cache_bytes=1 << 16)):
+        with pytest.raises(ArgumentError):
+            ErrorModel(p_inject=1.0).attach(s)
+
+
+def test_attached_faults_hit_the_primitives(make_skrm):
+    s = make_skrm(strategy="naive")
+    ErrorModel(p_inject=1.0).attach(s, seed=0)
+    s.write(0.125, 0)
+    assert s.inject_count == 5
+    assert not s.storage.any()
+
+    s = make_skrm(word_size=4, num_words=1)
+    ErrorModel(p_undershoot=1.0).attach(s, seed=0)
+    s.inject(0)
+    s.shift(0, 1)
+    assert s.detect(0) == 1 and s.shift_count == 1
+
+    s = make_skrm(word_size=4, num_words=1)
+    ErrorModel(p_overshoot=1.0).attach(s, seed=0)
+    s.inject(0)
+    s.shift(0, 1)
+    assert s.render_visualization().startswith("0000 |0| 0100 |0|")
+    assert s.shift_count == 1
+
+    s = make_skrm(strategy="pw")
+    s.write(0.125, 1)
+    ErrorModel(p_detect=1.0).attach(s, seed=0)
+    assert s.detect(2) == 1
+    del s.inject, s.shift, s.detect
+    assert s.read(1) == 0.125
@@ -1,10 +1,20 @@
 import math
+import numpy as np
 import pytest
 
 try:
     from pyskrm.ieee754 import convert_float_to_ieee754_single, flip_ieee754
 except Exception:  # pragma: no cover
     from ieee754 import convert_float_to_ieee754_single, flip_ieee754
+from pyskrm.ieee754 import (
+    flip_bits,
+    flip_bits_array,
+    float_to_bits,
+    floats_to_bits,
+    leading_bit_index,
+    leading_bit_index_array,
+    popcount_array,
+)
 
 
 @pytest.mark.parametrize(
@@ -74,3 +84,75 @@ def test_convert_with_flip_bit_true_is_33bits_and_consistent():
     assert len(with_flip) == 33
     # flip_bit=True = flip_ieee754
     assert with_flip == flip_ieee754(orig)
+
+
+@pytest.mark.parametrize(
+    "precision,number,expected",
+    [
+        ("half", 1.0, 0x3C00),
+        ("half", -2.0, 0xC000),
+        ("single", 1.0, 0x3F800000),
+        ("double", 1.0, 0x3FF0000000000000),
+        ("double", -0.5, 0xBFE0000000000000),
+    ],
+)
+def test_float_to_bits_precisions(precision, number, expected):
+    assert float_to_bits(number, precision) == expected
+    width = {"half": 16, "single": 32, "double": 64}[precision]
+    assert convert_float_to_ieee754_single(number, precision=precision) == format(expected, "0%db" % width)
+
+
+def test_invalid_precision():
+    with pytest.raises(ValueError):
+        convert_float_to_ieee754_single(1.0, precision="quad")
+
+
+@pytest.mark.parametrize("number", [0.0, 1.0, -1.0, 0.5, 123.456, 0.124])
+def test_integer_form_matches_string_form(number):
+    bits = float_to_bits(number)
+    assert format(bits, "032b") == convert_float_to_ieee754_single(number)
+    d = convert_float_to_ieee754_single(number, flip_bit=True)
+    assert format(flip_bits(bits), "033b") == d
+    assert leading_bit_index(flip_bits(bits), 33) == d.find("1")
+
+
+@pytest.mark.parametrize("precision", ["half", "single", "double"])
+def test_array_form_matches_scalar_form(precision):
+    rng = np.random.default_rng(0)
+    values = np.concatenate([rng.standard_normal(200) * 1000, [0.0, -0.0, 1.0, 0.124]])
+    width = {"half": 16, "single": 32, "double": 64}[precision]
+
+    bits = floats_to_bits(values, precision)
+    scalar = [float_to_bits(v, precision) for v in bits.view(bits.dtype.str.replace("u", "f")).tolist()]
+    assert bits.tolist() == scalar
+    assert popcount_array(bits).tolist() == [bin(b).count("1") for b in scalar]
+    assert leading_bit_index_array(bits, width).tolist() == [leading_bit_index(b, width) for b in scalar]
+    if width < 64:
+        assert flip_bits_array(bits, width).tolist() == [flip_bits(b, width) for b in scalar]
+    else:
+        with pytest.raises(ValueError):
+            flip_bits_array(bits, width)
+
+
+@pytest.mark.parametrize(
+    "precision,number,expected",
+    [
+        ("half", 65504.0, 0x7BFF),
+        ("half", 65520.0, 0x7C00),
+        ("half", 1e6, 0x7C00),
+        ("half", -1e6, 0xFC00),
+        ("single", 1e300, 0x7F800000),
+        ("single", -1e300, 0xFF800000),
+    ],
+)
+def test_out_of_range_values_round_to_infinity(make_skrm, precision, number, expected):
+    assert float_to_bits(number, precision) == expected
+    assert floats_to_bits([number], precision).tolist() == [expected]
+
+    width = {"half": 16, "single": 32}[precision]
+    written = make_skrm(word_size=width, precision=precision)
+    replayed = make_skrm(word_size=width, precision=precision)
+    written.write(number, 1)
+    replayed.replay([number], [1])
+    assert written.storage == replayed.storage
+    assert written.read(1) == (number if expected == 0x7BFF else math.copysign(math.inf, number))
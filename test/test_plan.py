@@ -0,0 +1,122 @@
+import pytest
+
+from pyskrm import SKRM
+from pyskrm import plan
+from pyskrm.snapshot import restore, snapshot
+from pyskrm.tracing import Tracer
+from conftest import counters
+
+try:
+    from pyskrm.argument_error import ArgumentError
+except Exception:  # pragma: no cover
+    ArgumentError = Exception
+
+WRITES = [(1.5, 0, 0), (-2.25, 2, 1), (0.1, 1, 1), (1.5, 0, 0), (-0.5, 2, 0), (7.75, 1, 1), (1.5, 0, 0)]
+
+
+@pytest.mark.parametrize("strategy", ["naive", "pw", "pw_plus"])
+@pytest.mark.parametrize("layout", ["flat", "ring", "sparse"])
+def test_plan_engine_matches_direct_writes(make_skrm, strategy, layout):
+    direct = make_skrm(strategy=strategy, num_racetrack=2, layout=layout)
+    planned = make_skrm(strategy=strategy, num_racetrack=2, layout=layout, engine="plan")
+    for number, target_word, track in WRITES:
+        direct.write(number, target_word, track)
+        planned.write(number, target_word, track)
+        assert planned.storage == direct.storage
+        assert counters(planned) == counters(direct)
+    assert planned.read(1, 1) == direct.read(1, 1) == pytest.approx(7.75)
+    assert plan.REGISTRY[strategy].plans.hits > 0
+
+
+def test_hooked_primitives_see_every_operation(make_skrm):
+    direct = make_skrm(strategy="pw")
+    planned = make_skrm(strategy="pw", engine="plan")
+    tracer = Tracer()
+    with tracer.attached(planned):
+        for s in (direct, planned):
+            s.write(3.0, 1)
+            s.write(-3.0, 1)
+    assert planned.storage == direct.storage and counters(planned) == counters(direct)
+    assert sum(event.op == "detect" for event in tracer.events()) == direct.detect_count
+
+    restored = restore(snapshot(planned)).skrm
+    assert restored.engine == "plan"
+    restored.write(1.0, 0)
+    assert restored.read(0) == 1.0
+
+
+def _invert_planner(segment, word_size, pattern, width):
+    """Stores the bitwise complement of the pattern: clear the word, then inject its zeros."""
+    codes = [plan.SHIFT << 1, plan.REMOVE << 1 | 1] * word_size
+    for i in range(word_size - 1, -1, -1):
+        if not (pattern >> i) & 1:
+            codes.append(plan.INJECT << 1 | 1)
+        codes.append(plan.SHIFT << 1 | 1)
+    return bytes(codes)
+
+
+def _clear_write(skrm, number, target_word, track=0):
+    for _ in range(skrm.word_size):
+        skrm.shift(target_word, target_word + 1, track)
+        skrm.remove(target_word + 1, track)
+    skrm.shift_count += 1  # charged only
+
+
+@pytest.fixture
+def registered():
+    plan.register("invert", planner=_invert_planner)
+    plan.register("clear", write_fn=_clear_write)
+    yield
+    plan.unregister("invert")
+    plan.unregister("clear")
+
+
+def test_registered_strategies(registered):
+    s = SKRM(word_size=16, num_words=2, strategy="invert", precision="half")
+    assert s.engine == "plan"
+    s.write(1.5, 1)
+    assert s.read(1) != 1.5
+    assert s.storage.count() == 16 - bin(0x3E00).count("1")  # 1.5 in half precision is 0x3E00
+
+    c = SKRM(word_size=16, num_words=2, strategy="clear", precision="half")
+    c.write(0.0, 0)
+    assert counters(c) == (0, 0, 16, 17)
+    with pytest.raises(ArgumentError):
+        c.replay([1.0], [0])
+    with pytest.raises(ArgumentError):
+        plan.register("clear", write_fn=_clear_write)
+
+
+def _charge_secded_write(skrm, number, target_word, track=0):
+    _clear_write(skrm, number, target_word, track)
+    if skrm.encoding == "secded":
+        skrm.remove_count += 1  # charged only
+
+
+def test_plans_are_kept_apart_by_precision_and_encoding():
+    plan.register("charged", write_fn=_charge_secded_write)
+    try:
+        # Both store 0.0 as a 72-bit zero pattern
+        dbi = SKRM(word_size=72, num_words=1, strategy="charged", precision="double", encoding="dbi8")
+        secded = SKRM(word_size=72, num_words=1, strategy="charged", precision="double", encoding="secded")
+        assert dbi.pattern_width == secded.pattern_width and dbi._pattern(0.0) == secded._pattern(0.0) == 0
+        dbi.write(0.0, 0)
+        secded.write(0.0, 0)
+        assert counters(dbi) == (0, 0, 72, 73)
+        assert counters(secded) == (0, 0, 73, 73)
+        assert len(plan.REGISTRY["charged"].plans) == 2
+    finally:
+        plan.unregister("charged")
+
+
+def test_invalid_engines(make_skrm):
+    with pytest.raises(ArgumentError):
+        make_skrm(engine="jit")
+    with pytest.raises(ArgumentError):
+        make_skrm(strategy="adaptive", engine="plan")
+    with pytest.raises(ArgumentError):
+        make_skrm(strategy="unknown")
+    with pytest.raises(ArgumentError):
+        plan.register("neither")
+    with pytest.raises(ArgumentError):
+        plan.unregister("pw")
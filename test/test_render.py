@@ -0,0 +1,90 @@
+import pytest
+
+from pyskrm.stats import Stats, aggregate
+
+try:
+    from pyskrm.argument_error import ArgumentError
+except Exception:  # pragma: no cover
+    ArgumentError = Exception
+
+
+def _reference(s):
+    """The original bit-by-bit renderer."""
+    parts = []
+    for track in range(s.num_racetrack):
+        line = []
+        for idx, val in enumerate(s.storage[s.track_length * track: s.track_length * (track + 1)]):
+            if idx % (s.word_size + 1) == s.word_size:
+                line.append(" |")
+            line.append(str(int(val)))
+            if idx % (s.word_size + 1) == s.word_size:
+                line.append("| ")
+        parts.append("".join(line) + "\n")
+    return "".join(parts)
+
+
+@pytest.mark.parametrize("layout", ["flat", "ring", "sparse"])
+@pytest.mark.parametrize("num_overhead", [1, 2, 3])
+def test_bits_match_reference(make_skrm, num_overhead, layout):
+    s = make_skrm(strategy="pw_plus", word_size=8, num_words=4, num_racetrack=2, precision="half",
+                  num_overhead=num_overhead, layout=layout)
+    bits = s.storage
+    # Overhead before the first AP and after the last one
+    bits[2] = 1
+    if num_overhead > 1:
+        bits[s.track_length - 1] = 1
+    s.storage = bits
+    s.write(1.5, 1)
+    s.write(-3.0, 3, 1)
+    s.inject(2, 1)
+    assert s.render_visualization() == _reference(s)
+    assert s.render_visualization(words=(4, 4)) == " |0| \n |0| \n"
+
+
+def test_windows_do_not_materialize_a_sparse_layout(make_skrm, monkeypatch):
+    s = make_skrm(word_size=32, num_words=1 << 26, layout="sparse")
+    s.write(1.5, 1 << 25)
+    monkeypatch.setattr(type(s), "storage", property(lambda self: pytest.fail("dense copy of the storage")))
+    window = (1 << 25, (1 << 25) + 2)
+    assert s.render_visualization(words=window).strip() == (
+        "|0| 00111111110000000000000000000000 |0| 00000000000000000000000000000000 |0|")
+    assert s.render_visualization(words=window, mode="ones") == "8 0\n"
+
+
+def test_windows_and_modes(make_skrm):
+    s = make_skrm(strategy="naive", word_size=16, num_words=4, num_racetrack=2, precision="half")
+    s.write(1.5, 1)
+    s.write(-2.0, 2, 1)
+
+    window = s.render_visualization(words=(1, 3), tracks=(0, 1))
+    full = s.render_visualization().splitlines()[0]
+    assert window.count("\n") == 1
+    assert window.strip() in full
+    assert window.count("|") == 6  # APs 1, 2 and 3
+
+    assert s.render_visualization(mode="ones") == "0 5 0 0\n0 0 2 0\n"
+    assert s.render_visualization(mode="values", words=(1, 3)) == "1.5 0.0\n0.0 -2.0\n"
+    with pytest.raises(ArgumentError):
+        s.render_visualization(mode="hex")
+    with pytest.raises(ArgumentError):
+        s.render_visualization(words=(2, 5))
+
+
+def test_stats_match_the_rendered_report(make_skrm):
+    s = make_skrm(strategy="pw")
+    s.write(1.25, 0)
+    stats = s.stats()
+    assert stats.shift_count == s.shift_count
+    assert stats.total_count == s.inject_count + s.detect_count + s.remove_count + s.shift_count
+    assert "%-15s %-15s\n" % ("Total latency:", stats.total_latency) in s.render_latency()
+    assert stats.strategy_picks == {}
+
+    adaptive = make_skrm(strategy="adaptive")
+    adaptive.write(1.25, 0)
+    total = aggregate([stats, adaptive.stats(), adaptive.stats()])
+    assert total.inject_count == s.inject_count + 2 * adaptive.inject_count
+    assert sum(picks for picks, _, _ in total.strategy_picks.values()) == 2
+    row = total.as_row()
+    assert row["total_energy"] == pytest.approx(total.total_energy)
+    assert "strategy_picks" not in row and "picks_naive" in row
+    assert aggregate([]) == Stats()
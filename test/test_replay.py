@@ -0,0 +1,132 @@
+import numpy as np
+import pytest
+from bitarray import bitarray
+
+from pyskrm.replay import ReplayResult
+from conftest import counters
+
+try:
+    from pyskrm.argument_error import ArgumentError
+except Exception:  # pragma: no cover
+    ArgumentError = Exception
+
+
+def loop_writes(s, values, targets):
+    per_write = []
+    for value, target in zip(values.tolist(), targets.tolist()):
+        before = counters(s)
+        s.write(value, target)
+        per_write.append([after - b for after, b in zip(counters(s), before)])
+    return np.array(per_write)
+
+
+def trace(seed=7, n=300, num_words=4):
+    rng = np.random.default_rng(seed)
+    values = np.concatenate([
+        (rng.standard_normal(n) * 100).astype(np.float32),
+        np.zeros(10, dtype=np.float32),
+        np.full(10, 0.125, dtype=np.float32),
+        np.float32([0.124, 123.456, -1.0, 3.4e38]),
+    ])
+    targets = rng.integers(0, num_words, len(values))
+    return values, targets
+
+
+@pytest.mark.parametrize("strategy", ["naive", "pw", "pw_plus"])
+@pytest.mark.parametrize("word_size", [32, 8])
+def test_replay_matches_write_loop(make_skrm, strategy, word_size):
+    values, targets = trace()
+    looped = make_skrm(word_size=word_size, num_words=4, strategy=strategy)
+    batched = make_skrm(word_size=word_size, num_words=4, strategy=strategy)
+
+    expected = loop_writes(looped, values, targets)
+    result = batched.replay(values, targets)
+
+    assert isinstance(result, ReplayResult)
+    np.testing.assert_array_equal(result.counts, expected)
+    assert counters(batched) == counters(looped)
+    assert batched.storage == looped.storage
+
+
+@pytest.mark.parametrize("strategy", ["naive", "pw", "pw_plus"])
+@pytest.mark.parametrize("precision,word_size", [("half", 16), ("double", 64), ("double", 40)])
+def test_replay_matches_write_loop_other_precisions(make_skrm, strategy, precision, word_size):
+    values, targets = trace(n=60)
+    values = values[np.abs(values) < 6e4]
+    targets = targets[:len(values)]
+    looped = make_skrm(word_size=word_size, num_words=4, strategy=strategy, precision=precision)
+    batched = make_skrm(word_size=word_size, num_words=4, strategy=strategy, precision=precision)
+
+    expected = loop_writes(looped, values, targets)
+    result = batched.replay(values, targets)
+
+    np.testing.assert_array_equal(result.counts, expected)
+    assert batched.storage == looped.storage
+
+
+@pytest.mark.parametrize("strategy", ["naive", "pw", "pw_plus"])
+def test_replay_matches_write_loop_with_stray_skyrmions(make_skrm, strategy):
+    values, targets = trace(seed=3, n=50, num_words=3)
+    noise = bitarray(np.random.default_rng(1).integers(0, 2, len(make_skrm().storage)).tolist())
+    looped = make_skrm(strategy=strategy)
+    batched = make_skrm(strategy=strategy)
+    looped.storage[:] = noise
+    batched.storage[:] = noise
+
+    expected = loop_writes(looped, values, targets)
+    result = batched.replay(values, targets)
+
+    np.testing.assert_array_equal(result.counts, expected)
+    assert batched.storage == looped.storage
+
+
+@pytest.mark.parametrize("strategy", ["naive", "pw", "pw_plus"])
+def test_replay_touches_only_the_batch_words(make_skrm, strategy):
+    rng = np.random.default_rng(5)
+    values = (rng.standard_normal(200) * 100).astype(np.float32)
+    targets, tracks = rng.integers(0, 500, 200), rng.integers(0, 3, 200)
+    looped = make_skrm(word_size=13, num_words=500, num_racetrack=3, strategy=strategy, precision="half")
+    batched = make_skrm(word_size=13, num_words=500, num_racetrack=3, strategy=strategy, precision="half")
+    for s in (looped, batched):
+        for track in range(3):
+            for word in range(500):
+                s._store_segment(int(rng.integers(0, 1 << s.word_size)) << 1, word, track)
+    batched.storage = bitarray(looped.storage)
+
+    for value, target, track in zip(values.tolist(), targets.tolist(), tracks.tolist()):
+        looped.write(value, target, track)
+    batched.replay(values, targets, tracks)
+    assert counters(batched) == counters(looped)
+    assert batched.storage == looped.storage
+
+
+def test_replay_memory_does_not_grow_with_the_instance(make_skrm):
+    import tracemalloc
+
+    s = make_skrm(num_words=1 << 20, strategy="pw")
+    values = np.random.default_rng(0).standard_normal(1000).astype(np.float32)
+    targets = np.random.default_rng(1).integers(0, 1 << 20, 1000)
+    tracemalloc.start()
+    s.replay(values, targets)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert peak < 8 << 20
+
+
+def test_replay_costs_and_inputs(make_skrm):
+    s = make_skrm()
+    values = memoryview(np.float32([0.125, 0.124, 0.125]))
+    result = s.replay(values, [0, 0, 0])
+
+    np.testing.assert_array_equal(result.totals, [33, 0, 96, 192])
+    np.testing.assert_allclose(result.latency, result.counts @ [1.0, 0.1, 0.8, 0.5])
+    assert result.total_energy == 33 * 200 + 96 * 20 + 192 * 20
+    assert s.inject_count == 33
+
+    empty = s.replay([], [])
+    assert empty.counts.shape == (0, 4)
+
+    with pytest.raises(ArgumentError):
+        s.replay([1.0], [3])
+    with pytest.raises(ArgumentError):
+        s.replay([1.0, 2.0], [0])
@@ -0,0 +1,83 @@
+import random
+
+import pytest
+from bitarray import bitarray
+
+from pyskrm.bank import Bank
+from conftest import counters
+
+try:
+    from pyskrm.argument_error import ArgumentError
+except Exception:  # pragma: no cover
+    ArgumentError = Exception
+
+
+def test_ring_primitives_match_flat(make_skrm):
+    rng = random.Random(11)
+    flat = make_skrm(word_size=5, num_words=4, num_racetrack=2)
+    ring = make_skrm(word_size=5, num_words=4, num_racetrack=2, layout="ring")
+
+    for _ in range(2000):
+        op = rng.choice(["inject", "inject", "detect", "remove", "shift", "shift", "shift"])
+        track = rng.randrange(2)
+        if op == "shift":
+            start, end = rng.sample(range(5), 2)
+            flat.shift(start, end, track)
+            ring.shift(start, end, track)
+        else:
+            ap = rng.randrange(5)
+            assert getattr(ring, op)(ap, track) == getattr(flat, op)(ap, track)
+        if rng.random() < 0.05:
+            assert ring.render_visualization() == flat.render_visualization()
+    assert ring.storage == flat.storage
+    assert counters(ring) == counters(flat)
+
+
+@pytest.mark.parametrize("analytic", [False, True])
+def test_ring_writes_match_flat(skrm_each_strategy, make_skrm, analytic):
+    _, strategy = skrm_each_strategy
+    rng = random.Random(3)
+    flat = make_skrm(strategy=strategy, num_racetrack=2)
+    ring = make_skrm(strategy=strategy, num_racetrack=2, layout="ring", analytic=analytic)
+    noise = bitarray([rng.getrandbits(1) for _ in range(len(flat.storage))])
+    flat.storage[:] = noise
+    ring.storage[:] = noise
+
+    for _ in range(30):
+        value, target, track = rng.uniform(-1e3, 1e3), rng.randrange(3), rng.randrange(2)
+        flat.write(value, target, track)
+        ring.write(value, target, track)
+        assert ring.detect(target + 1, track) == flat.detect(target + 1, track)
+    assert ring.render_visualization() == flat.render_visualization()
+    assert ring.storage == flat.storage
+    assert counters(ring) == counters(flat)
+
+
+def test_ring_with_cache_and_bank(make_skrm):
+    requests = [(0.125, 0, 0), (0.124, 1, 1), (0.125, 0, 0), (7.25, 2, 1), (0.125, 0, 0)]
+    flat = make_skrm(strategy="pw_plus", num_racetrack=2)
+    ring = make_skrm(strategy="pw_plus", num_racetrack=2, layout="ring", cache_bytes=1 << 16)
+    for number, target_word, track in requests:
+        flat.write(number, target_word, track)
+        ring.write(number, target_word, track)
+    assert ring.storage == flat.storage
+    assert ring.cache.stats().hits >= 1
+
+    Bank(flat, max_workers=0).run(requests)
+    Bank(ring, max_workers=0).run(requests)
+    assert ring.storage == flat.storage
+    assert counters(ring) == counters(flat)
+
+
+def test_ring_shift_cost_does_not_copy_words(make_skrm):
+    s = make_skrm(word_size=4096, num_words=2, layout="ring")
+    s.inject(0)
+    for _ in range(4097):       # through the whole word onto AP 1
+        s.shift(0, 1)
+    assert s.detect(1) == 1
+    assert s.storage.count() == 1
+
+
+def test_invalid_layout(make_skrm):
+    with pytest.raises(ArgumentError):
+        make_skrm(layout="diagonal")
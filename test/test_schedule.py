@@ -0,0 +1,85 @@
+import pytest
+
+from pyskrm.access import READ, WRITE, run_accesses
+from pyskrm.schedule import ShiftScheduler
+
+try:
+    from pyskrm.argument_error import ArgumentError
+except Exception:  # pragma: no cover
+    ArgumentError = Exception
+
+
+def writes(*words):
+    return [(WRITE, 0.5 + w, w, 0) for w in words]
+
+
+def test_in_order_alignment_shifts(make_skrm):
+    s = make_skrm(num_words=8)
+    result = ShiftScheduler(s, window=1, policy="fifo").run(writes(3, 1, 5))
+    assert result.order == [0, 1, 2]
+    assert result.alignment_shifts == (3 + 2 + 4) * 33
+    assert result.shift_savings == 0
+    assert result.latency == pytest.approx(result.baseline_latency)
+
+
+def test_nearest_first_saves_shifts(make_skrm):
+    s = make_skrm(num_words=8)
+    reference = make_skrm(num_words=8)
+    accesses = writes(3, 1, 5) + [(READ, 0.0, 3, 0), (READ, 0.0, 1, 0)]
+
+    result = ShiftScheduler(s, window=3, policy="nearest").run(accesses)
+    run_accesses(reference, accesses)
+
+    assert result.order[:3] == [1, 0, 3]
+    assert result.alignment_shifts < result.baseline_alignment_shifts
+    assert result.shift_savings == result.baseline_alignment_shifts - result.alignment_shifts
+    assert result.latency_reduction == pytest.approx(result.shift_savings * s.shift_latency)
+    assert sorted(result.reads) == [1.5, 3.5]
+    assert s.storage == reference.storage
+
+
+def test_elevator_keeps_direction(make_skrm):
+    nearest = ShiftScheduler(make_skrm(num_words=8), window=3, policy="nearest")
+    elevator = ShiftScheduler(make_skrm(num_words=8), window=3, policy="elevator")
+    for scheduler in (nearest, elevator):
+        scheduler.offsets[0] = 3
+
+    assert nearest.run(writes(2, 5, 6), compare=False).order == [0, 1, 2]
+    assert elevator.run(writes(2, 5, 6), compare=False).order == [1, 2, 0]
+
+
+def test_multiple_ports(make_skrm):
+    s = make_skrm(num_words=8)
+    scheduler = ShiftScheduler(s, num_ports=2, window=1)
+    assert scheduler.ports == [0, 4]
+    result = scheduler.run(writes(5, 3), compare=False)
+    # word 5 -> port 4 (+1), word 3 -> port 4 (-2 from offset 1)
+    assert result.alignment_shifts == (1 + 2) * 33
+
+
+def test_same_word_accesses_keep_their_order(make_skrm):
+    s = make_skrm(num_words=8)
+    accesses = [(WRITE, 1.0, 6, 0), (READ, 0.0, 6, 0), (WRITE, 2.0, 6, 0), (READ, 0.0, 6, 0), (WRITE, 9.0, 0, 0)]
+    result = ShiftScheduler(s, window=5, policy="nearest").run(accesses)
+    assert result.reads == [1.0, 2.0]
+    assert [i for i in result.order if i < 4] == [0, 1, 2, 3]
+
+
+def test_coalescing_drops_dead_writes(make_skrm):
+    s = make_skrm(num_words=8)
+    accesses = [(WRITE, 1.0, 2, 0), (WRITE, 2.0, 2, 0), (READ, 0.0, 2, 0), (WRITE, 3.0, 2, 0)]
+    result = ShiftScheduler(s, window=4, policy="fifo", coalesce=True).run(accesses)
+    assert result.coalesced == [0]
+    assert result.order == [1, 2, 3]
+    assert result.reads == [2.0]
+    assert result.latency < result.baseline_latency
+
+
+def test_scheduler_rejects_bad_arguments(make_skrm):
+    s = make_skrm(num_words=4)
+    with pytest.raises(ArgumentError):
+        ShiftScheduler(s, num_ports=5)
+    with pytest.raises(ArgumentError):
+        ShiftScheduler(s, window=0)
+    with pytest.raises(ArgumentError):
+        ShiftScheduler(s, policy="random")
@@ -0,0 +1,141 @@
+import pytest
+
+from pyskrm.bank import Bank
+from conftest import counters
+
+try:
+    from pyskrm.argument_error import ArgumentError
+except Exception:  # pragma: no cover
+    ArgumentError = Exception
+
+
+def test_primitives_address_their_track(make_skrm):
+    s = make_skrm(word_size=4, num_words=2, num_racetrack=2)
+
+    s.inject(1, track=1)
+    assert s.detect(1, track=1) == 1
+    assert s.detect(1, track=0) == 0
+    assert s.render_visualization() == (
+        "0000 |0| 0000 |0| 0000 |0| 0000\n"
+        "0000 |0| 0000 |1| 0000 |0| 0000\n"
+    )
+
+    s.shift(1, 0, track=1)
+    assert s.render_visualization() == (
+        "0000 |0| 0000 |0| 0000 |0| 0000\n"
+        "0000 |0| 0001 |0| 0000 |0| 0000\n"
+    )
+    s.remove(0, track=1)
+    assert s.shift_count == 1 and s.remove_count == 1
+
+    with pytest.raises(ArgumentError) as excinfo:
+        s.inject(0, track=2)
+    assert "Track must be between 0 and (num_racetrack - 1)." in str(excinfo.value)
+    with pytest.raises(ArgumentError):
+        s.shift(0, 1, track=-1)
+
+
+@pytest.mark.parametrize("analytic", [False, True])
+def test_writes_on_other_tracks_are_independent(skrm_each_strategy, make_skrm, analytic):
+    _, strategy = skrm_each_strategy
+    single = make_skrm(strategy=strategy, analytic=analytic)
+    multi = make_skrm(strategy=strategy, num_racetrack=3, analytic=analytic)
+
+    single.write(0.125, 1)
+    single.write(-3.5, 1)
+    multi.write(0.125, 1, track=2)
+    multi.write(-3.5, 1, track=2)
+
+    track = multi.track_length
+    assert multi.storage[2 * track:] == single.storage
+    assert not multi.storage[:2 * track].any()
+    assert counters(multi) == counters(single)
+
+    with pytest.raises(ArgumentError):
+        multi.write(1.0, 0, track=3)
+
+
+def test_replay_addresses_tracks(make_skrm):
+    looped = make_skrm(strategy="pw_plus", num_racetrack=2)
+    batched = make_skrm(strategy="pw_plus", num_racetrack=2)
+    writes = [(0.125, 0, 1), (1.5, 0, 0), (0.124, 0, 1), (-2.0, 2, 0), (0.125, 0, 1)]
+
+    for number, target_word, track in writes:
+        looped.write(number, target_word, track)
+    batched.replay(*zip(*writes))
+
+    assert batched.storage == looped.storage
+    assert counters(batched) == counters(looped)
+
+
+@pytest.mark.parametrize("max_workers", [0, 2])
+def test_bank_matches_sequential_execution(skrm_each_strategy, make_skrm, max_workers):
+    _, strategy = skrm_each_strategy
+    requests = [(0.125, 0, 0), (0.124, 1, 1), (0.125, 0, 1), (7.25, 2, 2), (0.124, 0, 0), (1.0, 2, 0)]
+
+    sequential = make_skrm(strategy=strategy, num_racetrack=3)
+    for number, target_word, track in requests:
+        sequential.write(number, target_word, track)
+
+    banked = make_skrm(strategy=strategy, num_racetrack=3)
+    result = Bank(banked, max_workers=max_workers).run(requests)
+
+    assert banked.storage == sequential.storage
+    assert counters(banked) == counters(sequential)
+    assert sorted(result.counts) == [0, 1, 2]
+    assert result.sequential_latency == pytest.approx(
+        sequential.inject_count * 1.0 + sequential.detect_count * 0.1 +
+        sequential.remove_count * 0.8 + sequential.shift_count * 0.5
+    )
+    assert result.parallel_latency == max(result.latency.values())
+    assert result.parallel_latency < result.sequential_latency
+
+
+@pytest.mark.parametrize("max_workers", [0, 2])
+def test_bank_merges_the_statistics_of_every_track(make_skrm, max_workers):
+    requests = [(0.125, 0, 0), (0.124, 1, 1), (0.125, 0, 1), (7.25, 2, 2), (3.5, 1, 2), (-1.0, 2, 0), (7.25, 2, 2)]
+    params = dict(word_size=39, num_racetrack=3, strategy="adaptive", encoding="secded", differential="detect")
+    sequential = make_skrm(**params)
+    banked = make_skrm(**params)
+    for s in (sequential, banked):
+        s.write(3.5, 1, 2)
+        # A flipped bit, corrected by the read of the differential write of (3.5, 1, 2)
+        s._store_segment(s._read_segment(1, 2) ^ (1 << 7), 1, 2)
+    for number, target_word, track in requests:
+        sequential.write(number, target_word, track)
+    Bank(banked, max_workers=max_workers).run(requests)
+
+    assert counters(banked) == counters(sequential)
+    assert banked.strategy_picks == pytest.approx(sequential.strategy_picks)
+    assert banked.differential_stats == pytest.approx(sequential.differential_stats)
+    assert banked.encoding_stats == sequential.encoding_stats == {"corrected": 1, "detected": 0}
+    stats = banked.differential_stats
+    assert stats["skipped"] + stats["partial"] + stats["full"] == len(requests) + 1
+    assert sum(picks for picks, _, _ in banked.strategy_picks.values()) > 0
+
+
+@pytest.mark.parametrize("max_workers", [0, 2])
+def test_bank_keeps_a_sparse_layout_sparse(make_skrm, max_workers, monkeypatch):
+    requests = [(1.5, 1 << 20, 0), (-2.0, 3, 1), (0.25, 1 << 20, 1), (7.0, 0, 0)]
+    sequential = make_skrm(num_words=1 << 21, num_racetrack=2, layout="sparse")
+    banked = make_skrm(num_words=1 << 21, num_racetrack=2, layout="sparse")
+    for s in (sequential, banked):
+        s.write(3.0, 5, 1)
+        s._ring.overhead.add(s.track_length + 2)
+    for number, target_word, track in requests:
+        sequential.write(number, target_word, track)
+    monkeypatch.setattr(type(banked), "storage", property(lambda self: pytest.fail("dense copy of the storage")))
+    Bank(banked, max_workers=max_workers).run(requests)
+
+    assert banked._ring.words == sequential._ring.words
+    assert dict(banked._ring.aps) == dict(sequential._ring.aps)
+    assert banked._ring.overhead == sequential._ring.overhead
+    assert counters(banked) == counters(sequential)
+
+
+def test_bank_rejects_out_of_range_requests(make_skrm):
+    bank = Bank(make_skrm(num_racetrack=2), max_workers=0)
+    with pytest.raises(ArgumentError):
+        bank.run([(1.0, 0, 2)])
+    with pytest.raises(ArgumentError):
+        bank.run([(1.0, 3, 0)])
@@ -0,0 +1,176 @@
+import copy
+import pickle
+
+import pytest
+
+from pyskrm import snapshot
+from pyskrm.trace import TraceChunk, run_trace
+from pyskrm.error_model import ErrorModel
+from pyskrm.tracing import Tracer
+from pyskrm.wear import WearTracker
+
+try:
+    from pyskrm.argument_error import ArgumentError
+except Exception:  # pragma: no cover
+    ArgumentError = Exception
+
+np = pytest.importorskip("numpy")
+
+
+def _state(s):
+    return (s.storage, s.inject_count, s.detect_count, s.remove_count, s.shift_count)
+
+
+@pytest.mark.parametrize("strategy", ["naive", "pw", "pw_plus", "adaptive"])
+@pytest.mark.parametrize("compress", [True, False])
+def test_snapshot_round_trip(make_skrm, strategy, compress):
+    s = make_skrm(strategy=strategy, word_size=16, num_racetrack=2, precision="half", cache_bytes=4096)
+    s.shift_latency = 0.25
+    s.adaptive_metric = "energy"
+    s.write(1.5, 0)
+    s.write(-3.0, 2, 1)
+
+    restored, records = snapshot.restore(snapshot.snapshot(s, records=7, compress=compress))
+    assert records == 7
+    assert _state(restored) == _state(s)
+    assert (restored.strategy, restored.precision, restored.word_size) == (s.strategy, s.precision, s.word_size)
+    assert restored.shift_latency == 0.25 and restored.adaptive_metric == "energy"
+    assert restored.strategy_picks == s.strategy_picks
+    assert restored.cache.max_bytes == 4096
+    restored.write(2.0, 1)
+    s.write(2.0, 1)
+    assert _state(restored) == _state(s)
+
+
+def test_snapshot_keeps_differential_and_encoding_stats(make_skrm):
+    s = make_skrm(word_size=39, encoding="secded", differential="detect")
+    s.write(3.5, 1)
+    s._store_segment(s._read_segment(1) ^ (1 << 7), 1)
+    s.write(3.5, 1)
+    s.write(-1.0, 1)
+    s.write(2.0, 0)
+    assert s.encoding_stats["corrected"] == 1 and s.differential_stats["latency_saved"] > 0
+
+    restored = snapshot.restore(snapshot.snapshot(s)).skrm
+    assert restored.differential_stats == s.differential_stats
+    assert restored.encoding_stats == s.encoding_stats
+    assert restored.differential == "detect" and restored.encoding == "secded"
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_sparse_snapshot_keeps_the_sparse_contents(make_skrm, monkeypatch, compress):
+    s = make_skrm(strategy="pw_plus", word_size=64, precision="double", num_words=1 << 30, num_racetrack=2,
+                  layout="sparse")
+    s.write(1.5, 1 << 29)
+    s.write(-3.25, 7, 1)
+    s.inject(9, 1)
+    s._ring.overhead.add(s.track_length + 1)
+    monkeypatch.setattr(type(s), "storage", property(lambda self: pytest.fail("dense copy of the storage")))
+    data = snapshot.snapshot(s, compress=compress)
+    assert len(data) < 1024
+
+    restored = snapshot.restore(data).skrm
+    assert restored._ring.words == s._ring.words
+    assert dict(restored._ring.aps) == dict(s._ring.aps)
+    assert restored._ring.overhead == s._ring.overhead
+    assert restored.read(1 << 29) == 1.5 and restored.read(7, 1) == -3.25
+    with pytest.raises(ArgumentError):
+        snapshot.restore(snapshot.snapshot(s, compress=False)[:-1])
+
+
+def test_restore_rejects_bad_data(make_skrm):
+    custom = make_skrm()
+    custom.set_write_fn(lambda self, number, target_word, track=0: None)
+    data = snapshot.snapshot(custom)
+    with pytest.raises(ArgumentError):
+        snapshot.restore(data)
+    assert snapshot.restore(data, write_fn=lambda self, number, target_word, track=0: None).skrm.num_words == 3
+    with pytest.raises(ArgumentError):
+        snapshot.restore(b"not a snapshot")
+    with pytest.raises(ArgumentError):
+        snapshot.restore(snapshot.snapshot(make_skrm())[:-1])
+
+
+def test_checkpointed_replay_resumes(make_skrm, tmp_path):
+    rng = np.random.default_rng(3)
+    values = rng.uniform(-10, 10, 40).astype(np.float32)
+    targets = rng.integers(0, 3, 40)
+    chunks = [TraceChunk(values[i:i + 10], targets[i:i + 10], None) for i in range(0, 40, 10)]
+
+    full = make_skrm(strategy="pw")
+    list(run_trace(full, chunks))
+
+    path = str(tmp_path / "replay.ckpt")
+    partial = make_skrm(strategy="pw")
+    for progress in run_trace(partial, chunks, checkpoint=path, checkpoint_every=2):
+        if progress.records == 20:
+            break
+    resumed, records = snapshot.load(path)
+    assert records == 20
+    progress = list(run_trace(resumed, [TraceChunk(values, targets, None)], checkpoint=path, start=records))
+    assert progress[-1].records == 40
+    assert _state(resumed) == _state(full)
+    assert snapshot.load(path).records == 40
+
+
+@pytest.mark.parametrize("layout", ["flat", "ring"])
+def test_fork_is_copy_on_write(make_skrm, layout):
+    parent = make_skrm(strategy="pw_plus", layout=layout)
+    parent.write(1.25, 0)
+    child = parent.fork()
+    assert child._storage is parent._storage
+    before = _state(parent)
+
+    child.write(-7.5, 0)
+    assert _state(parent) == before
+    assert child.read(0) == -7.5 and parent.read(0) == 1.25
+
+    parent.write(3.0, 1)
+    sibling = parent.fork()
+    sibling.write(4.0, 2)
+    assert parent.read(1) == sibling.read(1) == 3.0
+    assert parent.storage != sibling.storage
+
+
+_HOOKS = {
+    "tracer": lambda s: Tracer().attach(s),
+    "error_model": lambda s: ErrorModel(p_inject=0.5, p_overshoot=0.2, p_detect=0.2).attach(s, seed=1),
+    "wear": WearTracker,
+}
+
+
+@pytest.mark.parametrize("layout", ["flat", "ring"])
+@pytest.mark.parametrize("hook", list(_HOOKS))
+def test_fork_stays_copy_on_write_under_hooks(make_skrm, layout, hook):
+    parent = make_skrm(strategy="pw", layout=layout)
+    parent.write(1.0, 0)
+    child = parent.fork()
+    _HOOKS[hook](child)
+    before = _state(parent)
+    child.write(2.5, 0)
+    child.write(-3.0, 1)
+    assert _state(parent) == before
+    assert parent.read(0) == 1.0
+
+    other = parent.fork()
+    _HOOKS[hook](parent)
+    parent.write(7.0, 0)
+    assert other.read(0) == 1.0
+
+
+def test_fork_copies_and_hooks(make_skrm):
+    parent = make_skrm(strategy="pw")
+    child = parent.fork()
+    # Copies made while the storage is shared own their bits
+    for clone in (copy.deepcopy(child), pickle.loads(pickle.dumps(child))):
+        clone.write(5.0, 0)
+        assert not parent.storage.any()
+    grandchild = child.fork()
+    grandchild.write(6.0, 1)
+    assert not child.storage.any()
+
+    tracer = Tracer().attach(parent)
+    with pytest.raises(ArgumentError):
+        parent.fork()
+    tracer.detach()
+    parent.fork()
@@ -0,0 +1,92 @@
+import pytest
+
+from pyskrm import Bank, SKRM
+from pyskrm.sparse import SparseStorage
+from conftest import counters
+
+try:
+    from pyskrm.argument_error import ArgumentError
+except Exception:  # pragma: no cover
+    ArgumentError = Exception
+
+WRITES = [(1.5, 0, 0), (-2.25, 2, 1), (0.1, 1, 1), (3.0, 0, 0), (-0.5, 2, 0), (7.75, 1, 1)]
+
+
+@pytest.mark.parametrize("strategy", ["naive", "pw", "pw_plus", "adaptive"])
+@pytest.mark.parametrize("analytic", [False, True])
+def test_sparse_matches_flat(make_skrm, strategy, analytic):
+    flat = make_skrm(strategy=strategy, num_racetrack=2, analytic=analytic)
+    sparse = make_skrm(strategy=strategy, num_racetrack=2, analytic=analytic, layout="sparse")
+    for number, target_word, track in WRITES:
+        flat.write(number, target_word, track)
+        sparse.write(number, target_word, track)
+        assert sparse.storage == flat.storage
+    assert counters(sparse) == counters(flat)
+    assert sparse.read(1, 1) == flat.read(1, 1) == pytest.approx(7.75)
+    assert sparse.render_visualization() == flat.render_visualization()
+
+
+def test_primitives_match_flat(make_skrm):
+    flat = make_skrm(word_size=4, num_words=3)
+    sparse = make_skrm(word_size=4, num_words=3, layout="sparse")
+    for s in (flat, sparse):
+        s.inject(0)
+        s.shift(0, 3)
+        s.inject(1)
+        s.shift(0, 2)
+        s.shift(3, 1)
+        s.remove(2)
+        s.shift(2, 0)
+    assert sparse.storage == flat.storage
+    assert [sparse.detect(ap) for ap in range(4)] == [flat.detect(ap) for ap in range(4)]
+    with pytest.raises(ArgumentError):
+        sparse.shift(1, 1)
+
+
+def test_memory_follows_the_working_set():
+    s = SKRM(word_size=32, num_words=100_000_000, layout="sparse", analytic=True)
+    for word in (0, 12_345_678, 99_999_999):
+        s.write(1.0, word)
+    assert len(s._ring) == 3 and len(s._ring.aps) == 0
+    assert s.read(12_345_678) == 1.0
+    s.write(0.0, 0)
+    assert len(s._ring) == 2
+    with pytest.raises(ArgumentError):
+        SKRM(word_size=32, num_words=3, layout="compressed")
+
+
+def test_storage_assignment_batches_and_forks(make_skrm):
+    flat = make_skrm(strategy="pw", num_racetrack=2)
+    sparse = make_skrm(strategy="pw", num_racetrack=2, layout="sparse")
+    bits = flat.storage.copy()
+    bits[5] = bits[flat.track_length + 40] = bits[flat.word_size] = 1  # overhead, word and port bits
+    flat.storage = bits.copy()
+    sparse.storage = bits.copy()
+    assert sparse.storage == bits
+
+    values, targets, tracks = zip(*WRITES)
+    flat.replay(values, targets, tracks)
+    sparse.replay(values, targets, tracks)
+    assert sparse.storage == flat.storage and counters(sparse) == counters(flat)
+
+    Bank(flat, max_workers=0).run(WRITES)
+    Bank(sparse, max_workers=0).run(WRITES)
+    assert sparse.storage == flat.storage and counters(sparse) == counters(flat)
+
+    child = sparse.fork()
+    child.write(9.0, 0)
+    assert sparse.storage == flat.storage
+    assert child.read(0) == 9.0
+
+
+def test_sparse_storage_round_trip(make_skrm):
+    s = make_skrm(strategy="pw_plus", num_racetrack=2)
+    for number, target_word, track in WRITES:
+        s.write(number, target_word, track)
+    sparse = SparseStorage(s.word_size, s.num_words, s.num_racetrack, s.track_length)
+    sparse.load(s.storage)
+    bits = s.storage.copy()
+    bits.setall(0)
+    sparse.store(bits)
+    assert bits == s.storage
+    assert sparse.copy().words == sparse.words
@@ -0,0 +1,84 @@
+import csv
+import json
+
+import numpy as np
+import pytest
+
+from pyskrm import SKRM
+from pyskrm.sweep import main, parse_grid, sweep, write_table
+
+try:
+    from pyskrm.argument_error import ArgumentError
+except Exception:  # pragma: no cover
+    ArgumentError = Exception
+
+
+VALUES = [0.125, 0.124, 0.125, -3.5, 1.0, 0.124]
+TARGETS = [0, 1, 0, 2, 1, 1]
+
+
+def reference(**params):
+    s = SKRM(**params)
+    for value, target in zip(VALUES, TARGETS):
+        s.write(value, target)
+    return s
+
+
+@pytest.mark.parametrize("max_workers", [0, 2])
+def test_sweep_prices_every_combination(max_workers):
+    grid = {
+        "word_size": [32], "num_words": [3, 4],
+        "strategy": ["naive", "pw_plus"],
+        "shift_latency": [0.5, 2.0], "inject_energy": [100],
+    }
+    rows = sweep((VALUES, TARGETS), grid, max_workers=max_workers)
+
+    assert len(rows) == 8
+    for row in rows:
+        s = reference(word_size=32, num_words=row["num_words"], strategy=row["strategy"])
+        counts = (s.inject_count, s.detect_count, s.remove_count, s.shift_count)
+        assert (row["inject_count"], row["detect_count"], row["remove_count"], row["shift_count"]) == counts
+        assert row["latency"] == pytest.approx(
+            counts[0] * 1.0 + counts[1] * 0.1 + counts[2] * 0.8 + counts[3] * row["shift_latency"])
+        assert row["energy"] == pytest.approx(counts[0] * 100 + counts[1] * 2 + counts[2] * 20 + counts[3] * 20)
+
+
+def test_sweep_reads_trace_files(tmp_path):
+    path = tmp_path / "trace.csv"
+    path.write_text("".join("%r,%d\n" % (v, t) for v, t in zip(VALUES, TARGETS)))
+    rows = sweep(str(path), {"word_size": [32], "num_words": [3], "strategy": ["pw"]}, max_workers=0)
+    s = reference(word_size=32, num_words=3, strategy="pw")
+    assert rows[0]["shift_count"] == s.shift_count
+    assert rows[0]["latency"] == pytest.approx(
+        s.inject_count * 1.0 + s.detect_count * 0.1 + s.remove_count * 0.8 + s.shift_count * 0.5)
+
+
+def test_sweep_rejects_bad_grids():
+    trace = (np.array(VALUES), np.array(TARGETS))
+    with pytest.raises(ArgumentError):
+        sweep(trace, {"word_size": [32], "num_words": [3], "colour": [1]})
+    with pytest.raises(ArgumentError):
+        sweep(trace, {"word_size": [32]})
+    with pytest.raises(ArgumentError):
+        sweep(trace, {"word_size": [32], "num_words": []})
+    with pytest.raises(ArgumentError):
+        parse_grid(["word_size"])
+
+
+def test_cli_writes_csv_and_jsonl(tmp_path):
+    trace = tmp_path / "trace.csv"
+    trace.write_text("".join("%r,%d\n" % (v, t) for v, t in zip(VALUES, TARGETS)))
+
+    out = tmp_path / "sweep.csv"
+    assert main([str(trace), "-g", "word_size=32", "-g", "num_words=3", "-g", "strategy=naive,pw",
+                 "-g", "detect_latency=0.1,0.2", "-j", "0", "-o", str(out)]) == 0
+    with open(out) as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 4
+    assert {r["strategy"] for r in rows} == {"naive", "pw"}
+    assert {r["detect_latency"] for r in rows} == {"0.1", "0.2"}
+
+    rows = sweep(str(trace), parse_grid(["word_size=32", "num_words=3"]), max_workers=0)
+    write_table(rows, str(tmp_path / "sweep.jsonl"))
+    with open(tmp_path / "sweep.jsonl") as f:
+        assert [json.loads(line) for line in f] == rows
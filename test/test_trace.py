@@ -0,0 +1,185 @@
+import gzip
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from pyskrm import trace
+from conftest import counters
+
+try:
+    from pyskrm.argument_error import ArgumentError
+except Exception:  # pragma: no cover
+    ArgumentError = Exception
+
+
+RECORDS = [(0.125, 0, 0), (0.124, 1, 0), (-3.5, 0, 0), (0.125, 2, 0), (1.0, 1, 0)]
+
+
+def write_csv(path, records, header=True):
+    lines = ["value,target_word,track"] if header else []
+    lines += ["# comment", ""]
+    lines += ["%r,%d,%d" % record for record in records]
+    text = "\n".join(lines) + "\n"
+    if str(path).endswith(".gz"):
+        with gzip.open(path, "wt") as f:
+            f.write(text)
+    else:
+        path.write_text(text)
+
+
+def write_bin(path, records):
+    data = np.array([(value, target) for value, target, _ in records], dtype=trace.RECORD_DTYPE).tobytes()
+    if str(path).endswith(".gz"):
+        with gzip.open(path, "wb") as f:
+            f.write(data)
+    else:
+        path.write_bytes(data)
+
+
+@pytest.mark.parametrize("name", ["t.csv", "t.csv.gz", "t.bin", "t.bin.gz"])
+def test_read_trace_formats(tmp_path, name):
+    path = tmp_path / name
+    (write_csv if ".csv" in name else write_bin)(path, RECORDS)
+
+    records = list(trace.read_trace(str(path)))
+    assert [(np.float32(v), t, k) for v, t, k in records] == [(np.float32(v), t, k) for v, t, k in RECORDS]
+
+    chunks = list(trace.read_chunks(str(path), chunk_size=2))
+    assert [len(c.values) for c in chunks] == [2, 2, 1]
+    dtype = np.float64 if ".csv" in name else np.float32
+    np.testing.assert_array_equal(np.concatenate([c.values for c in chunks]), np.array([r[0] for r in RECORDS], dtype))
+    np.testing.assert_array_equal(np.concatenate([c.targets for c in chunks]), [r[1] for r in RECORDS])
+
+
+def test_csv_and_skt_values_stay_in_double_precision(tmp_path, make_skrm):
+    records = [(0.1, 0, 0), (1 / 3, 1, 0), (1e-300, 2, 0)]
+    csv_path = tmp_path / "t.csv"
+    skt_path = tmp_path / "t.skt"
+    write_csv(csv_path, records)
+    trace.convert_csv(str(csv_path), str(skt_path), double=True)
+    tf = trace.TraceFile(str(skt_path))
+    assert tf.double and [v for v, _, _ in tf] == [r[0] for r in records]
+
+    for source in (str(csv_path), str(skt_path)):
+        s = make_skrm(word_size=64, precision="double")
+        for _ in trace.run_trace(s, source):
+            pass
+        assert [s.read(w) for w in range(3)] == [r[0] for r in records]
+
+    # float32 stays the default, in the version 1 layout
+    trace.convert_csv(str(csv_path), str(skt_path))
+    tf = trace.TraceFile(str(skt_path))
+    assert not tf.double and [v for v, _, _ in tf] == [np.float32(r[0]) for r in records]
+    assert skt_path.read_bytes()[8:10] == (1).to_bytes(2, "little")
+
+
+def test_read_trace_rejects_bad_input(tmp_path):
+    with pytest.raises(ArgumentError):
+        list(trace.read_trace(str(tmp_path / "t.txt")))
+
+    bad = tmp_path / "bad.csv"
+    bad.write_text("1.0,0\nnot,a,record\n")
+    with pytest.raises(ArgumentError):
+        list(trace.read_csv(str(bad)))
+
+    truncated = tmp_path / "t.bin"
+    truncated.write_bytes(b"\x00" * 7)
+    with pytest.raises(ArgumentError):
+        list(trace.read_chunks(str(truncated)))
+
+
+@pytest.mark.parametrize("strategy", ["naive", "pw", "pw_plus"])
+def test_run_trace_matches_write_loop(tmp_path, make_skrm, strategy):
+    path = tmp_path / "t.csv"
+    write_csv(path, RECORDS)
+
+    looped = make_skrm(strategy=strategy)
+    for value, target_word, track in RECORDS:
+        looped.write(value, target_word, track)
+
+    streamed = make_skrm(strategy=strategy)
+    progress = list(trace.run_trace(streamed, str(path), chunk_size=2))
+
+    assert [p.records for p in progress] == [2, 4, 5]
+    assert streamed.storage == looped.storage
+    last = progress[-1]
+    assert (last.inject_count, last.detect_count, last.remove_count, last.shift_count) == counters(looped)
+    assert last.latency == pytest.approx(
+        looped.inject_count * 1.0 + looped.detect_count * 0.1 + looped.remove_count * 0.8 + looped.shift_count * 0.5
+    )
+
+
+def test_run_trace_with_custom_write_fn(make_skrm):
+    calls = []
+
+    def record_write(self, number, target_word, track=0):
+        calls.append((number, target_word, track))
+
+    s = make_skrm(write_fn=record_write)
+    chunks = trace.chunked(iter(RECORDS), chunk_size=3)
+    assert [p.records for p in trace.run_trace(s, chunks)] == [3, 5]
+    assert calls == [(np.float32(v), t, k) for v, t, k in RECORDS]
+
+
+def test_memory_stays_flat_with_trace_length(tmp_path, make_skrm):
+    def peak(n):
+        path = tmp_path / ("t%d.bin" % n)
+        write_bin(path, [(float(i % 7), i % 3, 0) for i in range(n)])
+        s = make_skrm(strategy="pw")
+        tracemalloc.start()
+        for _ in trace.run_trace(s, str(path), chunk_size=1000):
+            pass
+        _, top = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return top
+
+    assert peak(100_000) < 2 * peak(10_000)
+
+
+@pytest.mark.parametrize("with_track", [False, True])
+def test_convert_csv_to_skt_and_replay_zero_copy(tmp_path, make_skrm, with_track):
+    records = [(v, t, (i % 2) if with_track else 0) for i, (v, t, _) in enumerate(RECORDS)]
+    csv_path = tmp_path / "t.csv.gz"
+    skt_path = tmp_path / "t.skt"
+    write_csv(csv_path, records)
+
+    assert trace.convert_csv(str(csv_path), str(skt_path), word_size=32, strategy="pw_plus", with_track=with_track) == 5
+
+    tf = trace.TraceFile(str(skt_path))
+    assert (tf.word_size, tf.num_words, tf.strategy, tf.has_track, len(tf)) == (32, 3, "pw_plus", with_track, 5)
+    assert [(np.float32(v), t, k) for v, t, k in tf] == [(np.float32(v), t, k) for v, t, k in records]
+
+    chunk = next(tf.chunks(chunk_size=4))
+    assert np.shares_memory(chunk.values, tf.records)
+    assert np.shares_memory(chunk.targets, tf.records)
+
+    looped = make_skrm(strategy="pw_plus", num_racetrack=2)
+    for value, target_word, track in records:
+        looped.write(value, target_word, track)
+    streamed = tf.new_skrm(num_racetrack=2)
+    assert streamed.strategy == "pw_plus" and streamed.num_words == 3
+    progress = list(trace.run_trace(streamed, str(skt_path), chunk_size=2))
+    assert progress[-1].records == 5
+    assert streamed.storage == looped.storage
+    assert counters(streamed) == counters(looped)
+
+
+def test_skt_rejects_bad_files(tmp_path):
+    csv_path = tmp_path / "t.csv"
+    write_csv(csv_path, [(1.0, 0, 1)])
+    with pytest.raises(ArgumentError):
+        trace.convert_csv(str(csv_path), str(tmp_path / "t.skt"))
+    with pytest.raises(ArgumentError):
+        trace.convert_csv(str(csv_path), str(tmp_path / "t.skt"), strategy="too_long_hint")
+
+    not_skt = tmp_path / "x.skt"
+    not_skt.write_bytes(b"\x00" * 100)
+    with pytest.raises(ArgumentError):
+        trace.TraceFile(str(not_skt))
+
+    trace.convert_csv(str(csv_path), str(tmp_path / "ok.skt"), with_track=True)
+    data = (tmp_path / "ok.skt").read_bytes()
+    (tmp_path / "cut.skt").write_bytes(data[:-1])
+    with pytest.raises(ArgumentError):
+        trace.TraceFile(str(tmp_path / "cut.skt"))
@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+from pyskrm.tracing import PRIMITIVES, Tracer
+
+try:
+    from pyskrm.argument_error import ArgumentError
+except Exception:  # pragma: no cover
+    ArgumentError = Exception
+
+
+def test_events_match_operation_counts(skrm_each_strategy):
+    s, strategy = skrm_each_strategy
+    tracer = Tracer()
+    with tracer.attached(s):
+        s.write(1.5, 1)
+        s.write(-2.25, 0, 0)
+    events = tracer.events()
+    counts = {op: sum(e.op == op for e in events) for op in PRIMITIVES}
+    assert counts == {"inject": s.inject_count, "detect": s.detect_count,
+                      "remove": s.remove_count, "shift": s.shift_count}
+    writes = [e for e in events if e.op == "write"]
+    assert [(e.word, e.strategy) for e in writes] == [(1, strategy), (0, strategy)]
+    assert {e.word for e in events if e.op in PRIMITIVES} == {0, 1}
+
+
+def test_detach_restores_the_class_methods(make_skrm):
+    s = make_skrm(strategy="pw")
+    write = s.write
+    tracer = Tracer().attach(s)
+    with pytest.raises(ArgumentError):
+        tracer.attach(s)
+    tracer.detach()
+    assert "inject" not in vars(s) and "read" not in vars(s)
+    assert s.write == write
+    s.write(3.0, 2)
+    assert tracer.events() == []
+
+
+def test_ring_buffer_keeps_the_latest_events(make_skrm):
+    s = make_skrm(strategy="naive")
+    tracer = Tracer(capacity=10)
+    seen = []
+    tracer.add_callback(seen.append)
+    with tracer.attached(s):
+        s.write(1.0, 0)
+    assert len(tracer.events()) == 10
+    assert tracer.dropped == len(seen) - 10
+    assert tracer.events() == seen[-10:]
+    with pytest.raises(ArgumentError):
+        Tracer(capacity=0)
+
+
+def test_adaptive_and_read_labels(make_skrm):
+    s = make_skrm(strategy="adaptive")
+    tracer = Tracer()
+    with tracer.attached(s):
+        s.write(0.5, 0)
+        assert s.read(0) == 0.5
+    by_strategy = tracer.histogram("strategy")
+    assert "read" in by_strategy
+    assert set(by_strategy) - {"read"} <= {"naive", "pw", "pw_plus"}
+    spans = [(e.op, e.strategy) for e in tracer.events() if e.op in ("write", "read")]
+    assert spans == [("write", "adaptive"), ("read", "read")]
+
+
+def test_analytic_writes_and_exports(make_skrm, tmp_path):
+    s = make_skrm(strategy="pw", analytic=True)
+    tracer = Tracer()
+    with tracer.attached(s):
+        s.write(1.0, 2)
+    assert [e.op for e in tracer.events()] == ["write"]
+    with pytest.raises(ArgumentError):
+        tracer.histogram("value")
+
+    path = tmp_path / "trace.json"
+    tracer.write_chrome_trace(str(path))
+    trace = json.loads(path.read_text())["traceEvents"]
+    assert trace[0]["ph"] == "X" and trace[0]["args"]["word"] == 2
@@ -0,0 +1,124 @@
+import pytest
+
+from pyskrm.wear import WearLeveler, WearTracker
+
+try:
+    from pyskrm.argument_error import ArgumentError
+except Exception:  # pragma: no cover
+    ArgumentError = Exception
+
+
+@pytest.mark.parametrize("analytic", [False, True])
+def test_wear_totals_match_counters(skrm_each_strategy, make_skrm, analytic):
+    _, strategy = skrm_each_strategy
+    s = make_skrm(strategy=strategy, num_racetrack=2, analytic=analytic)
+    wear = WearTracker(s)
+    for i, value in enumerate([1.5, -2.0, 0.25, 3.75, 8.0]):
+        s.write(value, i % 3, i % 2)
+    s.read(1)
+
+    assert int(wear.injects.sum()) == s.inject_count
+    assert int(wear.removes.sum()) == s.remove_count
+    # A one-segment shift is counted once, on that segment
+    assert int(wear.shifts.sum()) == s.shift_count
+    assert wear.writes == 5
+    # Track 1 only has words 0 and 1 written, which inject at APs 1 and 2
+    assert wear.shifts[1, 2] == 0 and wear.injects[1, 0] == 0 and wear.shifts[1, 0] > 0
+
+
+def test_bit_level_and_analytic_wear_agree(make_skrm):
+    trackers = []
+    for analytic in (False, True):
+        s = make_skrm(strategy="pw", analytic=analytic)
+        trackers.append(WearTracker(s))
+        for i, value in enumerate([1.5, -2.0, 0.25, 3.75]):
+            s.write(value, i % 3)
+    bit, fast = trackers
+    assert (bit.shifts == fast.shifts).all()
+    assert (bit.injects.sum(axis=1) == fast.injects.sum(axis=1)).all()
+
+
+def test_summary_histogram_and_detach(make_skrm):
+    s = make_skrm(strategy="naive")
+    wear = WearTracker(s)
+    for _ in range(4):
+        s.write(1.0, 2)
+    summary = wear.summary("shift")
+    assert summary.hotspot == (0, 2)
+    assert summary.max == summary.total and summary.leveling == pytest.approx(1 / 3)
+    counts, _ = wear.histogram("inject", bins=2)
+    assert counts.sum() == 4
+    assert wear.lifetime(1e6, "inject") == pytest.approx(1e6 * 4 / wear.injects.max())
+    assert "segment 2" in wear.render()
+    with pytest.raises(ArgumentError):
+        wear.summary("detect")
+
+    wear.detach()
+    assert "shift" not in vars(s)
+    s.write(1.0, 1)
+    assert int(wear.shifts.sum()) == summary.total
+
+
+def test_start_gap_spreads_a_hot_word(make_skrm):
+    results = {}
+    for policy in ("none", "start_gap"):
+        s = make_skrm(strategy="pw", num_words=5, analytic=True)
+        wear = WearTracker(s)
+        leveler = WearLeveler(s, policy=policy, interval=4)
+        for i in range(200):
+            leveler.write(float(i % 7), 0)
+            assert leveler.read(0) == float(i % 7)
+        results[policy] = wear.summary("shift").leveling
+    assert results["start_gap"] > 2 * results["none"]
+
+
+def test_start_gap_keeps_every_word(make_skrm):
+    s = make_skrm(strategy="naive", num_words=4, analytic=True)
+    leveler = WearLeveler(s, interval=1, randomize=True, seed=0)
+    for word in range(3):
+        leveler.write(float(word + 1), word)
+    for _ in range(20):
+        leveler.write(1.0, 0)
+        assert [leveler.read(word) for word in range(3)] == [1.0, 2.0, 3.0]
+    assert leveler.gap_moves == 23
+    with pytest.raises(ArgumentError):
+        leveler.write(1.0, 3)
+    with pytest.raises(ArgumentError):
+        WearLeveler(s, policy="random")
+
+
+def test_copies_leave_the_hooks_behind(make_skrm):
+    import copy
+    import pickle
+
+    from pyskrm import Bank
+    from pyskrm.access import WRITE
+    from pyskrm.schedule import ShiftScheduler
+    from pyskrm.tracing import Tracer
+
+    s = make_skrm(strategy="pw", num_racetrack=2)
+    wear = WearTracker(s)
+    tracer = Tracer().attach(s)
+    shallow = copy.copy(s)
+    assert not {"inject", "remove", "shift", "read"} & set(vars(shallow))
+    assert shallow.write.__self__ is shallow
+    for clone in (copy.deepcopy(s), pickle.loads(pickle.dumps(s))):
+        assert clone.write.__self__ is clone
+        clone.write(2.5, 0)
+        assert clone.read(0) == 2.5
+    assert s.inject_count == 0 and wear.writes == 0 and not tracer.events()
+
+    plain = make_skrm(strategy="pw", num_racetrack=2)
+    requests = [(1.5, 0, 0), (-2.0, 1, 1), (0.25, 2, 0)]
+    Bank(s, max_workers=0).run(requests)
+    Bank(plain, max_workers=0).run(requests)
+    assert s.storage == plain.storage and s.counters == plain.counters
+    # ... but hooked instances are banked in place
+    assert wear.writes == 3
+
+    accesses = [(WRITE, 0.5 + w, w, 0) for w in (2, 0, 1)]
+    hooked = ShiftScheduler(s, window=2, policy="nearest").run(accesses)
+    reference = ShiftScheduler(plain, window=2, policy="nearest").run(accesses)
+    assert hooked.baseline_latency == pytest.approx(reference.baseline_latency)
+    assert hooked.latency == pytest.approx(reference.latency)
+    assert wear.writes == 6